@@ -7,7 +7,10 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from app.core.database import Base
 from app.models.user import User  # noqa
-from app.models.animal import Animal  # noqa
+from app.models.animal import Animal, AnimalPhoto  # noqa
+from app.models.interest import InterestDeclaration  # noqa
+from app.models.activity import ActivityLog  # noqa
+from app.models.outbox import OutboxEmail  # noqa
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
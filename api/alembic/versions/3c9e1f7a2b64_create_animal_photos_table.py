@@ -0,0 +1,89 @@
+"""create animal photos table
+
+Revision ID: 3c9e1f7a2b64
+Revises: 6b2ad2a3b3f3
+Create Date: 2026-02-09 10:14:32.118904
+
+"""
+
+import json
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3c9e1f7a2b64"
+down_revision: Union[str, None] = "6b2ad2a3b3f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    animal_photos = op.create_table(
+        "animal_photos",
+        sa.Column("animal_id", sa.Integer(), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("url", sa.String(), nullable=False),
+        sa.Column("variants", sa.JSON(), nullable=True),
+        sa.Column("size_bytes", sa.Integer(), nullable=True),
+        sa.Column("content_hash", sa.String(length=64), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["animal_id"], ["animals.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_animal_photos_animal_id_position", "animal_photos", ["animal_id", "position"]
+    )
+    op.create_index(
+        op.f("ix_animal_photos_content_hash"), "animal_photos", ["content_hash"], unique=False
+    )
+
+    # Backfill the JSON encoded photo lists, keeping their order
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.text("SELECT id, extra_photos_url FROM animals WHERE extra_photos_url IS NOT NULL")
+    )
+    now = datetime.now(timezone.utc)
+    photos = [
+        {
+            "animal_id": animal_id,
+            "position": position,
+            "url": url,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for animal_id, extra_photos_url in rows
+        for position, url in enumerate(json.loads(extra_photos_url or "[]"))
+    ]
+    if photos:
+        op.bulk_insert(animal_photos, photos)
+
+    op.drop_column("animals", "extra_photos_url")
+
+
+def downgrade() -> None:
+    op.add_column("animals", sa.Column("extra_photos_url", sa.Text(), nullable=True))
+
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.text("SELECT animal_id, url FROM animal_photos ORDER BY animal_id, position")
+    )
+    photos: dict[int, list[str]] = {}
+    for animal_id, url in rows:
+        photos.setdefault(animal_id, []).append(url)
+
+    for animal_id, urls in photos.items():
+        connection.execute(
+            sa.text("UPDATE animals SET extra_photos_url = :urls WHERE id = :id"),
+            {"urls": json.dumps(urls), "id": animal_id},
+        )
+
+    op.drop_index(op.f("ix_animal_photos_content_hash"), table_name="animal_photos")
+    op.drop_index("ix_animal_photos_animal_id_position", table_name="animal_photos")
+    op.drop_table("animal_photos")
@@ -0,0 +1,54 @@
+"""create activity log table
+
+Revision ID: 5f1d9b3e7c42
+Revises: e2a6c8d4f1b7
+Create Date: 2026-03-23 16:48:12.305771
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5f1d9b3e7c42"
+down_revision: Union[str, None] = "e2a6c8d4f1b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Monthly partitions are created by the application before it writes to them,
+    # see ActivityService.ensure_partitions
+    op.create_table(
+        "activity_log",
+        sa.Column("id", sa.BigInteger(), sa.Identity(always=False), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("action", sa.String(), nullable=False),
+        sa.Column(
+            "entity_type",
+            sa.Enum("ANIMAL", "INTEREST", "USER", name="activityentitytype"),
+            nullable=False,
+        ),
+        sa.Column("entity_id", sa.String(), nullable=False),
+        sa.Column("details", sa.JSON(), nullable=True),
+        sa.Column("ip_address", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("id", "created_at"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.create_index(
+        "ix_activity_log_entity", "activity_log", ["entity_type", "entity_id", "created_at"]
+    )
+    op.create_index("ix_activity_log_user_id_created_at", "activity_log", ["user_id", "created_at"])
+    op.create_index(
+        "ix_activity_log_created_at", "activity_log", ["created_at"], postgresql_using="brin"
+    )
+
+
+def downgrade() -> None:
+    # Dropping the partitioned table drops its partitions and their indexes
+    op.drop_table("activity_log")
+    sa.Enum(name="activityentitytype").drop(op.get_bind())
@@ -0,0 +1,26 @@
+"""add animals updated_at id index
+
+Revision ID: 8d4f2c6e1a93
+Revises: 3c9e1f7a2b64
+Create Date: 2026-03-02 09:41:07.562310
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8d4f2c6e1a93"
+down_revision: Union[str, None] = "3c9e1f7a2b64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_animals_updated_at_id", "animals", ["updated_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_animals_updated_at_id", table_name="animals")
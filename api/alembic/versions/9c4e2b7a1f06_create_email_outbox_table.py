@@ -0,0 +1,58 @@
+"""create email outbox table
+
+Revision ID: 9c4e2b7a1f06
+Revises: 5f1d9b3e7c42
+Create Date: 2026-03-18 09:42:11.305128
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9c4e2b7a1f06"
+down_revision: Union[str, None] = "5f1d9b3e7c42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "email_outbox",
+        sa.Column("recipient", sa.String(), nullable=False),
+        sa.Column("subject", sa.String(), nullable=False),
+        sa.Column("body", sa.Text(), nullable=False),
+        sa.Column("html", sa.Text(), nullable=True),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("digest", sa.Boolean(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("failed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_email_outbox_next_attempt_at",
+        "email_outbox",
+        ["next_attempt_at"],
+        postgresql_where=sa.text("sent_at IS NULL AND failed_at IS NULL"),
+    )
+    op.create_index(
+        "ix_email_outbox_digest_recipient",
+        "email_outbox",
+        ["recipient", "created_at"],
+        postgresql_where=sa.text("digest AND sent_at IS NULL AND failed_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_email_outbox_digest_recipient", table_name="email_outbox")
+    op.drop_index("ix_email_outbox_next_attempt_at", table_name="email_outbox")
+    op.drop_table("email_outbox")
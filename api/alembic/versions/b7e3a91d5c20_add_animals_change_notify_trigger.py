@@ -0,0 +1,59 @@
+"""add animals change notify trigger
+
+Revision ID: b7e3a91d5c20
+Revises: 8d4f2c6e1a93
+Create Date: 2026-03-09 14:22:51.184903
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e3a91d5c20"
+down_revision: Union[str, None] = "8d4f2c6e1a93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Notifications are delivered when the transaction commits and dropped on rollback.
+    # Bulk loads can skip them with SET LOCAL openadopt.notify_changes = 'off'.
+    op.execute(
+        """
+        CREATE FUNCTION notify_animal_change() RETURNS trigger AS $$
+        BEGIN
+            IF current_setting('openadopt.notify_changes', true) = 'off' THEN
+                RETURN NULL;
+            END IF;
+
+            PERFORM pg_notify('animal_changes', json_build_object(
+                'id', NEW.id,
+                'created_by_id', NEW.created_by_id,
+                'action', CASE
+                    WHEN TG_OP = 'INSERT' THEN 'created'
+                    WHEN NEW.deleted_at IS NOT NULL AND OLD.deleted_at IS NULL THEN 'deleted'
+                    ELSE 'updated'
+                END,
+                'updated_at', NEW.updated_at
+            )::text);
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER animals_notify_change
+        AFTER INSERT OR UPDATE ON animals
+        FOR EACH ROW EXECUTE FUNCTION notify_animal_change()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER animals_notify_change ON animals")
+    op.execute("DROP FUNCTION notify_animal_change()")
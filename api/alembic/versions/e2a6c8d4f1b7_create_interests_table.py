@@ -0,0 +1,75 @@
+"""create interests table
+
+Revision ID: e2a6c8d4f1b7
+Revises: b7e3a91d5c20
+Create Date: 2026-03-16 11:05:38.920417
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2a6c8d4f1b7"
+down_revision: Union[str, None] = "b7e3a91d5c20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "interests",
+        sa.Column("animal_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("phone", sa.String(), nullable=True),
+        sa.Column("experience_text", sa.Text(), nullable=True),
+        sa.Column(
+            "living_situation",
+            sa.Enum("HOUSE", "APARTMENT", "FARM", "OTHER", name="livingsituation"),
+            nullable=True,
+        ),
+        sa.Column("has_yard", sa.Boolean(), nullable=True),
+        sa.Column("has_other_pets", sa.Boolean(), nullable=True),
+        sa.Column("message", sa.Text(), nullable=True),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "PENDING",
+                "CONTACTED",
+                "VISIT_SCHEDULED",
+                "APPROVED",
+                "DECLINED",
+                "WITHDRAWN",
+                name="intereststatus",
+            ),
+            nullable=False,
+        ),
+        sa.Column("assigned_to_id", sa.Integer(), nullable=True),
+        sa.Column("admin_notes", sa.Text(), nullable=True),
+        sa.Column("contacted_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["animal_id"], ["animals.id"]),
+        sa.ForeignKeyConstraint(["assigned_to_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_interests_animal_id"), "interests", ["animal_id"], unique=False)
+    op.create_index(op.f("ix_interests_status"), "interests", ["status"], unique=False)
+    op.create_index(op.f("ix_interests_email"), "interests", ["email"], unique=False)
+    op.create_index("ix_interests_created_at", "interests", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_interests_created_at", table_name="interests")
+    op.drop_index(op.f("ix_interests_email"), table_name="interests")
+    op.drop_index(op.f("ix_interests_status"), table_name="interests")
+    op.drop_index(op.f("ix_interests_animal_id"), table_name="interests")
+    op.drop_table("interests")
+    sa.Enum(name="intereststatus").drop(op.get_bind())
+    sa.Enum(name="livingsituation").drop(op.get_bind())
@@ -0,0 +1,65 @@
+from datetime import datetime
+from logging import getLogger
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.api.dependencies import require_super_admin
+from app.core.config import settings
+from app.core.cursors import decode_cursor, encode_cursor
+from app.core.database import get_read_db
+from app.core.responses import model_response
+from app.models.activity import ActivityEntityType
+from app.models.user import User
+from app.schemas.activity import ActivityLogPage
+from app.services.activity_service import ActivityService
+
+logger = getLogger(__name__)
+
+router = APIRouter(prefix="/admin/activity")
+
+
+@router.get(
+    "/",
+    tags=["admin", "activity"],
+    response_model=ActivityLogPage,
+    status_code=200,
+)
+async def get_activity(
+    entity_type: ActivityEntityType | None = None,
+    entity_id: str | None = None,
+    user_id: int | None = None,
+    since: datetime | None = Query(default=None, description="Oldest entry time, inclusive"),
+    until: datetime | None = Query(default=None, description="Newest entry time, exclusive"),
+    before: str | None = Query(default=None, description="Cursor returned by the last call"),
+    limit: int = Query(default=settings.DEFAULT_PAGE_SIZE, gt=0, le=settings.MAX_PAGE_SIZE),
+    current_user: User = Depends(require_super_admin),
+    db=Depends(get_read_db),
+):
+    """
+    Return activity entries newest first, optionally for one entity or user.
+
+    Entries are written in batches, so the last few seconds may not be visible yet. Pass
+    since and until to only scan the partitions of those months.
+    """
+    try:
+        position = decode_cursor(before) if before else None
+    except ValueError as e:
+        logger.warning(f"Error fetching activity: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        entries = await ActivityService.get_activity(
+            db, entity_type, entity_id, user_id, since, until, position, limit + 1
+        )
+        logger.info("Fetching activity")
+    except Exception as e:
+        logger.warning(f"Error fetching activity: {e}")
+        raise HTTPException(status_code=400, detail=f"Error fetching activity: {e}")
+
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    cursor = encode_cursor(entries[-1].created_at, entries[-1].id) if has_more else None
+
+    return model_response(
+        ActivityLogPage, {"items": entries, "cursor": cursor, "has_more": has_more}
+    )
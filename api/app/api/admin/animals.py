@@ -1,22 +1,66 @@
+import asyncio
+import hashlib
+import json
 import uuid
 from logging import getLogger
 from pathlib import Path
+from typing import AsyncIterator
+
+from datetime import datetime, timedelta, timezone
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
 
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
-
-from app.api.dependencies import require_admin
+from app.api.dependencies import EVENTS_TOKEN_SCOPE, require_admin, require_events_admin
+from app.core.cache import TTLCache
+from app.core.change_feed import RESYNC, ChangeEvent, change_feed
+from app.core.coalescing import SingleFlight
+from app.core.cursors import decode_cursor, encode_cursor
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import (
+    async_session_maker,
+    get_db,
+    get_read_session_maker,
+    replica_router,
+)
+from app.core.etags import etag_matches, make_etag, parse_versions
+from app.core.metrics import upload_bytes_total
+from app.core.responses import dump_model_json, json_response, model_response
+from app.core.security import create_access_token
 from app.core.storage.factory import get_storage_backend
+from app.models.activity import ActivityEntityType
+from app.models.animal import (
+    AnimalAdoptionStatus,
+    AnimalCurrentLocation,
+    AnimalGender,
+    AnimalSize,
+    AnimalSpecies,
+)
 from app.models.user import User, UserRole
 from app.schemas.animal import (
+    AnimalChangesResponse,
     AnimalCreate,
     AnimalFileUrl,
+    AnimalFileUrls,
+    AnimalFilters,
+    AnimalPhotoResponse,
     AnimalResponse,
     AnimalUpdate,
     PaginatedAnimalResponse,
 )
-from app.services.animal_service import AnimalService
+from app.schemas.auth import EventsTokenResponse
+from app.services.activity_service import ActivityService
+from app.services.animal_service import AnimalChangedError, AnimalService
 
 logger = getLogger(__name__)
 
@@ -37,6 +81,24 @@ ALLOWED_FILE_TYPES = {
 MAX_FILE_UPLOAD_SIZE = 6 * 1024 * 1024  # 5MB in bytes
 MAX_FILES_PER_ANIMAL = 10
 
+# Concurrent identical list and detail reads share one query
+animal_reads = SingleFlight("admin_animals")
+# Facet counts of the unfiltered list, by user scope
+unfiltered_facets = TTLCache("animal_facets", settings.ANIMAL_FACETS_CACHE_SECONDS)
+
+
+def authorize_access(animal_id: int, created_by_id: int | None, user: User) -> None:
+    """Raise if the animal doesn't exist (created_by_id is None) or the user can't access it."""
+    if created_by_id is None:
+        logger.warning(f"Animal with id {animal_id} not found")
+        raise HTTPException(status_code=404, detail=f"Animal with id {animal_id} not found")
+
+    if user.role != UserRole.SUPER_ADMIN and user.id != created_by_id:
+        logger.warning(f"Access to animal with id {animal_id} not allowed")
+        raise HTTPException(
+            status_code=401, detail=f"Access to animal with id {animal_id} not allowed"
+        )
+
 
 async def get_animal_and_authorize_access(db, animal_id: int, user: User):
     try:
@@ -49,17 +111,193 @@ async def get_animal_and_authorize_access(db, animal_id: int, user: User):
         )
     logger.info(f"Successfuly fetched animal with id {animal_id}")
 
-    if not animal:
-        logger.warning(f"Animal with id {animal_id} not found")
-        raise HTTPException(status_code=404, detail=f"Animal with id {animal_id} not found")
+    authorize_access(animal_id, animal.created_by_id if animal else None, user)
 
-    if user.role != UserRole.SUPER_ADMIN and user.id != animal.created_by_id:
-        logger.warning(f"Access to animal with id {animal_id} not allowed")
-        raise HTTPException(
-            status_code=401, detail=f"Access to animal with id {animal_id} not allowed"
+    return animal
+
+
+def get_animal_filters(
+    species: list[AnimalSpecies] | None = Query(default=None),
+    size: list[AnimalSize] | None = Query(default=None),
+    gender: list[AnimalGender] | None = Query(default=None),
+    adoption_status: list[AnimalAdoptionStatus] | None = Query(default=None),
+    current_location: list[AnimalCurrentLocation] | None = Query(default=None),
+) -> AnimalFilters:
+    """List filters from the query string, repeat a parameter to accept several values."""
+    return AnimalFilters(
+        species=species,
+        size=size,
+        gender=gender,
+        adoption_status=adoption_status,
+        current_location=current_location,
+    )
+
+
+def record_animal_activity(
+    request: Request, user: User, action: str, animal_id: int, details: dict | None = None
+) -> None:
+    ActivityService.record(
+        action,
+        ActivityEntityType.ANIMAL,
+        animal_id,
+        user_id=user.id,
+        details=details,
+        ip_address=request.client.host if request.client else None,
+    )
+
+
+async def read_animal_json(session_maker, animal_id: int):
+    """Fetch and serialize an animal, returning its owner id, ETag and JSON body."""
+    async with session_maker() as db:
+        animal = await AnimalService.get_animal_by_id(db, animal_id)
+        if not animal:
+            return None, None, None
+
+        etag = make_etag(animal.id, animal.updated_at)
+        return animal.created_by_id, etag, dump_model_json(AnimalResponse, animal)
+
+
+async def read_animals_page_json(
+    session_maker, user: User, skip: int, limit: int, filters: dict, facets: bool
+) -> bytes:
+    """Fetch and serialize a page of the animals visible to the user."""
+    async with session_maker() as db:
+        total = await AnimalService.count_animals(db, user, filters)
+        animals = await AnimalService.get_animals(db, user, skip, limit, filters)
+        facet_counts = await get_facets(db, user, filters) if facets else None
+
+        return dump_model_json(
+            PaginatedAnimalResponse,
+            {
+                "items": animals,
+                "total": total,
+                "skip": skip,
+                "limit": limit,
+                "facets": facet_counts,
+            },
+        )
+
+
+async def read_animals_by_ids_json(session_maker, user: User, ids: list[int]) -> bytes:
+    """Fetch and serialize several animals with one query and one ownership check."""
+    async with session_maker() as db:
+        animals = await AnimalService.get_animals_by_ids(db, ids)
+
+        if user.role != UserRole.SUPER_ADMIN:
+            not_allowed = sorted(animal.id for animal in animals if animal.created_by_id != user.id)
+            if not_allowed:
+                logger.warning(f"Access to animals with ids {not_allowed} not allowed")
+                raise HTTPException(
+                    status_code=401, detail=f"Access to animals with ids {not_allowed} not allowed"
+                )
+
+        # In the requested order, animals that don't exist are left out
+        by_id = {animal.id: animal for animal in animals}
+        items = [by_id[id] for id in dict.fromkeys(ids) if id in by_id]
+
+        return dump_model_json(
+            PaginatedAnimalResponse,
+            {"items": items, "total": len(items), "skip": 0, "limit": len(ids)},
         )
 
-    return animal
+
+async def get_facets(db, user: User, filters: dict) -> dict:
+    # Unfiltered facets are the same for every page view of a user scope, cache them
+    if filters:
+        return await AnimalService.get_facets(db, user, filters)
+
+    scope = user.id if user.role == UserRole.ADMIN else None
+    facets = unfiltered_facets.get(scope)
+    if facets is None:
+        facets = await AnimalService.get_facets(db, user)
+        unfiltered_facets.set(scope, facets)
+
+    return facets
+
+
+async def replay_changes(user: User, after: tuple[datetime, int]) -> AsyncIterator[ChangeEvent]:
+    """Read back the changes after a position, for event streams catching up."""
+    until = datetime.now(timezone.utc)
+    while True:
+        async with async_session_maker() as db:
+            animals = await AnimalService.get_changes(
+                db, user, after, until, settings.MAX_PAGE_SIZE
+            )
+
+        for animal in animals:
+            # Creates can't be told apart from updates once committed
+            action = "deleted" if animal.deleted_at is not None else "updated"
+            yield ChangeEvent(animal.id, animal.created_by_id, action, animal.updated_at)
+
+        if len(animals) < settings.MAX_PAGE_SIZE:
+            return
+        after = (animals[-1].updated_at, animals[-1].id)
+
+
+def format_change_event(event: ChangeEvent) -> str:
+    data = {"id": event.id, "action": event.action, "updated_at": event.updated_at.isoformat()}
+    return f"id: {event.cursor}\nevent: {event.action}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_changes(user: User, after: tuple[datetime, int] | None) -> AsyncIterator[str]:
+    """Server-sent events for the changes visible to the user, replaying from after first."""
+    # Subscribe before reading the position, so nothing committed in between is missed
+    queue = change_feed.subscribe()
+    try:
+        resync = after is not None
+        position = after or (datetime.now(timezone.utc), 0)
+
+        while True:
+            if resync:
+                async for event in replay_changes(user, position):
+                    yield format_change_event(event)
+                    position = (event.updated_at, event.id)
+                resync = False
+
+            try:
+                event = await asyncio.wait_for(queue.get(), settings.CHANGE_FEED_KEEPALIVE_SECONDS)
+            except TimeoutError:
+                # Keeps proxies from closing the idle connection
+                yield ": keep-alive\n\n"
+                continue
+
+            if event is RESYNC:
+                resync = True
+            elif user.role == UserRole.SUPER_ADMIN or event.created_by_id == user.id:
+                yield format_change_event(event)
+                position = (event.updated_at, event.id)
+    finally:
+        change_feed.unsubscribe(queue)
+
+
+async def raise_animal_not_accessible(
+    db, animal_id: int, user: User, versions: list[datetime] | None = None
+):
+    """
+    Raise the proper error after a guarded write matched no rows.
+
+    Only runs on the failure path, so successful writes don't pay for the extra SELECT.
+    """
+    await get_animal_and_authorize_access(db, animal_id, user)
+
+    if versions is not None:
+        raise_precondition_failed(animal_id)
+
+    # The animal was deleted between the write and the lookup
+    raise HTTPException(status_code=404, detail=f"Animal with id {animal_id} not found")
+
+
+def raise_precondition_failed(animal_id: int):
+    logger.warning(f"Animal with id {animal_id} was modified since the version in If-Match")
+    raise HTTPException(
+        status_code=412, detail=f"Animal with id {animal_id} was modified by someone else"
+    )
+
+
+def check_precondition(animal, versions: list[datetime] | None) -> None:
+    """Fail early if the animal doesn't match If-Match, the write checks it again."""
+    if versions is not None and animal.updated_at not in versions:
+        raise_precondition_failed(animal.id)
 
 
 def validate_file(
@@ -83,30 +321,77 @@ def validate_file(
         )
 
 
-@router.get("/", tags=["admin", "animals"], response_model=PaginatedAnimalResponse, status_code=200)
+def get_file_digest(file: UploadFile) -> str:
+    """Compute the sha256 hash of the file content."""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file.file.read(64 * 1024), b""):
+        digest.update(chunk)
+    file.file.seek(0)  # Reset to beginning
+
+    return digest.hexdigest()
+
+
+@router.get(
+    "/",
+    tags=["admin", "animals"],
+    response_model=PaginatedAnimalResponse,
+    status_code=200,
+)
 async def get_animals(
+    request: Request,
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=settings.DEFAULT_PAGE_SIZE, le=settings.MAX_PAGE_SIZE),
+    filters: AnimalFilters = Depends(get_animal_filters),
+    facets: bool = Query(default=False, description="Include the counts per filter value"),
+    ids: list[int] | None = Query(
+        default=None,
+        max_length=settings.MAX_PAGE_SIZE,
+        description="Fetch these animals instead of a page, repeat to pass several ids",
+    ),
     current_user: User = Depends(require_admin),
-    db=Depends(get_db),
+    session_maker=Depends(get_read_session_maker),
 ):
+    if ids:
+        try:
+            body = await read_animals_by_ids_json(session_maker, current_user, ids)
+            logger.info(f"Fetching animals with ids {ids}")
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.warning(f"Error fetching animals with ids {ids}: {e}")
+            raise HTTPException(status_code=400, detail=f"Error fetching animals: {e}")
+        logger.info("Successfully fetched animals")
+
+        return json_response(body)
+
+    # Admins only see their own animals, super admins see all of them
+    scope = current_user.id if current_user.role == UserRole.ADMIN else None
+    filter_values = filters.model_dump(exclude_none=True)
+    # The order values are given in doesn't change the result
+    filter_key = json.dumps({field: sorted(values) for field, values in filter_values.items()})
+
     try:
-        total = await AnimalService.count_animals(db, current_user)
-        animals = await AnimalService.get_animals(db, current_user, skip, limit)
+        body = await animal_reads.do(
+            ("list", scope, skip, limit, filter_key, facets, session_maker),
+            lambda: read_animals_page_json(
+                session_maker, current_user, skip, limit, filter_values, facets
+            ),
+            # Don't hand a client that just wrote a page read before its write
+            started_after=replica_router.last_write(request),
+        )
         logger.info(f"Fetching animals for user with id {current_user.id}")
     except Exception as e:
         logger.warning(f"Error fetching animals: {e}")
         raise HTTPException(status_code=400, detail=f"Error fetching animals: {e}")
     logger.info("Successfully fetched animals")
 
-    animals = [AnimalResponse.model_validate(animal) for animal in animals]
-
-    return PaginatedAnimalResponse(items=animals, total=total, skip=skip, limit=limit)
+    return json_response(body)
 
 
 @router.post("/", tags=["admin", "animals"], response_model=AnimalResponse, status_code=201)
 async def create_animal(
     animal_data: AnimalCreate,
+    request: Request,
     current_user: User = Depends(require_admin),
     db=Depends(get_db),
 ):
@@ -117,19 +402,157 @@ async def create_animal(
         logger.warning(f"Error creating animal: {e}")
         raise HTTPException(status_code=400, detail=f"Error creating animal: {e}")
     logger.info("Successfully created animal")
+    record_animal_activity(request, current_user, "created", animal.id)
 
     return animal
 
 
+@router.get(
+    "/changes",
+    tags=["admin", "animals"],
+    response_model=AnimalChangesResponse,
+    status_code=200,
+)
+async def get_animal_changes(
+    since: str | None = Query(default=None, description="Cursor returned by the last call"),
+    limit: int = Query(default=settings.DEFAULT_PAGE_SIZE, gt=0, le=settings.MAX_PAGE_SIZE),
+    current_user: User = Depends(require_admin),
+    db=Depends(get_db),
+):
+    """
+    Return the animals created, updated or deleted since the cursor, oldest first.
+
+    Start without since for a full sync and keep calling with the returned cursor while
+    has_more is true. Reads from the primary, a replica lagging behind could let rows
+    commit behind the cursor, and leaves out the last CHANGES_SETTLE_SECONDS for the same
+    reason with transactions that are still in flight.
+    """
+    try:
+        after = decode_cursor(since) if since else None
+    except ValueError as e:
+        logger.warning(f"Error fetching animal changes: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+    until = datetime.now(timezone.utc) - timedelta(seconds=settings.CHANGES_SETTLE_SECONDS)
+
+    try:
+        animals = await AnimalService.get_changes(db, current_user, after, until, limit + 1)
+        logger.info(f"Fetching animal changes for user with id {current_user.id}")
+    except Exception as e:
+        logger.warning(f"Error fetching animal changes: {e}")
+        raise HTTPException(status_code=400, detail=f"Error fetching animal changes: {e}")
+
+    has_more = len(animals) > limit
+    animals = animals[:limit]
+    cursor = encode_cursor(animals[-1].updated_at, animals[-1].id) if animals else since
+
+    return model_response(
+        AnimalChangesResponse,
+        {
+            "items": [animal for animal in animals if animal.deleted_at is None],
+            "deleted": [animal for animal in animals if animal.deleted_at is not None],
+            "cursor": cursor,
+            "has_more": has_more,
+        },
+    )
+
+
+@router.post(
+    "/events/token",
+    tags=["admin", "animals"],
+    response_model=EventsTokenResponse,
+    status_code=201,
+)
+async def create_events_token(current_user: User = Depends(require_admin)):
+    """
+    Issue a short-lived token for /events, for clients that can't send headers, e.g.:
+
+        new EventSource(`/admin/animals/events?token=${token}`)
+
+    It is only accepted by /events, and only to connect.
+    """
+    token = create_access_token(
+        {"id": current_user.id, "scope": EVENTS_TOKEN_SCOPE},
+        expires_delta=timedelta(seconds=settings.EVENTS_TOKEN_EXPIRE_SECONDS),
+    )
+    logger.info(f"Issued an events token for user with id {current_user.id}")
+
+    return {"token": token, "expires_in": settings.EVENTS_TOKEN_EXPIRE_SECONDS}
+
+
+@router.get("/events", tags=["admin", "animals"], status_code=200)
+async def stream_animal_events(
+    last_event_id: str | None = Header(default=None),
+    current_user: User = Depends(require_events_admin),
+):
+    """
+    Stream the animals created, updated or deleted as server-sent events.
+
+    Events are named after the action and carry the animal id and updated_at, their id is a
+    cursor of /changes. Reconnecting with Last-Event-ID replays the changes missed in the
+    meantime before the live ones. Delivery is at least once and replayed creates are sent
+    as updates, so clients should apply events as upserts.
+
+    Authenticated with the Authorization header, or with a token from /events/token in
+    the query string for EventSource. EventSource reconnects with the same URL, so its
+    clients get a new token and reconnect themselves once the token has expired.
+    """
+    if not settings.CHANGE_FEED_ENABLED:
+        logger.warning("Animal change stream requested while the change feed is disabled")
+        raise HTTPException(status_code=503, detail="Animal change stream is disabled")
+
+    try:
+        after = decode_cursor(last_event_id) if last_event_id else None
+    except ValueError as e:
+        logger.warning(f"Error streaming animal changes: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info(f"Streaming animal changes for user with id {current_user.id}")
+
+    return StreamingResponse(
+        stream_changes(current_user, after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get(
     "/{animal_id}", tags=["admin", "animals"], response_model=AnimalResponse, status_code=200
 )
 async def get_animal(
-    animal_id: int, current_user: User = Depends(require_admin), db=Depends(get_db)
+    animal_id: int,
+    request: Request,
+    if_none_match: str | None = Header(default=None),
+    current_user: User = Depends(require_admin),
+    session_maker=Depends(get_read_session_maker),
 ):
-    animal = await get_animal_and_authorize_access(db, animal_id, current_user)
+    if if_none_match is not None:
+        # Check the version alone first, so unchanged animals are never loaded or serialized
+        async with session_maker() as db:
+            version = await AnimalService.get_animal_version(db, animal_id)
+        authorize_access(animal_id, version.created_by_id if version else None, current_user)
 
-    return animal
+        etag = make_etag(animal_id, version.updated_at)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+    try:
+        created_by_id, etag, body = await animal_reads.do(
+            ("detail", animal_id, session_maker),
+            lambda: read_animal_json(session_maker, animal_id),
+            started_after=replica_router.last_write(request),
+        )
+        logger.info(f"Fetching animal with id {animal_id}")
+    except Exception as e:
+        logger.warning(f"Error fetching animal with id {animal_id}: {e}")
+        raise HTTPException(
+            status_code=400, detail=f"Error fetching animal with id {animal_id}: {e}"
+        )
+
+    # Access is checked per caller, the shared result doesn't depend on who asked first
+    authorize_access(animal_id, created_by_id, current_user)
+
+    return json_response(body, headers={"ETag": etag})
 
 
 @router.patch(
@@ -138,14 +561,19 @@ async def get_animal(
 async def update_animal(
     animal_id: int,
     animal_data: AnimalUpdate,
+    request: Request,
+    response: Response,
+    if_match: str | None = Header(default=None),
     current_user: User = Depends(require_admin),
+    storage=Depends(get_storage_backend),
     db=Depends(get_db),
 ):
-    animal = await get_animal_and_authorize_access(db, animal_id, current_user)
+    versions = parse_versions(if_match, animal_id)
+    changes = animal_data.model_dump(exclude_unset=True)
 
     try:
-        animal = await AnimalService.update_animal(
-            db, animal, animal_data.model_dump(exclude_unset=True)
+        animal, removed_urls = await AnimalService.update_animal(
+            db, animal_id, changes, current_user, versions
         )
         logger.info(f"Updating animal with id {animal_id}")
     except Exception as e:
@@ -153,43 +581,72 @@ async def update_animal(
         raise HTTPException(
             status_code=400, detail=f"Error updating animal with id {animal_id}: {e}"
         )
+
+    if not animal:
+        await raise_animal_not_accessible(db, animal_id, current_user, versions)
     logger.info(f"Successfully updated animal with id {animal_id}")
+    record_animal_activity(request, current_user, "updated", animal_id, {"fields": sorted(changes)})
+
+    # The update is committed, a file that fails to be deleted is only left orphaned in storage
+    results = await asyncio.gather(
+        *(storage.delete_file(url) for url in removed_urls), return_exceptions=True
+    )
+    for url, result in zip(removed_urls, results):
+        if isinstance(result, Exception):
+            logger.warning(f"File {url} could not be deleted: {result}")
 
+    response.headers["ETag"] = make_etag(animal.id, animal.updated_at)
     return animal
 
 
 @router.delete("/{animal_id}", tags=["admin", "animals"], status_code=204)
 async def delete_animal(
     animal_id: int,
+    request: Request,
     storage=Depends(get_storage_backend),
     current_user: User = Depends(require_admin),
     db=Depends(get_db),
 ):
-    animal = await get_animal_and_authorize_access(db, animal_id, current_user)
-
     try:
-        await AnimalService.delete_animal(db, animal)
-        await storage.delete_dir(f"animals/{animal_id}")
+        deleted = await AnimalService.delete_animal(db, animal_id, current_user)
         logger.info(f"Deleting animal with id {animal_id}")
     except Exception as e:
         logger.warning(f"Error deleting animal with id {animal_id}: {e}")
         raise HTTPException(
             status_code=400, detail=f"Error deleting animal with id {animal_id}: {e}"
         )
+
+    if not deleted:
+        await raise_animal_not_accessible(db, animal_id, current_user)
+    record_animal_activity(request, current_user, "deleted", animal_id)
+
+    try:
+        await storage.delete_dir(f"animals/{animal_id}")
+    except Exception as e:
+        logger.warning(f"Files of animal with id {animal_id} could not be deleted: {e}")
     logger.info(f"Successfully deleted animal with id {animal_id}")
 
     return
 
 
-@router.post("/{animal_id}/photos/primary", status_code=201, response_model=AnimalFileUrl)
+@router.post(
+    "/{animal_id}/photos/primary",
+    status_code=201,
+    response_model=AnimalFileUrl,
+)
 async def upload_animal_primary_photo(
     animal_id: int,
+    request: Request,
+    response: Response,
     file: UploadFile = File(...),
+    if_match: str | None = Header(default=None),
     current_user: User = Depends(require_admin),
     storage=Depends(get_storage_backend),
     db=Depends(get_db),
 ):
+    versions = parse_versions(if_match, animal_id)
     animal = await get_animal_and_authorize_access(db, animal_id, current_user)
+    check_precondition(animal, versions)
 
     # Validate file
     validate_file(file)
@@ -205,13 +662,22 @@ async def upload_animal_primary_photo(
     except Exception as e:
         logger.warning(f"File was not uploaded: {e}")
         raise HTTPException(status_code=400, detail=f"File was not uploaded: {e}")
+    upload_bytes_total.inc(file.size or 0)
 
     # Assign the new primary photo
-    old_primary_photo_url = animal.primary_photo_url
-    animal.primary_photo_url = file_url
+    updated, old_primary_photo_url = await AnimalService.set_primary_photo(
+        db, animal_id, file_url, current_user, versions
+    )
 
-    await db.commit()
-    await db.refresh(animal)
+    if not updated:
+        # The animal was deleted or changed while the file was being uploaded
+        try:
+            await storage.delete_file(file_url)
+        except Exception as e:
+            logger.warning(f"File {file_url} could not be deleted: {e}")
+        await raise_animal_not_accessible(db, animal_id, current_user, versions)
+
+    record_animal_activity(request, current_user, "primary_photo_set", animal_id, {"url": file_url})
 
     if old_primary_photo_url:
         try:
@@ -219,18 +685,28 @@ async def upload_animal_primary_photo(
         except Exception as e:
             logger.warning(f"File {old_primary_photo_url} could not be deleted: {e}")
 
+    response.headers["ETag"] = make_etag(animal.id, animal.updated_at)
     return {"url": file_url}
 
 
-@router.post("/{animal_id}/files", status_code=201, response_model=AnimalFileUrl)
+@router.post(
+    "/{animal_id}/files",
+    status_code=201,
+    response_model=AnimalFileUrl,
+)
 async def upload_animal_file(
     animal_id: int,
+    request: Request,
+    response: Response,
     file: UploadFile = File(...),
+    if_match: str | None = Header(default=None),
     current_user: User = Depends(require_admin),
     storage=Depends(get_storage_backend),
     db=Depends(get_db),
 ):
+    versions = parse_versions(if_match, animal_id)
     animal = await get_animal_and_authorize_access(db, animal_id, current_user)
+    check_precondition(animal, versions)
 
     # Validate file
     validate_file(file)
@@ -240,26 +716,48 @@ async def upload_animal_file(
     filename = f"{uuid.uuid4()}{file_ext}"
     file_path = f"animals/{animal_id}/files/{filename}"
 
-    import json
-
-    animal_files = json.loads(animal.extra_photos_url) if animal.extra_photos_url else []
-
-    if len(animal_files) >= MAX_FILES_PER_ANIMAL:
+    if len(animal.photos) >= MAX_FILES_PER_ANIMAL:
         raise HTTPException(status_code=400, detail=f"Maximum {MAX_FILES_PER_ANIMAL} files allowed")
 
+    file_size = file.size
+    content_hash = get_file_digest(file)
+
     # Upload file
     try:
         file_url = await storage.upload_file(file, file_path)
     except Exception as e:
         logger.warning(f"File was not uploaded: {e}")
         raise HTTPException(status_code=400, detail=f"File was not uploaded: {e}")
+    upload_bytes_total.inc(file.size or 0)
 
-    animal_files.append(file_url)
-    animal.extra_photos_url = json.dumps(animal_files)
+    try:
+        photo = await AnimalService.add_photo(
+            db,
+            animal_id,
+            file_url,
+            max_photos=MAX_FILES_PER_ANIMAL,
+            size_bytes=file_size,
+            content_hash=content_hash,
+            versions=versions,
+        )
+    except AnimalChangedError:
+        # The animal was deleted or changed while the file was being uploaded
+        try:
+            await storage.delete_file(file_url)
+        except Exception as e:
+            logger.warning(f"File {file_url} could not be deleted: {e}")
+        await raise_animal_not_accessible(db, animal_id, current_user, versions)
 
-    await db.commit()
-    await db.refresh(animal)
+    if not photo:
+        # Another upload took the last free slot in the meantime
+        try:
+            await storage.delete_file(file_url)
+        except Exception as e:
+            logger.warning(f"File {file_url} could not be deleted: {e}")
+        raise HTTPException(status_code=400, detail=f"Maximum {MAX_FILES_PER_ANIMAL} files allowed")
+    record_animal_activity(request, current_user, "file_uploaded", animal_id, {"url": file_url})
 
+    response.headers["ETag"] = make_etag(animal.id, animal.updated_at)
     return {"url": file_url}
 
 
@@ -267,28 +765,102 @@ async def upload_animal_file(
 async def delete_animal_file(
     animal_id: int,
     url: AnimalFileUrl,
+    request: Request,
+    response: Response,
+    if_match: str | None = Header(default=None),
     current_user: User = Depends(require_admin),
     storage=Depends(get_storage_backend),
     db=Depends(get_db),
 ):
+    versions = parse_versions(if_match, animal_id)
     animal = await get_animal_and_authorize_access(db, animal_id, current_user)
+    check_precondition(animal, versions)
 
-    import json
-
-    animal_files = json.loads(animal.extra_photos_url) if animal.extra_photos_url else []
+    try:
+        photo = await AnimalService.remove_photo(db, animal_id, url.url, versions)
+    except AnimalChangedError:
+        await raise_animal_not_accessible(db, animal_id, current_user, versions)
 
-    if url.url not in animal_files:
+    if not photo:
         raise HTTPException(status_code=404, detail="Photo not found")
 
+    # The row goes first, a file that fails to be deleted is only left orphaned in storage
+    await db.commit()
+    record_animal_activity(request, current_user, "file_deleted", animal_id, {"url": url.url})
+
     try:
         await storage.delete_file(url.url)
     except Exception as e:
-        logger.warning(f"File was not deleted: {e}")
-        raise HTTPException(status_code=400, detail=f"File was not deleted: {e}")
+        logger.warning(f"File {url.url} could not be deleted: {e}")
+
+    response.headers["ETag"] = make_etag(animal.id, animal.updated_at)
+    return
 
-    animal_files.remove(url.url)
-    animal.extra_photos_url = json.dumps(animal_files) if animal_files else None
 
+@router.delete("/{animal_id}/files/batch", status_code=204)
+async def delete_animal_files(
+    animal_id: int,
+    urls: AnimalFileUrls,
+    request: Request,
+    response: Response,
+    if_match: str | None = Header(default=None),
+    current_user: User = Depends(require_admin),
+    storage=Depends(get_storage_backend),
+    db=Depends(get_db),
+):
+    versions = parse_versions(if_match, animal_id)
+    animal = await get_animal_and_authorize_access(db, animal_id, current_user)
+    check_precondition(animal, versions)
+
+    try:
+        photos = await AnimalService.remove_photos(db, animal_id, urls.urls, versions)
+    except AnimalChangedError:
+        await raise_animal_not_accessible(db, animal_id, current_user, versions)
+
+    if photos is None:
+        logger.warning(f"Not all of the photos were found for animal with id {animal_id}")
+        raise HTTPException(status_code=404, detail="Photo not found")
+
+    # The rows go first, a file that fails to be deleted is only left orphaned in storage
     await db.commit()
+    record_animal_activity(request, current_user, "files_deleted", animal_id, {"urls": urls.urls})
+
+    results = await asyncio.gather(
+        *(storage.delete_file(photo.url) for photo in photos), return_exceptions=True
+    )
+    for photo, result in zip(photos, results):
+        if isinstance(result, Exception):
+            logger.warning(f"File {photo.url} could not be deleted: {result}")
 
+    response.headers["ETag"] = make_etag(animal.id, animal.updated_at)
     return
+
+
+@router.put("/{animal_id}/photos/order", status_code=200, response_model=list[AnimalPhotoResponse])
+async def reorder_animal_photos(
+    animal_id: int,
+    urls: AnimalFileUrls,
+    request: Request,
+    response: Response,
+    if_match: str | None = Header(default=None),
+    current_user: User = Depends(require_admin),
+    db=Depends(get_db),
+):
+    versions = parse_versions(if_match, animal_id)
+    animal = await get_animal_and_authorize_access(db, animal_id, current_user)
+    check_precondition(animal, versions)
+
+    try:
+        photos = await AnimalService.reorder_photos(db, animal_id, urls.urls, versions)
+    except AnimalChangedError:
+        await raise_animal_not_accessible(db, animal_id, current_user, versions)
+
+    if photos is None:
+        logger.warning(f"Photo order of animal with id {animal_id} doesn't match its photos")
+        raise HTTPException(
+            status_code=400, detail="The order must list every photo of the animal once"
+        )
+    record_animal_activity(request, current_user, "photos_reordered", animal_id)
+
+    response.headers["ETag"] = make_etag(animal.id, animal.updated_at)
+    return photos
@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Depends
+
+from app.api.dependencies import require_super_admin
+from app.core.database import get_pool_stats
+from app.models.user import User
+from app.schemas.system import PoolStatsResponse
+
+router = APIRouter(prefix="/admin/system")
+
+
+@router.get("/pool", tags=["admin", "system"], response_model=PoolStatsResponse)
+async def get_pool(current_user: User = Depends(require_super_admin)):
+    """Connection pool usage of the worker serving the request."""
+    return get_pool_stats()
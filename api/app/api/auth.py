@@ -1,8 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+import math
+
+from fastapi import APIRouter, Depends, HTTPException, Request
 from logging import getLogger
 
 from app.api.dependencies import get_current_user
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.metrics import rate_limited_requests_total
+from app.core.rate_limit import get_rate_limit_backend
+from app.core.security import VerificationBusyError
 from app.models.user import User
 from app.schemas.auth import LoginRequest, TokenResponse, UserResponse
 from app.services.auth_service import AuthService
@@ -12,11 +18,58 @@ logger = getLogger(__name__)
 router = APIRouter(prefix="/auth")
 
 
-@router.post("/login/", tags=["auth"], response_model=TokenResponse)
-async def login(credentials: LoginRequest, db=Depends(get_db)):
+def raise_too_many_requests(limit: str, retry_after: float):
+    rate_limited_requests_total.inc(limit=limit)
+    raise HTTPException(
+        status_code=429,
+        detail="Too many login attempts, try again later",
+        headers={"Retry-After": str(max(math.ceil(retry_after), 1))},
+    )
+
+
+async def check_login_rate_limit(request: Request, email: str):
+    """Take a token from the client IP and the email buckets, raise a 429 if either is empty."""
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+
+    backend = get_rate_limit_backend()
+    # The address of the client behind the proxies in FORWARDED_ALLOW_IPS, see main.py
+    client_ip = request.client.host if request.client else "unknown"
+
+    retry_after = await backend.acquire(
+        f"login:ip:{client_ip}",
+        settings.LOGIN_RATE_LIMIT_IP_BURST,
+        settings.LOGIN_RATE_LIMIT_IP_PER_MINUTE / 60,
+    )
+    if retry_after:
+        logger.warning(f"Login rate limit exceeded for IP {client_ip}")
+        raise_too_many_requests("login_ip", retry_after)
+
+    retry_after = await backend.acquire(
+        f"login:email:{email.lower()}",
+        settings.LOGIN_RATE_LIMIT_EMAIL_BURST,
+        settings.LOGIN_RATE_LIMIT_EMAIL_PER_MINUTE / 60,
+    )
+    if retry_after:
+        logger.warning(f"Login rate limit exceeded for email {email}")
+        raise_too_many_requests("login_email", retry_after)
+
+
+@router.post(
+    "/login/",
+    tags=["auth"],
+    response_model=TokenResponse,
+    responses={429: {"description": "Too many login attempts"}},
+)
+async def login(credentials: LoginRequest, request: Request, db=Depends(get_db)):
+    await check_login_rate_limit(request, credentials.email)
+
     try:
         access_token = await AuthService.login_user(db, credentials.email, credentials.password)
         logger.info(f"Attempting login with email {credentials.email}")
+    except VerificationBusyError as e:
+        logger.warning(f"Login rejected: {e}")
+        raise_too_many_requests("password_verification", e.retry_after)
     except Exception as e:
         logger.warning(f"Login failed: {e}")
         raise HTTPException(status_code=403, detail=f"Login failed: {e}")
@@ -1,4 +1,4 @@
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Query
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from app.models.user import User, UserRole
@@ -7,20 +7,26 @@ from app.core.security import decode_access_token
 from app.services.auth_service import AuthService
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
+# Scope of the short-lived tokens passed in the query string of /admin/animals/events
+EVENTS_TOKEN_SCOPE = "animal_events"
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security), db=Depends(get_db)
-) -> User:
-    """Get current authenticated user using the Authorization header"""
-    token = credentials.credentials
 
+async def authenticate(db, token: str, scope: str | None = None) -> User:
+    """
+    Get the user of a token. Tokens issued for a scope are only accepted for that scope,
+    and unscoped access tokens only without one.
+    """
     payload = decode_access_token(token)
-    if not payload:
+    if not payload or payload.get("scope") != scope:
         raise HTTPException(status_code=401, detail="Invalid token")
 
     user_id = payload.get("id")
     user = await AuthService.get_user_by_id(db, user_id)
+    # End the transaction, so the connection goes back to the pool while the request runs
+    # instead of being held next to the ones its reads and writes check out
+    await db.commit()
 
     if not user:
         raise HTTPException(status_code=401, detail="Invalid token")
@@ -28,6 +34,13 @@ async def get_current_user(
     return user
 
 
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security), db=Depends(get_db)
+) -> User:
+    """Get current authenticated user using the Authorization header"""
+    return await authenticate(db, credentials.credentials)
+
+
 async def require_admin(current_user: User = Depends(get_current_user)) -> User:
     """Require user to be admin or super_admin."""
     if current_user.role not in (UserRole.SUPER_ADMIN, UserRole.ADMIN):
@@ -35,6 +48,27 @@ async def require_admin(current_user: User = Depends(get_current_user)) -> User:
     return current_user
 
 
+async def require_events_admin(
+    token: str | None = Query(
+        default=None, description="Token from POST /admin/animals/events/token"
+    ),
+    credentials: HTTPAuthorizationCredentials | None = Depends(optional_security),
+    db=Depends(get_db),
+) -> User:
+    """
+    Require admin or super_admin, authenticated with the Authorization header or with an
+    events token in the query string, as browsers' EventSource can't send headers.
+    """
+    if token is not None:
+        current_user = await authenticate(db, token, scope=EVENTS_TOKEN_SCOPE)
+    elif credentials is not None:
+        current_user = await authenticate(db, credentials.credentials)
+    else:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    return await require_admin(current_user)
+
+
 async def require_super_admin(current_user: User = Depends(get_current_user)) -> User:
     """Require user to be super_admin."""
     if current_user.role != UserRole.SUPER_ADMIN:
@@ -0,0 +1,57 @@
+from logging import getLogger
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.core.config import settings
+from app.core.database import get_read_session_maker
+from app.core.responses import model_response
+from app.schemas.animal import SimilarAnimalResponse
+from app.services.recommendation_service import RecommendationService, similar_animals
+
+logger = getLogger(__name__)
+
+router = APIRouter(prefix="/animals")
+
+
+@router.get(
+    "/{animal_id}/similar",
+    tags=["animals"],
+    response_model=List[SimilarAnimalResponse],
+    status_code=200,
+)
+async def get_similar_animals(
+    animal_id: int,
+    limit: int = Query(default=6, ge=1, le=settings.SIMILAR_ANIMALS_MAX_LIMIT),
+    session_maker=Depends(get_read_session_maker),
+):
+    """
+    Available animals most similar to an animal, by species, size, age, gender, location
+    and description, best match first.
+    """
+    if not similar_animals.ready:
+        logger.warning("Similar animals requested before the index is available")
+        raise HTTPException(status_code=503, detail="Similar animals are not available")
+
+    try:
+        async with session_maker() as db:
+            similar = await RecommendationService.get_similar_animals(db, animal_id, limit)
+    except Exception as e:
+        logger.warning(f"Error fetching animals similar to animal with id {animal_id}: {e}")
+        raise HTTPException(
+            status_code=400,
+            detail=f"Error fetching animals similar to animal with id {animal_id}: {e}",
+        )
+
+    if similar is None:
+        logger.warning(f"Animal with id {animal_id} not found")
+        raise HTTPException(status_code=404, detail=f"Animal with id {animal_id} not found")
+
+    fields = SimilarAnimalResponse.model_fields.keys() - {"score"}
+    return model_response(
+        List[SimilarAnimalResponse],
+        [
+            {"score": score, **{field: getattr(animal, field) for field in fields}}
+            for animal, score in similar
+        ],
+    )
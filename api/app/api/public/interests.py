@@ -0,0 +1,68 @@
+import math
+from datetime import datetime, timezone
+from logging import getLogger
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.core.batch_writer import BufferFullError
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import get_read_session_maker
+from app.models.interest import InterestStatus
+from app.schemas.interest import InterestDeclarationAccepted, InterestDeclarationCreate
+from app.services.interest_service import InterestService, interest_writer
+
+logger = getLogger(__name__)
+
+router = APIRouter(prefix="/interests")
+
+# Whether an animal takes declarations, so bursts for the same animal don't each query it
+animal_acceptance = TTLCache("interest_animals", settings.INTEREST_ANIMAL_CACHE_SECONDS)
+
+
+@router.post("/", tags=["interests"], response_model=InterestDeclarationAccepted, status_code=202)
+async def declare_interest(
+    interest_data: InterestDeclarationCreate,
+    session_maker=Depends(get_read_session_maker),
+):
+    """
+    Declare interest in adopting an animal.
+
+    The declaration is validated and buffered, then inserted together with others shortly
+    after, so the response doesn't wait for the write.
+    """
+    animal_id = interest_data.animal_id
+
+    accepts = animal_acceptance.get(animal_id)
+    if accepts is None:
+        try:
+            async with session_maker() as db:
+                accepts = await InterestService.animal_accepts_interest(db, animal_id)
+        except Exception as e:
+            logger.warning(f"Error fetching animal with id {animal_id}: {e}")
+            raise HTTPException(
+                status_code=400, detail=f"Error fetching animal with id {animal_id}: {e}"
+            )
+        animal_acceptance.set(animal_id, accepts)
+
+    if not accepts:
+        logger.warning(f"Animal with id {animal_id} not found or not up for adoption")
+        raise HTTPException(
+            status_code=404, detail=f"Animal with id {animal_id} is not up for adoption"
+        )
+
+    received_at = datetime.now(timezone.utc)
+    try:
+        interest_writer.add(
+            InterestService.build_row(interest_data.model_dump(mode="json"), received_at)
+        )
+    except BufferFullError as e:
+        logger.warning(f"Rejecting interest declaration: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="Too many interest declarations, please try again shortly",
+            headers={"Retry-After": str(math.ceil(settings.INTEREST_FLUSH_INTERVAL))},
+        )
+    logger.info(f"Received interest declaration for animal with id {animal_id}")
+
+    return {"animal_id": animal_id, "status": InterestStatus.PENDING, "received_at": received_at}
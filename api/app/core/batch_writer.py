@@ -0,0 +1,145 @@
+"""
+In-process write buffer flushed in batches.
+
+Rows are acknowledged as soon as they are buffered and written by a background task, in
+batches of up to `max_batch_size`, when a batch fills up or `max_delay` seconds after the
+last flush. A failed flush keeps the rows and retries on the next one. Once `max_pending`
+rows are waiting, add() raises BufferFullError so callers can shed load instead of
+buffering without bound.
+
+On shutdown the buffer is flushed a last time, and whatever can't be written is spooled
+to a JSON lines file under SPOOL_PATH. Spool files are claimed by the next worker that
+starts and written back, so rows must be JSON serializable. Delivery is at least once,
+a worker stopped between writing a batch and removing it can write it again.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from app.core.config import settings
+from app.core.lifecycle import lifecycle
+from app.core.metrics import buffered_rows_pending, buffered_rows_written_total
+
+logger = logging.getLogger(__name__)
+
+
+class BufferFullError(Exception):
+    """Raised when too many rows are waiting to be written."""
+
+    pass
+
+
+class BatchWriter:
+    def __init__(
+        self,
+        name: str,
+        write: Callable[[list[dict]], Awaitable[None]],
+        max_batch_size: int,
+        max_delay: float,
+        max_pending: int,
+    ):
+        self.name = name
+        self.write = write
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.rows: list[dict] = []
+        self.claimed_spools: list[Path] = []
+        self.wakeup = asyncio.Event()
+        self.stopping = False
+        self.task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self.load_spools()
+        self.task = lifecycle.create_task(self.run(), name=f"{self.name}_writer")
+        lifecycle.on_shutdown(self.stop)
+
+    def add(self, row: dict) -> None:
+        if len(self.rows) >= self.max_pending:
+            raise BufferFullError(f"{len(self.rows)} {self.name} rows waiting to be written")
+
+        self.rows.append(row)
+        buffered_rows_pending.set(len(self.rows), writer=self.name)
+        if len(self.rows) >= self.max_batch_size:
+            self.wakeup.set()
+
+    async def run(self) -> None:
+        while not self.stopping:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.max_delay)
+            except TimeoutError:
+                pass
+            self.wakeup.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"Error writing {self.name} rows, {len(self.rows)} pending: {e}")
+
+    async def flush(self) -> None:
+        # Only one flush runs at a time, rows added meanwhile are appended after the batch
+        while self.rows:
+            batch = self.rows[: self.max_batch_size]
+            await self.write(batch)
+            del self.rows[: len(batch)]
+            buffered_rows_written_total.inc(len(batch), writer=self.name)
+            buffered_rows_pending.set(len(self.rows), writer=self.name)
+
+        for path in self.claimed_spools:
+            path.unlink(missing_ok=True)
+        self.claimed_spools.clear()
+
+    async def stop(self) -> None:
+        self.stopping = True
+        self.wakeup.set()
+
+        try:
+            if self.task is not None:
+                await self.task
+            await self.flush()
+        except BaseException as e:
+            # Includes the cancellation of a flush that outlives the shutdown timeout
+            logger.warning(f"Error writing {self.name} rows on shutdown: {e!r}")
+            self.spool()
+            raise
+
+    def spool(self) -> None:
+        if not self.rows:
+            return
+
+        spool_dir = Path(settings.SPOOL_PATH)
+        spool_dir.mkdir(parents=True, exist_ok=True)
+        path = spool_dir / f"{self.name}-{os.getpid()}-{time.time_ns()}.jsonl"
+        with path.open("w") as spool_file:
+            for row in self.rows:
+                spool_file.write(json.dumps(row) + "\n")
+        logger.warning(f"Spooled {len(self.rows)} {self.name} rows to {path}")
+
+        # Rows of claimed spools are in the buffer, and now in the new file
+        for claimed in self.claimed_spools:
+            claimed.unlink(missing_ok=True)
+        self.claimed_spools.clear()
+        self.rows.clear()
+
+    def load_spools(self) -> None:
+        spool_dir = Path(settings.SPOOL_PATH)
+        for path in sorted(spool_dir.glob(f"{self.name}-*.jsonl")):
+            # Renaming is atomic, so each file is claimed by a single worker
+            claimed = path.with_name(f"{path.name}.{os.getpid()}.claimed")
+            try:
+                path.rename(claimed)
+            except FileNotFoundError:
+                continue
+
+            with claimed.open() as spool_file:
+                rows = [json.loads(line) for line in spool_file if line.strip()]
+            self.rows.extend(rows)
+            self.claimed_spools.append(claimed)
+            logger.info(f"Loaded {len(rows)} spooled {self.name} rows from {path}")
+
+        buffered_rows_pending.set(len(self.rows), writer=self.name)
@@ -0,0 +1,40 @@
+"""
+Small in-process cache with a time to live.
+
+Entries expire `ttl` seconds after they are set and the oldest ones are evicted past
+`max_entries`. Each worker keeps its own entries, so it only fits values that may be
+served up to `ttl` seconds stale. Lookups are counted in cache_lookups_total.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from app.core.metrics import record_cache_lookup
+
+
+class TTLCache:
+    def __init__(self, name: str, ttl: float, max_entries: int = 10_000):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the cached value, or None if it is missing or expired."""
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self.entries[key]
+            entry = None
+
+        record_cache_lookup(self.name, entry is not None)
+        return entry[1] if entry is not None else None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self.entries[key] = (time.monotonic() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
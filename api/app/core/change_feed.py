@@ -0,0 +1,133 @@
+"""
+Live animal changes over Postgres LISTEN/NOTIFY.
+
+A trigger on the animals table notifies the `animal_changes` channel with the id, owner,
+action and updated_at of every inserted or updated row when its transaction commits.
+Each worker keeps one listener connection outside the pool and fans the notifications
+out to the queues of its connected clients, so database connections don't grow with
+the number of clients.
+
+Notifications are not stored. A client whose queue fills up, and every client while the
+listener reconnects, gets RESYNC instead and catches up from the table with the changes
+cursor, which is also the id of each event.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import NamedTuple
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.core.cursors import encode_cursor
+from app.core.lifecycle import lifecycle
+from app.core.metrics import change_feed_clients
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "animal_changes"
+# Put in a client's queue when notifications may have been missed
+RESYNC = None
+
+PING_INTERVAL = 30.0  # seconds
+MAX_RECONNECT_DELAY = 30.0  # seconds
+
+
+class ChangeEvent(NamedTuple):
+    id: int
+    created_by_id: int
+    action: str
+    updated_at: datetime
+
+    @property
+    def cursor(self) -> str:
+        return encode_cursor(self.updated_at, self.id)
+
+
+class ChangeFeed:
+    def __init__(self, url: str, queue_size: int):
+        self.dsn = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.queue_size = queue_size
+        self.subscribers: set[asyncio.Queue] = set()
+        self.task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self.task = lifecycle.create_task(self.run(), name="change_feed")
+        lifecycle.on_shutdown(self.stop)
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        change_feed_clients.inc()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self.subscribers.discard(queue)
+        change_feed_clients.dec()
+
+    def publish(self, event: ChangeEvent | None) -> None:
+        for queue in self.subscribers:
+            if queue.full():
+                # The client is too slow to keep up, drop its backlog and let it catch up
+                # from the table instead of buffering without bound
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+            else:
+                queue.put_nowait(event)
+
+    def on_notification(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+            event = ChangeEvent(
+                data["id"],
+                data["created_by_id"],
+                data["action"],
+                datetime.fromisoformat(data["updated_at"]),
+            )
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring malformed {channel} notification {payload!r}: {e}")
+            return
+
+        self.publish(event)
+
+    async def run(self) -> None:
+        """Listen until cancelled, reconnecting with a backoff when the connection is lost."""
+        delay = 1.0
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                await connection.add_listener(CHANNEL, self.on_notification)
+                logger.info(f"Listening for notifications on {CHANNEL}")
+                # Anything committed while the listener was down has to be read back
+                self.publish(RESYNC)
+                delay = 1.0
+
+                while True:
+                    await asyncio.sleep(PING_INTERVAL)
+                    # An idle connection only notices it is gone when it is used
+                    await connection.fetchval("SELECT 1", timeout=PING_INTERVAL)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Change feed listener failed, reconnecting in {delay}s: {e}")
+            finally:
+                if connection is not None:
+                    connection.terminate()
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+
+change_feed = ChangeFeed(
+    settings.CHANGE_FEED_DATABASE_URL or settings.DATABASE_URL, settings.CHANGE_FEED_QUEUE_SIZE
+)
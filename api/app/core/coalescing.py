@@ -0,0 +1,65 @@
+"""
+Request coalescing (single-flight) for identical concurrent reads.
+
+When many requests for the same resource arrive at once, only the first one runs the query,
+the others wait for its result instead of sending the same query to the database. Results
+are shared only while the call is in flight, nothing is cached afterwards.
+
+The key must include everything the result depends on: the normalized parameters, the
+caller's scope (e.g. the owner filter) and the session maker the call reads from. A caller
+that just wrote passes the time of its write as started_after, so it doesn't join a call
+that may have read the state from before its write.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+from app.core.config import settings
+from app.core.metrics import coalesced_requests_total
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self.enabled = settings.REQUEST_COALESCING_ENABLED
+        # Running call per key, with the monotonic time it started at
+        self.calls: dict[Hashable, tuple[asyncio.Task, float]] = {}
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[T]],
+        started_after: float | None = None,
+    ) -> T:
+        """
+        Run fn, or wait for the call already running with the same key.
+
+        A running call that started before started_after isn't joined, a new one is started
+        and the callers that come next join it instead.
+        """
+        if not self.enabled:
+            return await fn()
+
+        call = self.calls.get(key)
+        if call is None or (started_after is not None and call[1] < started_after):
+            # The call runs in its own task, so a caller that disconnects doesn't cancel it
+            # for the others
+            task = asyncio.create_task(fn())
+            self.calls[key] = (task, time.monotonic())
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            task = call[0]
+            coalesced_requests_total.inc(name=self.name)
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        call = self.calls.get(key)
+        if call is not None and call[0] is task:
+            del self.calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved, in case every caller went away
+            task.exception()
@@ -0,0 +1,181 @@
+"""
+Response compression middleware with gzip and optional Brotli support.
+
+Brotli is used when the `brotli` package is installed (pip install openadopt-api[compression])
+and the client accepts it, gzip otherwise. Small bodies, streaming responses and media types
+that are already compressed (images, videos, archives) are sent as is.
+
+Compressed bodies are kept in a small LRU cache keyed by a hash of the uncompressed body,
+so the same list page isn't compressed again on every request.
+"""
+
+import gzip
+import hashlib
+from collections import OrderedDict
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import record_cache_lookup
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+INCOMPRESSIBLE_TYPE_PREFIXES = ("image/", "video/", "audio/", "font/woff")
+INCOMPRESSIBLE_TYPES = {
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/x-brotli",
+    "application/pdf",
+    "application/octet-stream",
+    "text/event-stream",
+}
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    encodings = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[name.strip().lower()] = quality
+
+    return encodings
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    encodings = parse_accept_encoding(accept_encoding)
+    wildcard = encodings.get("*", 0.0)
+
+    if brotli is not None and encodings.get("br", wildcard) > 0:
+        return "br"
+    if encodings.get("gzip", wildcard) > 0:
+        return "gzip"
+
+    return None
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(";")[0].strip().lower()
+    if not media_type or media_type in INCOMPRESSIBLE_TYPES:
+        return False
+
+    return not media_type.startswith(INCOMPRESSIBLE_TYPE_PREFIXES)
+
+
+class CompressedBodyCache:
+    """LRU cache of compressed bodies, bounded by their total size in bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries: OrderedDict[tuple[str, bytes], bytes] = OrderedDict()
+
+    def get(self, key: tuple[str, bytes]) -> bytes | None:
+        body = self.entries.get(key)
+        if body is not None:
+            self.entries.move_to_end(key)
+        return body
+
+    def set(self, key: tuple[str, bytes], body: bytes) -> None:
+        if len(body) > self.max_bytes or key in self.entries:
+            return
+        self.entries[key] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        cache_max_bytes: int = 8 * 1024 * 1024,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache = CompressedBodyCache(cache_max_bytes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message | None = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, passthrough
+
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if "content-encoding" in headers or not is_compressible(
+                    headers.get("content-type", "")
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Hold the headers back until we know the body size
+                    start_message = message
+                return
+
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                # Streaming or small responses are sent as is
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = self.compress(encoding, body)
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+    def compress(self, encoding: str, body: bytes) -> bytes:
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        compressed = self.cache.get(key)
+        record_cache_lookup("compression", compressed is not None)
+
+        if compressed is None:
+            if encoding == "br":
+                compressed = brotli.compress(body, quality=self.brotli_quality)
+            else:
+                compressed = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+            self.cache.set(key, compressed)
+
+        return compressed
@@ -2,7 +2,10 @@
 Application configuration.
 """
 
-from pydantic_settings import BaseSettings
+from typing import Annotated
+
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, NoDecode
 
 
 class Settings(BaseSettings):
@@ -10,23 +13,160 @@ class Settings(BaseSettings):
     APP_NAME: str = "OpenAdopt"
     SECRET_KEY: str
     DEBUG: bool = False
+    # Seconds to wait for background tasks on shutdown
+    SHUTDOWN_TIMEOUT: float = 20.0
 
     # DB
     DATABASE_URL: str
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30.0
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+    # Connections opened per engine on startup, before the app reports ready
+    DATABASE_POOL_WARMUP: int = 2
+    # Prepared statements cached per connection by asyncpg
+    DATABASE_STATEMENT_CACHE_SIZE: int = 100
+    # Disables the statement cache, required behind PgBouncer in transaction pooling mode
+    DATABASE_PGBOUNCER_MODE: bool = False
+    # Comma separated read replica URLs, read-only endpoints are balanced across them
+    DATABASE_REPLICA_URLS: Annotated[list[str], NoDecode] = []
+    DATABASE_REPLICA_HEALTH_CHECK_INTERVAL: float = 10.0
+    # How long a client keeps reading from the primary after a write, and doesn't join
+    # coalesced reads that started before it
+    DATABASE_REPLICA_STICKINESS_SECONDS: float = 5.0
+
+    # Default statement_timeout of the connections in seconds, 0 keeps the server default.
+    # Not sent behind PgBouncer, set it on the database role instead.
+    DATABASE_STATEMENT_TIMEOUT: float = 60.0
+
+    # Requests are cancelled with a 504 once past their deadline, routes set their own
+    REQUEST_TIMEOUT: float = 30.0
+    READ_REQUEST_TIMEOUT: float = 10.0
+    UPLOAD_REQUEST_TIMEOUT: float = 120.0
+    # Requests handled at once per worker, the excess waits in a bounded queue for up to
+    # the timeout and is rejected with a 503 beyond it
+    MAX_CONCURRENT_REQUESTS: int = 100
+    REQUEST_QUEUE_SIZE: int = 100
+    REQUEST_QUEUE_TIMEOUT: float = 2.0
+
+    # Instrumentation, requests above either threshold are logged
+    SLOW_REQUEST_QUERY_COUNT: int = 20
+    SLOW_REQUEST_MS: float = 500.0
+    # Super admins can profile single requests with an X-Profile header or ?profile=1,
+    # sampling their stack every interval (seconds)
+    PROFILING_ENABLED: bool = True
+    PROFILING_INTERVAL: float = 0.005
+
+    # Concurrent identical reads share one query
+    REQUEST_COALESCING_ENABLED: bool = True
+
+    # Response compression
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    # Compressed bodies kept in memory, so identical responses aren't compressed again
+    COMPRESSION_CACHE_MAX_BYTES: int = 8 * 1024 * 1024
 
     # Auth
     ACCESS_TOKEN_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440
+    # Login attempts allowed in a burst and refilled per minute, by client IP and by email
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    LOGIN_RATE_LIMIT_IP_BURST: int = 20
+    LOGIN_RATE_LIMIT_IP_PER_MINUTE: float = 10.0
+    LOGIN_RATE_LIMIT_EMAIL_BURST: int = 5
+    LOGIN_RATE_LIMIT_EMAIL_PER_MINUTE: float = 2.0
+    # Proxies trusted to report the client IP in X-Forwarded-For, as comma separated IPs or
+    # networks, "*" for any. Left empty the IP is the peer's, behind a proxy that's the proxy
+    FORWARDED_ALLOW_IPS: str = ""
+    # Password hashes checked at once per worker, logins wait up to the timeout for a slot
+    PASSWORD_VERIFICATION_CONCURRENCY: int = 2
+    PASSWORD_VERIFICATION_QUEUE_TIMEOUT: float = 1.0
 
     # Pagination
     DEFAULT_PAGE_SIZE: int = 50
     MAX_PAGE_SIZE: int = 100
+    # Rows updated in the last seconds are left out of the changes feed, so transactions
+    # still in flight when a client syncs can't commit behind its cursor
+    CHANGES_SETTLE_SECONDS: float = 2.0
+    # Seconds to cache the facet counts of unfiltered animal lists, per worker
+    ANIMAL_FACETS_CACHE_SECONDS: float = 10.0
+    # Similar animals are scored against an in-memory index, kept current from the change
+    # feed and rebuilt from the database every interval
+    SIMILAR_ANIMALS_REBUILD_INTERVAL: float = 900.0
+    SIMILAR_ANIMALS_MAX_LIMIT: int = 24
+    # Static JSON snapshots of the public catalogue, written through the storage backend
+    CATALOGUE_PUBLISH_ENABLED: bool = False
+    CATALOGUE_PATH: str = "catalogue"
+    CATALOGUE_PAGE_SIZE: int = 50
+    # Seconds to wait after a change for others before publishing
+    CATALOGUE_PUBLISH_DELAY: float = 2.0
+    # Live change stream, one LISTEN connection per worker
+    CHANGE_FEED_ENABLED: bool = True
+    # LISTEN needs a session, set a direct URL when DATABASE_URL goes through a
+    # transaction pooler
+    CHANGE_FEED_DATABASE_URL: str | None = None
+    # Events buffered per client before it is told to resync from the table
+    CHANGE_FEED_QUEUE_SIZE: int = 1000
+    CHANGE_FEED_KEEPALIVE_SECONDS: float = 15.0
+    # Lifetime of the tokens EventSource clients pass in the query string, only needed to
+    # connect as the stream stays open after it expires
+    EVENTS_TOKEN_EXPIRE_SECONDS: int = 60
+
+    # Interest declarations are buffered and inserted in batches
+    INTEREST_BATCH_SIZE: int = 500
+    INTEREST_FLUSH_INTERVAL: float = 1.0
+    # Declarations buffered per worker before new ones are rejected with a 503
+    INTEREST_MAX_PENDING: int = 10_000
+    # Seconds to cache whether an animal accepts declarations, per worker
+    INTEREST_ANIMAL_CACHE_SECONDS: float = 30.0
+
+    # Activity log entries are queued and inserted in batches
+    ACTIVITY_LOG_BATCH_SIZE: int = 1000
+    ACTIVITY_LOG_FLUSH_INTERVAL: float = 2.0
+    ACTIVITY_LOG_MAX_PENDING: int = 50_000
+    # Months of activity kept by prune-activity-log
+    ACTIVITY_LOG_RETENTION_MONTHS: int = 12
+    # Buffered rows that can't be written on shutdown are saved here and written on startup
+    SPOOL_PATH: str = "./spool"
+
+    # Email
+    EMAIL_BACKEND: str = "console"
+    EMAIL_FROM_ADDRESS: str = "noreply@openadopt.org"
+    EMAIL_FROM_NAME: str = "OpenAdopt"
+    EMAIL_SMTP_HOST: str = "localhost"
+    EMAIL_SMTP_PORT: int = 587
+    EMAIL_SMTP_USERNAME: str | None = None
+    EMAIL_SMTP_PASSWORD: str | None = None
+    EMAIL_SMTP_USE_TLS: bool = True
+    EMAIL_SMTP_TIMEOUT: float = 10.0
+    # Emails are written to an outbox with the change that causes them and sent by a
+    # background worker
+    EMAIL_OUTBOX_POLL_INTERVAL: float = 5.0
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    # Failed sends are retried after EMAIL_OUTBOX_RETRY_SECONDS, doubling on every attempt
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    EMAIL_OUTBOX_RETRY_SECONDS: float = 30.0
+    # Days sent emails are kept in the outbox
+    EMAIL_OUTBOX_RETENTION_DAYS: int = 7
+    # Group the notifications of each admin into one email every EMAIL_DIGEST_INTERVAL
+    EMAIL_DIGEST_ENABLED: bool = False
+    EMAIL_DIGEST_INTERVAL: float = 3600.0
 
     # Storage
     STORAGE_BACKEND: str = "local"
     STORAGE_LOCAL_PATH: str
     STORAGE_LOCAL_URL: str
 
+    @field_validator("DATABASE_REPLICA_URLS", mode="before")
+    @classmethod
+    def split_replica_urls(cls, v):
+        if isinstance(v, str):
+            return [url.strip() for url in v.split(",") if url.strip()]
+        return v
+
     class Config:
         env_file = "../.env"
         extra = "ignore"
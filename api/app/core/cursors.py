@@ -0,0 +1,23 @@
+"""
+Opaque cursors for keyset pagination over (updated_at, id).
+
+A cursor is `<updated_at in microseconds>_<id>`, so it round trips exactly, unlike a
+timestamp formatted as a float or a string in the database's time zone.
+"""
+
+from datetime import datetime
+
+from app.core.etags import EPOCH, MICROSECOND
+
+
+def encode_cursor(updated_at: datetime, id: int) -> str:
+    return f"{(updated_at - EPOCH) // MICROSECOND}_{id}"
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Raises ValueError if the cursor is malformed."""
+    microseconds, _, id = cursor.partition("_")
+    if not microseconds.isdigit() or not id.isdigit():
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+    return EPOCH + int(microseconds) * MICROSECOND, int(id)
@@ -2,29 +2,208 @@
 Database configuration and session management.
 """
 
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+import asyncio
+import itertools
+import logging
+import time
+import uuid
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.exc import CompileError, DBAPIError, SQLAlchemyError, StatementError
+from sqlalchemy.ext.asyncio import (
+    create_async_engine,
+    async_sessionmaker,
+    AsyncEngine,
+    AsyncSession,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.types import DateTime
 from datetime import datetime, timezone
 from typing import Optional, AsyncGenerator
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+REPLICA_HEALTH_CHECK_TIMEOUT = 2.0  # seconds
+
+# SQLSTATE classes of the errors caused by the values inserted, data exceptions (e.g. an
+# invalid enum value) and integrity constraint violations (e.g. a deleted animal)
+ROW_ERROR_SQLSTATE_CLASSES = ("22", "23")
+
+
+class PoolWaitStats:
+    """Cumulative time spent waiting to check out a connection from the pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, wait_seconds: float) -> None:
+        self.checkouts += 1
+        self.total_wait_seconds += wait_seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waits for a connection (or opens one)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_stats.record(time.perf_counter() - start)
+
+
+def get_connect_args(url: str) -> dict:
+    """asyncpg connection arguments for the configured statement cache mode."""
+    if not url.startswith("postgresql+asyncpg"):
+        return {}
+
+    if settings.DATABASE_PGBOUNCER_MODE:
+        # PgBouncer in transaction mode may hand each transaction a different server
+        # connection, so prepared statements can't be cached or reused by name.
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+
+    connect_args = {
+        "statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+    }
+    if settings.DATABASE_STATEMENT_TIMEOUT > 0:
+        # Sent with the connection startup, no extra round trip
+        connect_args["server_settings"] = {
+            "statement_timeout": str(int(settings.DATABASE_STATEMENT_TIMEOUT * 1000))
+        }
+
+    return connect_args
+
+
+def create_engine(url: str) -> AsyncEngine:
+    """Create an async engine with the configured pool settings."""
+    return create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        poolclass=InstrumentedPool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+        connect_args=get_connect_args(url),
+    )
+
+
+def create_session_maker(db_engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        db_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+
 
 # Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_size=5,
-    max_overflow=10,
-)
+engine = create_engine(settings.DATABASE_URL)
 
 # Create session factory
-async_session_maker = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
+async_session_maker = create_session_maker(engine)
+
+
+class Replica:
+    """A read replica and the result of its last health check."""
+
+    def __init__(self, url: str):
+        self.engine = create_engine(url)
+        self.session_maker = create_session_maker(self.engine)
+        self.healthy = True
+        self.next_check = 0.0
+
+    async def is_healthy(self) -> bool:
+        now = time.monotonic()
+        if now < self.next_check:
+            return self.healthy
+
+        # Mark the check as done before awaiting, so concurrent requests don't pile up on it
+        self.next_check = now + settings.DATABASE_REPLICA_HEALTH_CHECK_INTERVAL
+        try:
+            async with asyncio.timeout(REPLICA_HEALTH_CHECK_TIMEOUT):
+                async with self.engine.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+            self.healthy = True
+        except Exception as e:
+            logger.warning(f"Read replica {self.engine.url!r} failed its health check: {e}")
+            self.healthy = False
+
+        return self.healthy
+
+
+class ReplicaRouter:
+    """
+    Round-robin routing of read-only sessions across the configured read replicas.
+
+    Falls back to the primary when no replica is healthy, and keeps a client on the
+    primary for a short while after it writes, so it always reads its own writes.
+    Stickiness is tracked per worker process, with or without replicas, since coalesced
+    reads also need to know when a client last wrote (see SingleFlight).
+    """
+
+    def __init__(self, urls: list[str]):
+        self.replicas = [Replica(url) for url in urls]
+        self._next = itertools.cycle(self.replicas)
+        self._recent_writes: dict[int, float] = {}
+
+    @staticmethod
+    def _client_key(request: Request) -> int:
+        client = request.headers.get("authorization") or (
+            request.client.host if request.client else ""
+        )
+        return hash(client)
+
+    def mark_write(self, request: Request) -> None:
+        now = time.monotonic()
+        if len(self._recent_writes) > 10_000:
+            cutoff = now - settings.DATABASE_REPLICA_STICKINESS_SECONDS
+            self._recent_writes = {
+                key: written for key, written in self._recent_writes.items() if written > cutoff
+            }
+        self._recent_writes[self._client_key(request)] = now
+
+    def last_write(self, request: Request) -> float | None:
+        """Monotonic time of the client's last write, if within the stickiness window."""
+        written = self._recent_writes.get(self._client_key(request))
+        if written is None:
+            return None
+        if written + settings.DATABASE_REPLICA_STICKINESS_SECONDS <= time.monotonic():
+            return None
+
+        return written
+
+    async def get_session_maker(self, request: Request) -> async_sessionmaker[AsyncSession]:
+        if not self.replicas:
+            return async_session_maker
+
+        if self.last_write(request) is not None:
+            return async_session_maker
+
+        for _ in range(len(self.replicas)):
+            replica = next(self._next)
+            if await replica.is_healthy():
+                return replica.session_maker
+
+        return async_session_maker
+
+
+replica_router = ReplicaRouter(settings.DATABASE_REPLICA_URLS)
 
 
 # Base model with common fields
@@ -55,3 +234,88 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     async with async_session_maker() as session:
         yield session
+
+
+async def get_read_session_maker(request: Request) -> async_sessionmaker[AsyncSession]:
+    """
+    Dependency for getting the session maker of read-only endpoints.
+
+    Bound to a read replica when DATABASE_REPLICA_URLS is set, otherwise to the primary.
+    """
+    return await replica_router.get_session_maker(request)
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for getting async database sessions for read-only endpoints.
+
+    Sessions are bound to a read replica when DATABASE_REPLICA_URLS is set,
+    otherwise to the primary. Never use them for writes.
+    """
+    session_maker = await get_read_session_maker(request)
+    async with session_maker() as session:
+        yield session
+
+
+async def warm_up_engine(db_engine: AsyncEngine, connections: int) -> None:
+    """Open connections up front, so the first requests don't pay for connecting."""
+    connections = min(connections, settings.DATABASE_POOL_SIZE)
+    if connections <= 0:
+        return
+
+    async def connect():
+        connection = await db_engine.connect()
+        try:
+            await connection.execute(text("SELECT 1"))
+        except Exception:
+            await connection.close()
+            raise
+        return connection
+
+    # Hold every connection until all are open, so each checkout creates a new one
+    results = await asyncio.gather(*(connect() for _ in range(connections)), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            logger.warning(f"Warming up {db_engine.url!r} failed: {result}")
+        else:
+            await result.close()
+
+
+async def warm_up_engines() -> None:
+    engines = [engine] + [replica.engine for replica in replica_router.replicas]
+    await asyncio.gather(
+        *(warm_up_engine(db_engine, settings.DATABASE_POOL_WARMUP) for db_engine in engines)
+    )
+
+
+async def dispose_engines() -> None:
+    for replica in replica_router.replicas:
+        await replica.engine.dispose()
+    await engine.dispose()
+
+
+def get_pool_stats(db_engine: AsyncEngine | None = None) -> dict:
+    """Snapshot of the connection pool usage of this worker."""
+    pool = (db_engine or engine).sync_engine.pool
+    wait_stats = pool.wait_stats
+
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "checkouts": wait_stats.checkouts,
+        "checkout_wait_seconds_total": wait_stats.total_wait_seconds,
+        "checkout_wait_seconds_max": wait_stats.max_wait_seconds,
+    }
+
+
+def is_row_error(error: SQLAlchemyError) -> bool:
+    """Whether an insert failed because of the rows, rather than e.g. the connection."""
+    if isinstance(error, DBAPIError):
+        sqlstate = getattr(error.orig, "sqlstate", None) or ""
+        return sqlstate[:2] in ROW_ERROR_SQLSTATE_CLASSES
+
+    # Raised before the statement is sent, e.g. a value of the wrong type or an unknown field
+    return isinstance(error, (CompileError, StatementError))
@@ -0,0 +1,223 @@
+"""
+Request deadlines and cancellation.
+
+Every request runs within a time budget, REQUEST_TIMEOUT by default, or the budget of its
+route in the table given to the middleware. The budget is picked from the method and path
+before the app runs, so it covers reading the request body as well, e.g. a slow upload.
+When the budget runs out the request is cancelled, along with the query in flight (asyncpg
+sends the server a cancel request), and answered with a 504 if no response was started. A
+request is cancelled the same way when its client disconnects before the response is
+complete, so abandoned requests stop using the database.
+
+Transactions begun on a route with its own budget, lower than DATABASE_STATEMENT_TIMEOUT
+(the default statement_timeout of the connections), set the time remaining as their
+statement_timeout. The database then stops on its own even if the worker can't cancel,
+e.g. while its event loop is blocked. This costs a statement per transaction, so only the
+routes given a tighter budget pay for it.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from contextvars import ContextVar
+from typing import Sequence
+
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import http_requests_cancelled_total
+
+logger = logging.getLogger(__name__)
+
+# Status of requests the client abandoned, as logged by nginx
+CLIENT_CLOSED_REQUEST = 499
+
+
+class RequestDeadline:
+    """Time budget of the current request, backed by the timeout the request runs in."""
+
+    def __init__(self, timeout: asyncio.Timeout):
+        self.loop = asyncio.get_running_loop()
+        self.start = self.loop.time()
+        self.timeout = timeout
+        # Set by routes with a budget of their own
+        self.budget: float | None = None
+        self.active = True
+        self.disconnected = False
+
+    def set_budget(self, seconds: float | None) -> None:
+        """Give the request `seconds` from its start, or no deadline with None."""
+        if self.active:
+            self.budget = seconds
+            self.timeout.reschedule(None if seconds is None else self.start + seconds)
+
+    def remaining(self) -> float | None:
+        when = self.timeout.when()
+        return None if when is None else when - self.loop.time()
+
+    def cancel(self) -> None:
+        """Cancel the request now, e.g. after its client disconnected."""
+        if self.active and not self.timeout.expired():
+            self.timeout.reschedule(self.loop.time())
+
+
+_current_deadline: ContextVar[RequestDeadline | None] = ContextVar("deadline", default=None)
+
+
+def get_current_deadline() -> RequestDeadline | None:
+    return _current_deadline.get()
+
+
+@event.listens_for(Session, "after_begin")
+def _set_statement_timeout(session, transaction, connection):
+    current = _current_deadline.get()
+    if current is None or not current.active or current.budget is None:
+        return
+
+    # Requests on the default deadline are cancelled by the worker, and their statements
+    # bounded by the connection default
+    remaining = current.remaining()
+    default = settings.DATABASE_STATEMENT_TIMEOUT
+    if default > 0 and remaining >= default:
+        return
+
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {max(int(remaining * 1000), 1)}")
+
+
+class DisconnectWatcher:
+    """
+    Receives the request messages ahead of the app, to notice the client disconnecting
+    while the request is being handled.
+
+    Body chunks are read no faster than the app consumes them, only the last one is read
+    ahead, as apps that don't need the body never ask for it.
+    """
+
+    def __init__(self, receive: Receive, on_disconnect):
+        self._receive = receive
+        self.on_disconnect = on_disconnect
+        self.messages: deque[Message] = deque()
+        self.available = asyncio.Event()
+        self.consumed = asyncio.Event()
+
+    async def run(self) -> None:
+        while True:
+            message = await self._receive()
+            self.consumed.clear()
+            self.messages.append(message)
+            self.available.set()
+
+            if message["type"] == "http.disconnect":
+                self.on_disconnect()
+                return
+            if message.get("more_body", False):
+                await self.consumed.wait()
+
+    async def receive(self) -> Message:
+        while not self.messages:
+            self.available.clear()
+            await self.available.wait()
+
+        message = self.messages[0]
+        # Keep the disconnect message, it is the answer to every later call as well
+        if message["type"] != "http.disconnect":
+            self.messages.popleft()
+        self.consumed.set()
+
+        return message
+
+
+class DeadlineMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        timeout: float,
+        budgets: Sequence[tuple[str, str, float | None]] = (),
+    ):
+        """
+        `budgets` lists the routes with a budget of their own as (method, path, seconds),
+        with paths in the route syntax and None for routes without a deadline, e.g.:
+
+            [("POST", "/admin/animals/{animal_id}/files", 120.0)]
+        """
+        self.app = app
+        self.timeout = timeout
+        self.budgets = [
+            (method, compile_path(path)[0], seconds) for method, path, seconds in budgets
+        ]
+
+    def get_budget(self, scope: Scope) -> tuple[bool, float | None]:
+        """Whether the route of the request has a budget of its own, and that budget."""
+        for method, path_regex, seconds in self.budgets:
+            if scope["method"] == method and path_regex.match(scope["path"]):
+                return True, seconds
+
+        return False, None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+        response_complete = False
+        request_deadline: RequestDeadline | None = None
+
+        def on_disconnect() -> None:
+            if request_deadline is not None and not response_complete:
+                request_deadline.disconnected = True
+                request_deadline.cancel()
+
+        watcher = DisconnectWatcher(receive, on_disconnect)
+
+        async def send_tracked(message: Message) -> None:
+            nonlocal response_started, response_complete
+
+            if message["type"] == "http.response.start":
+                response_started = True
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                # The budget covers producing the response, not the client reading it
+                response_complete = True
+                request_deadline.set_budget(None)
+            await send(message)
+
+        watcher_task = asyncio.create_task(watcher.run())
+        try:
+            async with asyncio.timeout(self.timeout) as timeout:
+                request_deadline = RequestDeadline(timeout)
+                has_budget, seconds = self.get_budget(scope)
+                if has_budget:
+                    request_deadline.set_budget(seconds)
+                token = _current_deadline.set(request_deadline)
+                try:
+                    await self.app(scope, watcher.receive, send_tracked)
+                finally:
+                    request_deadline.active = False
+                    _current_deadline.reset(token)
+        except TimeoutError:
+            if not request_deadline.timeout.expired():
+                # Raised by the app itself, not by the deadline
+                raise
+
+            path = f"{scope['method']} {scope['path']}"
+            if request_deadline.disconnected:
+                http_requests_cancelled_total.inc(reason="disconnect")
+                logger.info(f"Cancelled {path}, the client disconnected")
+                # Nobody reads it, but the middleware around expects a response
+                status_code, detail = CLIENT_CLOSED_REQUEST, "Client closed the request"
+            else:
+                http_requests_cancelled_total.inc(reason="deadline")
+                logger.warning(f"Cancelled {path}, it ran past its deadline")
+                status_code, detail = 504, "Request timed out"
+
+            if response_started:
+                # Too late for an error response, the client gets a truncated body
+                return
+            response = JSONResponse(status_code=status_code, content={"detail": detail})
+            await response(scope, receive, send)
+        finally:
+            watcher_task.cancel()
@@ -0,0 +1,12 @@
+import logging
+
+from app.core.email.interface import EmailBackend
+
+logger = logging.getLogger(__name__)
+
+
+class ConsoleEmail(EmailBackend):
+    """Email backend that logs emails instead of sending them, for development"""
+
+    async def send(self, to: list[str], subject: str, body: str, html: str | None = None) -> None:
+        logger.info(f"Email to {', '.join(to)}: {subject}\n{body}")
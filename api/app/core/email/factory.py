@@ -0,0 +1,24 @@
+from functools import lru_cache
+
+from app.core.config import settings
+from app.core.email.console import ConsoleEmail
+from app.core.email.interface import EmailBackend
+from app.core.email.smtp import SMTPEmail
+
+
+@lru_cache
+def get_email_backend() -> EmailBackend:
+    """
+    Factory function to get the configured email backend.
+
+    The backend is created once and shared, so the SMTP connection is reused.
+
+    Returns:
+        EmailBackend instance based on EMAIL_BACKEND
+    """
+    if settings.EMAIL_BACKEND == "console":
+        return ConsoleEmail()
+    elif settings.EMAIL_BACKEND == "smtp":
+        return SMTPEmail()
+    else:
+        raise ValueError(f"Unknown email backend: {settings.EMAIL_BACKEND}")
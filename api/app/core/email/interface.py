@@ -0,0 +1,33 @@
+from abc import ABC, abstractmethod
+from typing import NamedTuple
+
+
+class Email(NamedTuple):
+    to: list[str]
+    subject: str
+    body: str
+    html: str | None = None
+
+
+class EmailBackend(ABC):
+    """Abstract interface for email backends"""
+
+    @abstractmethod
+    async def send(self, to: list[str], subject: str, body: str, html: str | None = None) -> None:
+        pass
+
+    async def send_batch(self, emails: list[Email]) -> list[Exception | None]:
+        """Send several emails, returning for each one the error or None if it was sent."""
+        results = []
+        for email in emails:
+            try:
+                await self.send(*email)
+                results.append(None)
+            except Exception as e:
+                results.append(e)
+
+        return results
+
+    async def close(self) -> None:
+        """Release connections held by the backend."""
+        pass
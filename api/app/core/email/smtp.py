@@ -0,0 +1,111 @@
+import logging
+import smtplib
+import threading
+from email.message import EmailMessage
+from email.utils import formataddr
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.email.interface import Email, EmailBackend
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPEmail(EmailBackend):
+    """
+    SMTP email backend
+
+    Keeps one connection open and reuses it for every email, instead of connecting,
+    negotiating TLS and logging in for each one. smtplib is blocking, so batches are sent
+    from a worker thread, one at a time. Servers close idle connections after a while,
+    the connection is then reopened on the next send.
+    """
+
+    def __init__(self):
+        self.host = settings.EMAIL_SMTP_HOST
+        self.port = settings.EMAIL_SMTP_PORT
+        self.username = settings.EMAIL_SMTP_USERNAME
+        self.password = settings.EMAIL_SMTP_PASSWORD
+        self.use_tls = settings.EMAIL_SMTP_USE_TLS
+        self.sender = formataddr((settings.EMAIL_FROM_NAME, settings.EMAIL_FROM_ADDRESS))
+        self.connection: smtplib.SMTP | None = None
+        self.lock = threading.Lock()
+
+    async def send(self, to: list[str], subject: str, body: str, html: str | None = None) -> None:
+        [error] = await self.send_batch([Email(to, subject, body, html)])
+        if error is not None:
+            raise error
+
+    async def send_batch(self, emails: list[Email]) -> list[Exception | None]:
+        return await run_in_threadpool(self._send_batch, emails)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self._close)
+
+    def _send_batch(self, emails: list[Email]) -> list[Exception | None]:
+        results = []
+        with self.lock:
+            for email in emails:
+                try:
+                    self._send_message(self._build_message(email))
+                    results.append(None)
+                except Exception as e:
+                    results.append(e)
+
+        return results
+
+    def _send_message(self, message: EmailMessage) -> None:
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = self._connect()
+            try:
+                self.connection.send_message(message)
+                return
+            except smtplib.SMTPServerDisconnected:
+                # The server closed the idle connection, reconnect once
+                self.connection = None
+                if attempt:
+                    raise
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+                # Rejected by the server, the connection is still usable
+                raise
+            except Exception:
+                self._close()
+                raise
+
+    def _connect(self) -> smtplib.SMTP:
+        logger.info(f"Connecting to SMTP server {self.host}:{self.port}")
+        connection = smtplib.SMTP(self.host, self.port, timeout=settings.EMAIL_SMTP_TIMEOUT)
+        try:
+            if self.use_tls:
+                connection.starttls()
+            if self.username:
+                connection.login(self.username, self.password or "")
+        except Exception:
+            connection.close()
+            raise
+
+        return connection
+
+    def _close(self) -> None:
+        if self.connection is None:
+            return
+        try:
+            self.connection.quit()
+        except smtplib.SMTPException:
+            self.connection.close()
+        except OSError:
+            pass
+        self.connection = None
+
+    def _build_message(self, email: Email) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = ", ".join(email.to)
+        message["Subject"] = email.subject
+        message.set_content(email.body)
+        if email.html:
+            message.add_alternative(email.html, subtype="html")
+
+        return message
@@ -0,0 +1,59 @@
+"""
+Weak ETags derived from a row's id and updated_at.
+
+`Base.updated_at` changes on every write, so `W/"<id>-<updated_at in microseconds>"`
+identifies a version of a row without hashing its serialized body. Because the tag encodes
+updated_at, an If-Match header can be turned back into the versions a write is allowed to
+apply to and checked in the UPDATE's WHERE clause. If-Match uses the weak comparison, as
+these tags are only ever weak.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def make_etag(id: int, updated_at: datetime) -> str:
+    return f'W/"{id}-{(updated_at - EPOCH) // MICROSECOND}"'
+
+
+def parse_etags(header: str) -> list[str]:
+    """Opaque tags of an If-Match or If-None-Match header, without the W/ prefix."""
+    tags = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag:
+            tags.append(tag)
+
+    return tags
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    tags = parse_etags(header)
+    return "*" in tags or parse_etags(etag)[0] in tags
+
+
+def parse_versions(header: str | None, id: int) -> list[datetime] | None:
+    """
+    Turn an If-Match header into the updated_at values a write may apply to.
+
+    Returns None when there is no condition (no header or `*`), and an empty list when
+    none of the tags can match the row, so the write fails its precondition.
+    """
+    if header is None:
+        return None
+
+    tags = parse_etags(header)
+    if "*" in tags:
+        return None
+
+    versions = []
+    for tag in tags:
+        tag_id, _, microseconds = tag.strip('"').partition("-")
+        if tag_id == str(id) and microseconds.isdigit():
+            versions.append(EPOCH + int(microseconds) * MICROSECOND)
+
+    return versions
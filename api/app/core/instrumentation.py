@@ -0,0 +1,153 @@
+"""
+Per-request instrumentation of SQL statements, response rendering and storage calls.
+
+SQLAlchemy cursor events record each statement into the QueryStats of the current
+request, which is tracked with a contextvar so concurrent requests don't mix.
+"""
+
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryStats:
+    """Statements executed and time spent while a request or a capture is active."""
+
+    def __init__(self, parent: "QueryStats | None" = None, keep_statements: bool = False):
+        self.parent = parent
+        self.keep_statements = keep_statements
+        self.query_count = 0
+        self.db_seconds = 0.0
+        self.serialization_seconds = 0.0
+        self.storage_seconds = 0.0
+        self.statements: list[str] = []
+
+    def record_query(self, statement: str, seconds: float) -> None:
+        stats = self
+        while stats is not None:
+            stats.query_count += 1
+            stats.db_seconds += seconds
+            if stats.keep_statements:
+                stats.statements.append(statement)
+            stats = stats.parent
+
+    def record_serialization(self, seconds: float) -> None:
+        stats = self
+        while stats is not None:
+            stats.serialization_seconds += seconds
+            stats = stats.parent
+
+    def record_storage(self, seconds: float) -> None:
+        stats = self
+        while stats is not None:
+            stats.storage_seconds += seconds
+            stats = stats.parent
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def get_current_stats() -> QueryStats | None:
+    return _current_stats.get()
+
+
+@contextmanager
+def capture_queries(keep_statements: bool = False) -> Iterator[QueryStats]:
+    """
+    Collect the statements executed inside the block.
+
+    Captures nest, statements are recorded in every enclosing capture as well.
+    """
+    stats = QueryStats(parent=_current_stats.get(), keep_statements=keep_statements)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryStats]:
+    """
+    Fail if the block executes more than limit statements.
+
+    Usage in tests:
+        with assert_max_queries(3):
+            await client.get("/admin/animals/")
+    """
+    with capture_queries(keep_statements=True) as stats:
+        yield stats
+
+    if stats.query_count > limit:
+        statements = "\n".join(f"  {statement}" for statement in stats.statements)
+        raise AssertionError(
+            f"Expected at most {limit} queries, {stats.query_count} were executed:\n{statements}"
+        )
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is not None and conn.info.get("query_start_time"):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        stats.record_query(statement, elapsed)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start_time"):
+        connection.info["query_start_time"].pop()
+
+
+def timed_storage(method):
+    """Decorator recording the time spent in an async storage backend method."""
+
+    @functools.wraps(method)
+    async def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            stats = _current_stats.get()
+            if stats is not None:
+                stats.record_storage(time.perf_counter() - start)
+
+    return timed
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSON response that records its rendering time in the current request stats."""
+
+    def render(self, content) -> bytes:
+        start = time.perf_counter()
+        body = super().render(content)
+
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record_serialization(time.perf_counter() - start)
+
+        return body
+
+
+def server_timing_header(stats: QueryStats, total_seconds: float) -> str:
+    return ", ".join(
+        [
+            f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.query_count} queries"',
+            f"serialization;dur={stats.serialization_seconds * 1000:.1f}",
+            f"storage;dur={stats.storage_seconds * 1000:.1f}",
+            f"total;dur={total_seconds * 1000:.1f}",
+        ]
+    )
@@ -0,0 +1,54 @@
+"""
+Application lifecycle: readiness, background tasks and graceful shutdown.
+
+Uvicorn stops accepting connections and waits for in-flight requests on SIGTERM before
+running the lifespan shutdown. The lifespan then drains the background tasks created
+through `lifecycle.create_task` and runs the registered shutdown callbacks, before the
+database engines are disposed.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Coroutine
+
+logger = logging.getLogger(__name__)
+
+
+class Lifecycle:
+    def __init__(self):
+        self.ready = False
+        self.draining = False
+        self.tasks: set[asyncio.Task] = set()
+        self.shutdown_callbacks: list[Callable[[], Awaitable[None]]] = []
+
+    def create_task(self, coro: Coroutine, name: str | None = None) -> asyncio.Task:
+        """Run a coroutine in the background, it is awaited before the app shuts down."""
+        task = asyncio.create_task(coro, name=name)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    def on_shutdown(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """Register a callback that runs on shutdown, in reverse order of registration."""
+        self.shutdown_callbacks.append(callback)
+
+    async def shutdown(self, timeout: float) -> None:
+        self.ready = False
+        self.draining = True
+
+        for callback in reversed(self.shutdown_callbacks):
+            try:
+                await asyncio.wait_for(callback(), timeout)
+            except Exception as e:
+                logger.warning(f"Shutdown callback {callback!r} failed: {e}")
+
+        if self.tasks:
+            logger.info(f"Waiting for {len(self.tasks)} background tasks to finish")
+            _, pending = await asyncio.wait(self.tasks, timeout=timeout)
+            for task in pending:
+                logger.warning(f"Cancelling background task {task.get_name()}")
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+lifecycle = Lifecycle()
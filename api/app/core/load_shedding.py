@@ -0,0 +1,81 @@
+"""
+Load shedding middleware.
+
+Each worker handles at most MAX_CONCURRENT_REQUESTS requests at once. Requests beyond the
+limit wait for a slot, up to REQUEST_QUEUE_SIZE of them for at most REQUEST_QUEUE_TIMEOUT
+seconds, and the others are rejected right away with a 503 and a Retry-After header. Under
+overload clients get a quick answer to back off on, instead of queueing without bound behind
+requests that would then miss their deadlines as well.
+
+Paths that must answer under load or stay open for long (health checks, metrics, event
+streams) are exempt and don't take a slot.
+"""
+
+import asyncio
+import logging
+import math
+
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.metrics import http_requests_queued, http_requests_shed_total
+
+logger = logging.getLogger(__name__)
+
+
+class ConcurrencyLimitMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_concurrent: int = 100,
+        queue_size: int = 100,
+        queue_timeout: float = 2.0,
+        exempt_paths: tuple[str, ...] = (),
+    ):
+        self.app = app
+        self.slots = asyncio.Semaphore(max_concurrent)
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.exempt_paths = exempt_paths
+        self.waiting = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.acquire():
+            http_requests_shed_total.inc()
+            logger.warning(f"Rejected {scope['method']} {scope['path']}, the worker is busy")
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server is busy, please retry later"},
+                headers={"Retry-After": str(max(math.ceil(self.queue_timeout), 1))},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.slots.release()
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in the bounded queue if none is free."""
+        if not self.slots.locked():
+            await self.slots.acquire()
+            return True
+
+        if self.waiting >= self.queue_size:
+            return False
+
+        self.waiting += 1
+        http_requests_queued.inc()
+        try:
+            await asyncio.wait_for(self.slots.acquire(), self.queue_timeout)
+            return True
+        except TimeoutError:
+            return False
+        finally:
+            self.waiting -= 1
+            http_requests_queued.dec()
@@ -0,0 +1,220 @@
+"""
+Minimal in-process metrics rendered in the Prometheus text exposition format.
+
+Metrics are kept per worker process, so Prometheus should scrape every worker
+(or the deployment should run a single worker per container).
+"""
+
+import bisect
+from collections import defaultdict
+from typing import Callable, Iterable
+
+from app.core.database import engine, get_pool_stats, replica_router
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    labels = labels + extra
+    if not labels:
+        return ""
+
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type = ""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        callback: Callable[[], dict[Labels, float]] | None = None,
+    ):
+        self.name = name
+        self.description = description
+        # Metrics with a callback are read from it on every scrape instead of being set
+        self.callback = callback
+        self.values: dict[Labels, float] = defaultdict(float)
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        self.values[tuple(labels.items())] += amount
+
+    def samples(self) -> Iterable[str]:
+        values = self.callback() if self.callback else self.values
+        for labels, value in values.items():
+            yield f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.values[tuple(labels.items())] -= amount
+
+    def set(self, value: float, **labels: str) -> None:
+        self.values[tuple(labels.items())] = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, description)
+        self.buckets = buckets
+        # Per label set: non-cumulative bucket counts (last one is +Inf), sum and count
+        self.histograms: dict[Labels, list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(labels.items())
+        data = self.histograms.get(key)
+        if data is None:
+            data = self.histograms[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+
+        data[0][bisect.bisect_left(self.buckets, value)] += 1
+        data[1] += value
+        data[2] += 1
+
+    def samples(self) -> Iterable[str]:
+        for labels, (counts, total, count) in self.histograms.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = (("le", _format_value(bound)),)
+                yield f"{self.name}_bucket{_format_labels(labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(labels)} {count}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self.metrics) + "\n"
+
+
+def _pool_stat(key: str) -> Callable[[], dict[Labels, float]]:
+    def collect() -> dict[Labels, float]:
+        engines = [("primary", engine)] + [
+            (f"replica{index}", replica.engine)
+            for index, replica in enumerate(replica_router.replicas)
+        ]
+        return {
+            (("database", name),): get_pool_stats(db_engine)[key] for name, db_engine in engines
+        }
+
+    return collect
+
+
+registry = Registry()
+
+http_requests_total = registry.register(
+    Counter("http_requests_total", "HTTP requests by method, route template and status code.")
+)
+http_request_duration_seconds = registry.register(
+    Histogram("http_request_duration_seconds", "HTTP request latency by route template.")
+)
+http_requests_in_flight = registry.register(
+    Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+)
+http_requests_cancelled_total = registry.register(
+    Counter(
+        "http_requests_cancelled_total", "Requests cancelled by reason (deadline or disconnect)."
+    )
+)
+http_requests_shed_total = registry.register(
+    Counter("http_requests_shed_total", "Requests rejected with a 503 at the concurrency limit.")
+)
+http_requests_queued = registry.register(
+    Gauge("http_requests_queued", "Requests waiting for a slot under the concurrency limit.")
+)
+upload_bytes_total = registry.register(
+    Counter("upload_bytes_total", "Bytes of files uploaded to the storage backend.")
+)
+rate_limited_requests_total = registry.register(
+    Counter("rate_limited_requests_total", "Requests rejected with a 429 by the limit hit.")
+)
+coalesced_requests_total = registry.register(
+    Counter("coalesced_requests_total", "Reads that shared the result of an identical call.")
+)
+change_feed_clients = registry.register(
+    Gauge("change_feed_clients", "Clients connected to the animal change stream.")
+)
+buffered_rows_written_total = registry.register(
+    Counter("buffered_rows_written_total", "Rows written in batches by buffered writer.")
+)
+buffered_rows_pending = registry.register(
+    Gauge("buffered_rows_pending", "Rows buffered in memory waiting to be written by writer.")
+)
+outbox_emails_total = registry.register(
+    Counter("outbox_emails_total", "Outbox emails by result (sent, retried or failed).")
+)
+cache_lookups_total = registry.register(
+    Counter("cache_lookups_total", "Cache lookups by cache name and result (hit or miss).")
+)
+db_pool_checked_out = registry.register(
+    Gauge(
+        "db_pool_checked_out_connections",
+        "Connections currently checked out from the pool.",
+        _pool_stat("checked_out"),
+    )
+)
+db_pool_overflow = registry.register(
+    Gauge(
+        "db_pool_overflow_connections",
+        "Connections open beyond the pool size.",
+        _pool_stat("overflow"),
+    )
+)
+db_pool_checkout_wait_seconds = registry.register(
+    Counter(
+        "db_pool_checkout_wait_seconds_total",
+        "Total time spent waiting to check out a connection.",
+        _pool_stat("checkout_wait_seconds_total"),
+    )
+)
+
+
+def _cache_hit_ratios() -> dict[Labels, float]:
+    lookups: dict[str, list[float]] = defaultdict(lambda: [0.0, 0.0])
+    for labels, value in cache_lookups_total.values.items():
+        label_values = dict(labels)
+        lookups[label_values["cache"]][label_values["result"] == "hit"] += value
+
+    return {
+        (("cache", cache),): hits / (misses + hits) for cache, (misses, hits) in lookups.items()
+    }
+
+
+cache_hit_ratio = registry.register(
+    Gauge("cache_hit_ratio", "Share of cache lookups that were hits.", _cache_hit_ratios)
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    cache_lookups_total.inc(cache=cache, result="hit" if hit else "miss")
@@ -0,0 +1,228 @@
+"""
+Opt-in sampling profiler for single requests.
+
+A super admin profiles a request by sending it with an `X-Profile` header or a `profile`
+query parameter. Its response is replaced by a report of where the request spent its time:
+
+    {"breakdown": {...}, "folded": "db;app.api.admin.animals:get_animals;... 12\\n..."}
+
+or with `profile=folded` just the folded stacks as text, the input format of flamegraph.pl,
+inferno and speedscope. The breakdown into handler, db, serialization and storage time
+comes from the request instrumentation. The stacks are sampled by a background thread every
+PROFILING_INTERVAL seconds: the running stack while the request's task runs, and the chain
+of coroutines it awaits on otherwise, so time spent waiting on the database or storage shows
+up as well. Each stack's root frame is its category, so the flamegraph splits by it first.
+While the event loop holds the GIL the thread samples at most once per switch interval
+(sys.getswitchinterval(), 5ms by default), so requests of a few milliseconds get a sample or
+two: profile them a few times, or rely on the breakdown.
+
+Requests without the flag only pay for looking up the header and query string.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.security.utils import get_authorization_scheme_param
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.dependencies import get_current_user, require_super_admin
+from app.core.database import async_session_maker
+from app.core.instrumentation import QueryStats, capture_queries
+from app.schemas.system import ProfileReport
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+PROFILE_PARAM = "profile"
+
+# Category of a stack, by the module of its innermost frame matching one of the prefixes
+CATEGORIES = (
+    ("storage", ("app.core.storage", "aiofiles")),
+    ("db", ("sqlalchemy", "asyncpg")),
+    ("serialization", ("app.core.responses", "pydantic", "fastapi.encoders", "json")),
+)
+
+
+def get_profile_format(scope: Scope) -> str | None:
+    """ "folded" or "json" if the request asks to be profiled, None otherwise."""
+    value = Headers(scope=scope).get(PROFILE_HEADER)
+    if value is None and PROFILE_PARAM.encode() in scope["query_string"]:
+        values = parse_qs(scope["query_string"].decode()).get(PROFILE_PARAM)
+        value = values[0] if values else None
+    if value is None or value.lower() in ("", "0", "false"):
+        return None
+
+    return "folded" if value.lower() == "folded" else "json"
+
+
+def frame_label(frame) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}"
+
+
+def categorize(frames: list) -> str:
+    for frame in reversed(frames):
+        module = frame.f_globals.get("__name__", "")
+        for category, prefixes in CATEGORIES:
+            if any(module == prefix or module.startswith(prefix + ".") for prefix in prefixes):
+                return category
+
+    return "handler"
+
+
+class SamplingProfiler:
+    """Samples the stack of one task from a background thread, outermost frame first."""
+
+    def __init__(self, task: asyncio.Task, root_code, interval: float):
+        self.task = task
+        self.loop = task.get_loop()
+        self.thread_id = threading.get_ident()
+        # Frames outside this code object (the middleware) are the server's, left out
+        self.root_code = root_code
+        self.interval = interval
+        self.samples: Counter[tuple[str, ...]] = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="profiler", daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            try:
+                frames = self.get_frames()
+            except Exception:
+                # The task moved on while its stack was being read
+                continue
+            if frames:
+                self.samples[(categorize(frames), *map(frame_label, frames))] += 1
+
+    def get_frames(self) -> list:
+        if asyncio.current_task(self.loop) is self.task:
+            # Running: the stack of the event loop thread
+            frames = []
+            frame = sys._current_frames().get(self.thread_id)
+            while frame is not None:
+                if frame.f_code is self.root_code:
+                    return frames[::-1]
+                frames.append(frame)
+                frame = frame.f_back
+            # Between steps of the task, not in the request's code
+            return []
+
+        # Suspended: the coroutines it is awaiting, e.g. down to the query it waits for
+        frames = self.task.get_stack(limit=None)
+        for index, frame in enumerate(frames):
+            if frame.f_code is self.root_code:
+                return frames[index + 1 :]
+        return []
+
+    def folded(self) -> str:
+        """Stacks in the collapsed format, one "frame;frame;... count" line each."""
+        return "\n".join(f"{';'.join(stack)} {count}" for stack, count in self.samples.items())
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp, interval: float = 0.005):
+        self.app = app
+        self.interval = interval
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile_format = get_profile_format(scope)
+        if profile_format is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.authorize(scope)
+        except HTTPException as e:
+            response = JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+            await response(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_discarded(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        profiler = SamplingProfiler(
+            asyncio.current_task(), ProfilingMiddleware.__call__.__code__, self.interval
+        )
+        start = time.perf_counter()
+        with capture_queries() as stats:
+            profiler.start()
+            try:
+                await self.app(scope, receive, send_discarded)
+            finally:
+                profiler.stop()
+        total = time.perf_counter() - start
+
+        logger.info(
+            f"Profiled {scope['method']} {scope['path']} in {total * 1000:.1f}ms, "
+            f"{profiler.samples.total()} samples"
+        )
+        if profile_format == "folded":
+            response = PlainTextResponse(profiler.folded())
+        else:
+            report = self.build_report(scope, status_code, stats, total, profiler)
+            response = JSONResponse(report)
+        await response(scope, receive, send)
+
+    async def authorize(self, scope: Scope) -> None:
+        """Only super admins can profile requests, as with require_super_admin."""
+        scheme, token = get_authorization_scheme_param(Headers(scope=scope).get("authorization"))
+        if scheme.lower() != "bearer" or not token:
+            logger.warning("Profiling requested without credentials")
+            raise HTTPException(status_code=401, detail="Not authenticated")
+
+        credentials = HTTPAuthorizationCredentials(scheme=scheme, credentials=token)
+        async with async_session_maker() as db:
+            user = await get_current_user(credentials, db)
+        await require_super_admin(user)
+
+    def build_report(
+        self,
+        scope: Scope,
+        status_code: int,
+        stats: QueryStats,
+        total: float,
+        profiler: SamplingProfiler,
+    ) -> dict:
+        accounted = stats.db_seconds + stats.serialization_seconds + stats.storage_seconds
+        report = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "status_code": status_code,
+            "interval_ms": self.interval * 1000,
+            "samples": profiler.samples.total(),
+            "breakdown": {
+                "total_ms": total * 1000,
+                # Overlapping calls (e.g. concurrent storage deletes) can add up past the total
+                "handler_ms": max(total - accounted, 0) * 1000,
+                "db_ms": stats.db_seconds * 1000,
+                "serialization_ms": stats.serialization_seconds * 1000,
+                "storage_ms": stats.storage_seconds * 1000,
+                "queries": stats.query_count,
+            },
+            "folded": profiler.folded(),
+        }
+
+        return ProfileReport.model_validate(report).model_dump(mode="json")
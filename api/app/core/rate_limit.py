@@ -0,0 +1,70 @@
+"""
+Token bucket rate limiting.
+
+Each key has a bucket of `capacity` tokens that refills at `refill_per_second`, a request
+takes one token and is rejected while the bucket is empty. The in-memory backend keeps the
+buckets per worker process, so with several workers or instances the effective limit is
+multiplied by their number. A shared backend (e.g. Redis) can be added by implementing
+RateLimitBackend and selecting it with RATE_LIMIT_BACKEND.
+"""
+
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+from app.core.config import settings
+
+# Buckets kept in memory before the full ones are dropped
+MAX_MEMORY_BUCKETS = 100_000
+
+
+class RateLimitBackend(ABC):
+    """Abstract interface for rate limit backends"""
+
+    @abstractmethod
+    async def acquire(self, key: str, capacity: int, refill_per_second: float) -> float:
+        """Take a token, returning 0 if allowed or the seconds until a token is available."""
+        pass
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """In-process rate limit backend"""
+
+    def __init__(self, max_buckets: int = MAX_MEMORY_BUCKETS):
+        self.max_buckets = max_buckets
+        # key -> (tokens, last refill, time the bucket is full again)
+        self.buckets: dict[str, tuple[float, float, float]] = {}
+
+    async def acquire(self, key: str, capacity: int, refill_per_second: float) -> float:
+        now = time.monotonic()
+        tokens, updated, _ = self.buckets.get(key, (capacity, now, now))
+        tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+
+        if tokens < 1:
+            self.buckets[key] = (tokens, now, now + (capacity - tokens) / refill_per_second)
+            return (1 - tokens) / refill_per_second
+
+        tokens -= 1
+        self.buckets[key] = (tokens, now, now + (capacity - tokens) / refill_per_second)
+        if len(self.buckets) > self.max_buckets:
+            self.prune(now)
+
+        return 0.0
+
+    def prune(self, now: float) -> None:
+        # Full buckets behave as missing ones, so they can be dropped
+        self.buckets = {key: bucket for key, bucket in self.buckets.items() if bucket[2] > now}
+
+
+@lru_cache
+def get_rate_limit_backend() -> RateLimitBackend:
+    """
+    Factory function to get the configured rate limit backend.
+
+    Returns:
+        RateLimitBackend instance based on RATE_LIMIT_BACKEND
+    """
+    if settings.RATE_LIMIT_BACKEND == "memory":
+        return MemoryRateLimitBackend()
+    else:
+        raise ValueError(f"Unknown rate limit backend: {settings.RATE_LIMIT_BACKEND}")
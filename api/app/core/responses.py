@@ -0,0 +1,46 @@
+"""
+Fast JSON responses for read endpoints.
+
+Returning a pydantic model from a route makes FastAPI dump it, validate it again against
+the response_model and encode the result. model_response converts ORM objects to JSON
+bytes in one validation and one serialization pass with a cached TypeAdapter, and returns
+a Response FastAPI sends as is. Keep response_model on the route for the OpenAPI schema.
+"""
+
+import time
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.core.instrumentation import get_current_stats
+
+
+@lru_cache(maxsize=None)
+def get_type_adapter(model: Any) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+def dump_model_json(model: Any, content: Any) -> bytes:
+    """Serialize content (ORM objects, dicts or models) as the given model type."""
+    start = time.perf_counter()
+
+    adapter = get_type_adapter(model)
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+    stats = get_current_stats()
+    if stats is not None:
+        stats.record_serialization(time.perf_counter() - start)
+
+    return body
+
+
+def json_response(body: bytes, status_code: int = 200, headers: dict | None = None) -> Response:
+    return Response(
+        content=body, status_code=status_code, headers=headers, media_type="application/json"
+    )
+
+
+def model_response(model: Any, content: Any, status_code: int = 200) -> Response:
+    return json_response(dump_model_json(model, content), status_code)
@@ -1,13 +1,26 @@
+import asyncio
 import bcrypt
 import jwt
 import logging
 
 from datetime import datetime, timedelta, timezone
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Bounds the CPU spent on bcrypt, so a burst of logins can't starve the other requests
+verification_slots = asyncio.Semaphore(settings.PASSWORD_VERIFICATION_CONCURRENCY)
+
+
+class VerificationBusyError(Exception):
+    """Raised when no password verification slot frees up in time."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Too many concurrent logins")
+        self.retry_after = retry_after
+
 
 def hash_password(password: str) -> str:
     hashed = bcrypt.hashpw(password.encode(), bcrypt.gensalt())
@@ -18,6 +31,20 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
 
 
+async def verify_password_limited(plain_password: str, hashed_password: str) -> bool:
+    """Check a password in a worker thread, at most PASSWORD_VERIFICATION_CONCURRENCY at once."""
+    timeout = settings.PASSWORD_VERIFICATION_QUEUE_TIMEOUT
+    try:
+        await asyncio.wait_for(verification_slots.acquire(), timeout)
+    except TimeoutError:
+        raise VerificationBusyError(retry_after=timeout)
+
+    try:
+        return await run_in_threadpool(verify_password, plain_password, hashed_password)
+    finally:
+        verification_slots.release()
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     # If no custom token expiration provided, use default from settings
     if expires_delta is None:
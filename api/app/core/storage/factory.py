@@ -1,12 +1,17 @@
+from functools import lru_cache
+
 from app.core.config import settings
 from app.core.storage.interface import StorageBackend
 from app.core.storage.local import LocalStorage
 
 
+@lru_cache
 def get_storage_backend() -> StorageBackend:
     """
     Factory function to get the configured storage backend.
 
+    The backend is created once and shared, the app lifespan creates it on startup.
+
     Returns:
         StorageBackend instance based on STORAGE_BACKEND
     """
@@ -17,3 +17,18 @@ class StorageBackend(ABC):
     @abstractmethod
     async def file_exists(self, url: str) -> bool:
         pass
+
+    @abstractmethod
+    async def put_object(self, path: str, data: bytes, content_type: str) -> str:
+        """Write data at path, replacing it as a whole, and return its URL."""
+        pass
+
+    @abstractmethod
+    async def get_object(self, path: str) -> bytes | None:
+        """Read the data at path, None if there is nothing there."""
+        pass
+
+    @abstractmethod
+    async def delete_object(self, path: str) -> None:
+        """Delete the data at path, if there is any."""
+        pass
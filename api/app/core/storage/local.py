@@ -1,4 +1,5 @@
 import logging
+import os
 from pathlib import Path
 
 import aiofiles
@@ -6,6 +7,7 @@ import shutil
 from fastapi import UploadFile
 
 from app.core.config import settings
+from app.core.instrumentation import timed_storage
 from app.core.storage.interface import StorageBackend
 
 logger = logging.getLogger(__name__)
@@ -21,6 +23,7 @@ class LocalStorage(StorageBackend):
         # Create uploads dir if it doesn't exist
         self.base_path.mkdir(parents=True, exist_ok=True)
 
+    @timed_storage
     async def upload_file(self, file: UploadFile, path: str) -> str:
         file_path = Path(self.base_path / path)
         file_path.parent.mkdir(parents=True, exist_ok=True)
@@ -33,6 +36,7 @@ class LocalStorage(StorageBackend):
         logger.info(f"File {file.filename} uploaded successfully")
         return f"{self.base_url}/{path}"
 
+    @timed_storage
     async def delete_file(self, url: str) -> None:
         path = url.replace(self.base_url + "/", "")
         file_path = Path(self.base_path / path)
@@ -45,6 +49,7 @@ class LocalStorage(StorageBackend):
         logger.info(f"File at {url} deleted successfully")
         return
 
+    @timed_storage
     async def delete_dir(self, url: str) -> None:
         path = url.replace(self.base_url + "/", "")
         dir_path = Path(self.base_path / path)
@@ -54,7 +59,35 @@ class LocalStorage(StorageBackend):
 
         return
 
+    @timed_storage
     async def file_exists(self, url: str) -> bool:
         path = url.replace(self.base_url + "/", "")
         file_path = self.base_path / path
         return file_path.exists()
+
+    @timed_storage
+    async def put_object(self, path: str, data: bytes, content_type: str) -> str:
+        file_path = Path(self.base_path / path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temporary file and rename it over the old one, so readers never see
+        # a partially written file
+        tmp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.tmp")
+        async with aiofiles.open(tmp_path, "wb") as f:
+            await f.write(data)
+        os.replace(tmp_path, file_path)
+
+        return f"{self.base_url}/{path}"
+
+    @timed_storage
+    async def get_object(self, path: str) -> bytes | None:
+        file_path = Path(self.base_path / path)
+        try:
+            async with aiofiles.open(file_path, "rb") as f:
+                return await f.read()
+        except FileNotFoundError:
+            return None
+
+    @timed_storage
+    async def delete_object(self, path: str) -> None:
+        Path(self.base_path / path).unlink(missing_ok=True)
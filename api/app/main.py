@@ -2,20 +2,110 @@
 OpenAdopt API - Main application entry point.
 """
 
-from fastapi import FastAPI
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
+from sqlalchemy import text
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 
 from app.api.auth import router as auth_router
+from app.api.admin.activity import router as admin_activity_router
 from app.api.admin.animals import router as admin_animals_router
+from app.api.admin.system import router as admin_system_router
+from app.api.public.animals import router as public_animals_router
+from app.api.public.interests import router as public_interests_router
+from app.core.change_feed import change_feed
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.database import dispose_engines, engine, replica_router, warm_up_engines
+from app.core.deadlines import DeadlineMiddleware
+from app.core.instrumentation import TimedJSONResponse, capture_queries, server_timing_header
+from app.core.lifecycle import lifecycle
+from app.core.load_shedding import ConcurrencyLimitMiddleware
+from app.core.metrics import (
+    http_request_duration_seconds,
+    http_requests_in_flight,
+    http_requests_total,
+    registry,
+)
+from app.core.profiling import ProfilingMiddleware
+from app.core.storage.factory import get_storage_backend
+from app.services.activity_service import activity_writer
+from app.services.catalogue_service import catalogue_publisher
+from app.services.interest_service import interest_writer
+from app.services.outbox_service import outbox_worker
+from app.services.recommendation_service import similar_animals
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared resources on startup and release them on shutdown."""
+    get_storage_backend()
+    await warm_up_engines()
+    if settings.CHANGE_FEED_ENABLED:
+        change_feed.start()
+    interest_writer.start()
+    activity_writer.start()
+    outbox_worker.start()
+    similar_animals.start()
+    if settings.CATALOGUE_PUBLISH_ENABLED:
+        catalogue_publisher.start()
+    lifecycle.ready = True
+    logger.info("Application ready")
+
+    yield
+
+    logger.info("Application shutting down")
+    await lifecycle.shutdown(timeout=settings.SHUTDOWN_TIMEOUT)
+    await dispose_engines()
+
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
     version="0.1.0",
     debug=settings.DEBUG,
+    default_response_class=TimedJSONResponse,
+    lifespan=lifespan,
+)
+
+# Middleware added first runs innermost. Deadlines wrap the app directly, so cancelling a
+# request doesn't go through the task groups of the function middleware below. Routes
+# matched before the app runs, so upload budgets cover reading the upload as well.
+app.add_middleware(
+    DeadlineMiddleware,
+    timeout=settings.REQUEST_TIMEOUT,
+    budgets=[
+        ("GET", "/admin/animals/", settings.READ_REQUEST_TIMEOUT),
+        ("GET", "/admin/animals/changes", settings.READ_REQUEST_TIMEOUT),
+        # The stream stays open until the client leaves
+        ("GET", "/admin/animals/events", None),
+        ("POST", "/admin/animals/{animal_id}/photos/primary", settings.UPLOAD_REQUEST_TIMEOUT),
+        ("POST", "/admin/animals/{animal_id}/files", settings.UPLOAD_REQUEST_TIMEOUT),
+        ("GET", "/admin/activity/", settings.READ_REQUEST_TIMEOUT),
+        ("GET", "/animals/{animal_id}/similar", settings.READ_REQUEST_TIMEOUT),
+    ],
+)
+
+# Profiling middleware, only does anything for requests flagged by a super admin
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware, interval=settings.PROFILING_INTERVAL)
+
+# Load shedding middleware, inside CORS so browsers can read the 503
+app.add_middleware(
+    ConcurrencyLimitMiddleware,
+    max_concurrent=settings.MAX_CONCURRENT_REQUESTS,
+    queue_size=settings.REQUEST_QUEUE_SIZE,
+    queue_timeout=settings.REQUEST_QUEUE_TIMEOUT,
+    exempt_paths=("/health", "/metrics", "/admin/animals/events", "/uploads"),
 )
 
 # CORS middleware
@@ -25,8 +115,75 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let the web app read the ETag of an animal to send it back in If-Match
+    expose_headers=["ETag"],
+)
+
+# Compression middleware
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    cache_max_bytes=settings.COMPRESSION_CACHE_MAX_BYTES,
 )
 
+
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    """Keep clients on the primary database for a while after a successful write."""
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        replica_router.mark_write(request)
+    return response
+
+
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    """Report the SQL statements and time spent on each request."""
+    start = time.perf_counter()
+    with capture_queries() as stats:
+        response = await call_next(request)
+    total = time.perf_counter() - start
+
+    response.headers["Server-Timing"] = server_timing_header(stats, total)
+
+    if stats.query_count > settings.SLOW_REQUEST_QUERY_COUNT or (
+        total * 1000 > settings.SLOW_REQUEST_MS
+    ):
+        logger.warning(
+            f"Slow request {request.method} {request.url.path}: {stats.query_count} queries, "
+            f"{stats.db_seconds * 1000:.1f}ms in db, {total * 1000:.1f}ms total"
+        )
+
+    return response
+
+
+@app.middleware("http")
+async def collect_metrics(request: Request, call_next):
+    """Record request counts and latency labeled by route template."""
+    start = time.perf_counter()
+    http_requests_in_flight.inc()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        http_requests_in_flight.dec()
+        # Label by template (e.g. /admin/animals/{animal_id}) to keep cardinality bounded
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", "unmatched")
+        http_requests_total.inc(method=request.method, route=route_path, status=str(status_code))
+        http_request_duration_seconds.observe(
+            time.perf_counter() - start, method=request.method, route=route_path
+        )
+
+
+# Outermost, so the middleware above and the routes all see the client behind the proxy
+if settings.FORWARDED_ALLOW_IPS:
+    app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=settings.FORWARDED_ALLOW_IPS)
+
 # Mount uploads directory for local storage
 if settings.STORAGE_BACKEND == "local":
     uploads_path = Path(settings.STORAGE_LOCAL_PATH)
@@ -36,6 +193,10 @@ if settings.STORAGE_BACKEND == "local":
 # Include routers
 app.include_router(auth_router)
 app.include_router(admin_animals_router)
+app.include_router(admin_system_router)
+app.include_router(admin_activity_router)
+app.include_router(public_animals_router)
+app.include_router(public_interests_router)
 
 
 @app.get("/")
@@ -51,3 +212,26 @@ async def root():
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness check endpoint, verifies startup finished and the database is reachable."""
+    if not lifecycle.ready:
+        status = "draining" if lifecycle.draining else "starting"
+        return JSONResponse(status_code=503, content={"status": status})
+
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.warning(f"Readiness check failed: {e}")
+        return JSONResponse(status_code=503, content={"status": "unavailable"})
+
+    return {"status": "ready"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Metrics endpoint in the Prometheus text format."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,46 @@
+from datetime import datetime
+from enum import StrEnum
+from sqlalchemy import BigInteger, Identity, Index, Enum as SQLEnum
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.types import JSON, DateTime
+from typing import Optional
+
+from app.core.database import Base
+
+
+class ActivityEntityType(StrEnum):
+    ANIMAL = "animal"
+    INTEREST = "interest"
+    USER = "user"
+
+
+class ActivityLog(Base):
+    """
+    Append-only audit trail, range partitioned by month on created_at.
+
+    The partition key has to be part of the primary key, and rows are never updated or
+    soft deleted, old months are dropped as whole partitions (see ActivityService).
+    """
+
+    __tablename__ = "activity_log"
+    __table_args__ = (
+        Index("ix_activity_log_entity", "entity_type", "entity_id", "created_at"),
+        Index("ix_activity_log_user_id_created_at", "user_id", "created_at"),
+        # Rows are appended in time order, a BRIN index serves time ranges at a fraction
+        # of the size of a B-tree
+        Index("ix_activity_log_created_at", "created_at", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    updated_at = None
+    deleted_at = None
+
+    # No foreign key, entries outlive the users they refer to
+    user_id: Mapped[Optional[int]] = mapped_column(default=None)
+    action: Mapped[str]
+    entity_type: Mapped[ActivityEntityType] = mapped_column(SQLEnum(ActivityEntityType))
+    entity_id: Mapped[str]
+    details: Mapped[Optional[dict]] = mapped_column(JSON, default=None)
+    ip_address: Mapped[Optional[str]] = mapped_column(default=None)
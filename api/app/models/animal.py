@@ -1,8 +1,9 @@
+import json
 from enum import StrEnum
-from sqlalchemy import ForeignKey, Enum as SQLEnum
+from sqlalchemy import ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.types import Text
-from typing import Optional
+from sqlalchemy.types import JSON, String, Text
+from typing import List, Optional
 
 from app.core.database import Base
 
@@ -43,12 +44,19 @@ class AnimalCurrentLocation(StrEnum):
 
 class Animal(Base):
     __tablename__ = "animals"
+    # Keyset pagination of the changes feed, see AnimalService.get_changes
+    __table_args__ = (Index("ix_animals_updated_at_id", "updated_at", "id"),)
 
     created_by_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     created_by: Mapped["User"] = relationship(back_populates="animals")  # noqa
     name: Mapped[str]
     primary_photo_url: Mapped[Optional[str]] = mapped_column(default=None)
-    extra_photos_url: Mapped[Optional[str]] = mapped_column(Text, default=None)
+    photos: Mapped[List["AnimalPhoto"]] = relationship(
+        back_populates="animal",
+        order_by="AnimalPhoto.position",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
     species: Mapped[AnimalSpecies] = mapped_column(SQLEnum(AnimalSpecies))
     breed: Mapped[Optional[str]]
     size: Mapped[Optional[AnimalSize]] = mapped_column(
@@ -66,3 +74,23 @@ class Animal(Base):
     description: Mapped[Optional[str]] = mapped_column(Text, default=None)
     medical_notes: Mapped[Optional[str]] = mapped_column(Text, default=None)
     behavioral_notes: Mapped[Optional[str]] = mapped_column(Text, default=None)
+
+    @property
+    def extra_photos_url(self) -> Optional[str]:
+        # Kept for API compatibility, clients still expect a JSON encoded list of URLs.
+        # Requires photos to be loaded (see AnimalService, which uses selectinload).
+        urls = [photo.url for photo in self.photos]
+        return json.dumps(urls) if urls else None
+
+
+class AnimalPhoto(Base):
+    __tablename__ = "animal_photos"
+    __table_args__ = (Index("ix_animal_photos_animal_id_position", "animal_id", "position"),)
+
+    animal_id: Mapped[int] = mapped_column(ForeignKey("animals.id", ondelete="CASCADE"))
+    animal: Mapped[Animal] = relationship(back_populates="photos")
+    position: Mapped[int]
+    url: Mapped[str]
+    variants: Mapped[Optional[dict]] = mapped_column(JSON, default=None)
+    size_bytes: Mapped[Optional[int]] = mapped_column(default=None)
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), default=None, index=True)
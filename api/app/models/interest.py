@@ -0,0 +1,48 @@
+from datetime import datetime
+from enum import StrEnum
+from sqlalchemy import ForeignKey, Index, Enum as SQLEnum
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.types import DateTime, Text
+from typing import Optional
+
+from app.core.database import Base
+
+
+class InterestStatus(StrEnum):
+    PENDING = "pending"
+    CONTACTED = "contacted"
+    VISIT_SCHEDULED = "visit_scheduled"
+    APPROVED = "approved"
+    DECLINED = "declined"
+    WITHDRAWN = "withdrawn"
+
+
+class LivingSituation(StrEnum):
+    HOUSE = "house"
+    APARTMENT = "apartment"
+    FARM = "farm"
+    OTHER = "other"
+
+
+class InterestDeclaration(Base):
+    __tablename__ = "interests"
+    # Admin lists are filtered by animal and status and sorted by newest first
+    __table_args__ = (Index("ix_interests_created_at", "created_at"),)
+
+    animal_id: Mapped[int] = mapped_column(ForeignKey("animals.id"), index=True)
+    name: Mapped[str]
+    email: Mapped[str] = mapped_column(index=True)
+    phone: Mapped[Optional[str]] = mapped_column(default=None)
+    experience_text: Mapped[Optional[str]] = mapped_column(Text, default=None)
+    living_situation: Mapped[Optional[LivingSituation]] = mapped_column(
+        SQLEnum(LivingSituation), default=None, nullable=True
+    )
+    has_yard: Mapped[Optional[bool]] = mapped_column(default=None)
+    has_other_pets: Mapped[Optional[bool]] = mapped_column(default=None)
+    message: Mapped[Optional[str]] = mapped_column(Text, default=None)
+    status: Mapped[InterestStatus] = mapped_column(
+        SQLEnum(InterestStatus), default=InterestStatus.PENDING, index=True
+    )
+    assigned_to_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"), default=None)
+    admin_notes: Mapped[Optional[str]] = mapped_column(Text, default=None)
+    contacted_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), default=None)
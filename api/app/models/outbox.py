@@ -0,0 +1,50 @@
+from datetime import datetime, timezone
+from sqlalchemy import Index, text
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.types import DateTime, Text
+from typing import Optional
+
+from app.core.database import Base
+
+
+class OutboxEmail(Base):
+    """
+    Email waiting to be sent, written in the same transaction as the change it is about.
+
+    Rows are sent by the outbox worker (see OutboxService) and kept for a while once sent,
+    rows that keep failing are given up on with failed_at set.
+    """
+
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # Only unsent rows are ever polled, keep them in a small index of their own
+        Index(
+            "ix_email_outbox_next_attempt_at",
+            "next_attempt_at",
+            postgresql_where=text("sent_at IS NULL AND failed_at IS NULL"),
+        ),
+        Index(
+            "ix_email_outbox_digest_recipient",
+            "recipient",
+            "created_at",
+            postgresql_where=text("digest AND sent_at IS NULL AND failed_at IS NULL"),
+        ),
+    )
+
+    deleted_at = None
+
+    recipient: Mapped[str]
+    subject: Mapped[str]
+    body: Mapped[str] = mapped_column(Text)
+    html: Mapped[Optional[str]] = mapped_column(Text, default=None)
+    # What the email is about (e.g. interest_received), for logs and digests
+    kind: Mapped[str]
+    # Notifications that can be grouped with others into a digest when digests are enabled
+    digest: Mapped[bool] = mapped_column(default=False)
+    attempts: Mapped[int] = mapped_column(default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), default=None)
+    failed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), default=None)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, default=None)
@@ -0,0 +1,24 @@
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional
+
+from app.models.activity import ActivityEntityType
+
+
+class ActivityLogResponse(BaseModel):
+    id: int
+    user_id: Optional[int]
+    action: str
+    entity_type: ActivityEntityType
+    entity_id: str
+    details: Optional[dict]
+    ip_address: Optional[str]
+    created_at: datetime
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ActivityLogPage(BaseModel):
+    items: List[ActivityLogResponse]
+    # Pass as before to fetch the next (older) page, null when there are no more entries
+    cursor: Optional[str]
+    has_more: bool
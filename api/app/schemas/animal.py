@@ -1,7 +1,7 @@
 import json
 from datetime import datetime
 from pydantic import BaseModel, ConfigDict, field_validator
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from app.models.animal import (
     AnimalAdoptionStatus,
@@ -129,6 +129,16 @@ class AnimalUpdate(BaseModel):
         return v
 
 
+class AnimalPhotoResponse(BaseModel):
+    id: int
+    position: int
+    url: str
+    variants: Optional[dict] = None
+    size_bytes: Optional[int] = None
+    content_hash: Optional[str] = None
+    model_config = ConfigDict(from_attributes=True)
+
+
 class AnimalResponse(BaseModel):
     id: int
     name: str
@@ -145,18 +155,83 @@ class AnimalResponse(BaseModel):
     description: Optional[str]
     medical_notes: Optional[str]
     behavioral_notes: Optional[str]
+    photos: List[AnimalPhotoResponse] = []
     created_by_id: int
     created_at: datetime
     updated_at: datetime
     model_config = ConfigDict(from_attributes=True)
 
 
+class AnimalFilters(BaseModel):
+    """List filters, an animal matches when it has one of the given values of each field."""
+
+    species: Optional[List[AnimalSpecies]] = None
+    size: Optional[List[AnimalSize]] = None
+    gender: Optional[List[AnimalGender]] = None
+    adoption_status: Optional[List[AnimalAdoptionStatus]] = None
+    current_location: Optional[List[AnimalCurrentLocation]] = None
+
+
+class AnimalFacets(BaseModel):
+    """Number of animals matching the filters per value of each field."""
+
+    species: Dict[AnimalSpecies, int]
+    size: Dict[AnimalSize, int]
+    gender: Dict[AnimalGender, int]
+    adoption_status: Dict[AnimalAdoptionStatus, int]
+    current_location: Dict[AnimalCurrentLocation, int]
+
+
 class PaginatedAnimalResponse(BaseModel):
     total: int
     skip: int
     limit: int
     items: List[AnimalResponse]
+    # Only computed when requested with facets=true
+    facets: Optional[AnimalFacets] = None
+
+
+class SimilarAnimalResponse(BaseModel):
+    id: int
+    name: str
+    primary_photo_url: Optional[str] = None
+    species: AnimalSpecies
+    breed: Optional[str]
+    size: Optional[AnimalSize]
+    age: int
+    age_unit: AnimalAgeUnit
+    gender: AnimalGender
+    current_location: Optional[AnimalCurrentLocation]
+    # Higher is more similar, only comparable between results for the same animal
+    score: float
+
+
+class AnimalDeletion(BaseModel):
+    id: int
+    deleted_at: datetime
+    model_config = ConfigDict(from_attributes=True)
+
+
+class AnimalChangesResponse(BaseModel):
+    items: List[AnimalResponse]
+    deleted: List[AnimalDeletion]
+    # Pass as since to the next call, null when there were no changes at all yet
+    cursor: Optional[str]
+    has_more: bool
 
 
 class AnimalFileUrl(BaseModel):
     url: str
+
+
+class AnimalFileUrls(BaseModel):
+    urls: List[str]
+
+    @field_validator("urls")
+    @classmethod
+    def validate_urls(cls, v: List[str]) -> List[str]:
+        if not v:
+            raise ValueError("At least one url is required")
+        if len(set(v)) != len(v):
+            raise ValueError("Urls must be unique")
+        return v
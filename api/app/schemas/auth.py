@@ -13,6 +13,11 @@ class TokenResponse(BaseModel):
     token_type: str = "bearer"
 
 
+class EventsTokenResponse(BaseModel):
+    token: str
+    expires_in: int
+
+
 class UserResponse(BaseModel):
     id: int
     email: EmailStr
@@ -0,0 +1,50 @@
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict
+from typing import Dict, List, Optional
+
+from app.models.animal import (
+    AnimalAdoptionStatus,
+    AnimalAgeUnit,
+    AnimalCurrentLocation,
+    AnimalGender,
+    AnimalSpecies,
+    AnimalSize,
+)
+from app.schemas.animal import AnimalPhotoResponse
+
+
+class CatalogueAnimal(BaseModel):
+    """Public view of an animal, without the admin only fields."""
+
+    id: int
+    name: str
+    primary_photo_url: Optional[str] = None
+    photos: List[AnimalPhotoResponse] = []
+    species: AnimalSpecies
+    breed: Optional[str]
+    size: Optional[AnimalSize]
+    age: int
+    age_unit: AnimalAgeUnit
+    gender: AnimalGender
+    adoption_status: AnimalAdoptionStatus
+    current_location: Optional[AnimalCurrentLocation]
+    description: Optional[str]
+    behavioral_notes: Optional[str]
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CataloguePage(BaseModel):
+    # Totals are only in the index, so a page changes only when its own animals do
+    page: int
+    items: List[CatalogueAnimal]
+
+
+class CatalogueIndex(BaseModel):
+    generated_at: datetime
+    total: int
+    page_size: int
+    pages: int
+    # Content hashes of the published documents by path, usable as ETags
+    hashes: Dict[str, str]
+    # Hashes of the ids on each page by path, to find the pages whose animals moved
+    members: Dict[str, str] = {}
@@ -0,0 +1,35 @@
+from datetime import datetime
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from typing import Optional
+
+from app.models.interest import InterestStatus, LivingSituation
+
+
+class InterestDeclarationCreate(BaseModel):
+    animal_id: int
+    name: str = Field(max_length=200)
+    email: EmailStr
+    phone: Optional[str] = Field(default=None, max_length=50)
+    experience_text: Optional[str] = Field(default=None, max_length=5000)
+    living_situation: Optional[LivingSituation] = None
+    has_yard: Optional[bool] = None
+    has_other_pets: Optional[bool] = None
+    message: Optional[str] = Field(default=None, max_length=5000)
+
+    @field_validator("name")
+    @classmethod
+    def validate_name(cls, v: str) -> str:
+        if len(v.strip()) < 2:
+            raise ValueError("Name must be at least 2 characters")
+        return v.strip()
+
+    @field_validator("email")
+    @classmethod
+    def normalize_email(cls, v: str) -> str:
+        return v.lower()
+
+
+class InterestDeclarationAccepted(BaseModel):
+    animal_id: int
+    status: InterestStatus
+    received_at: datetime
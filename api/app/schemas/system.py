@@ -0,0 +1,35 @@
+from pydantic import BaseModel
+
+
+class PoolStatsResponse(BaseModel):
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    max_overflow: int
+    checkouts: int
+    checkout_wait_seconds_total: float
+    checkout_wait_seconds_max: float
+
+
+class ProfileBreakdown(BaseModel):
+    total_ms: float
+    # Time not spent in the database, serialization or storage
+    handler_ms: float
+    db_ms: float
+    serialization_ms: float
+    storage_ms: float
+    queries: int
+
+
+class ProfileReport(BaseModel):
+    method: str
+    path: str
+    # Status of the profiled response, whose body is replaced by the report
+    status_code: int
+    interval_ms: float
+    samples: int
+    breakdown: ProfileBreakdown
+    # Sampled stacks in the collapsed "frame;frame;... count" format of flamegraph tools,
+    # the root frame is the category (handler, db, serialization or storage)
+    folded: str
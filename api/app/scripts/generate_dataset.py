@@ -0,0 +1,407 @@
+"""
+Generate a synthetic dataset of users, animals and photos for scale testing.
+
+Rows are loaded with COPY in batches, with ids reserved from the table sequences up front,
+so a million animals load in a few minutes. Photos point to placeholder images written to
+LocalStorage once and hard linked into each animal's directory, so deleting a photo or an
+animal through the API works as for uploaded files.
+
+Usage:
+    uv run generate-dataset --users 200 --animals 1000000
+    uv run generate-dataset --animals 50000 --no-media --seed 7
+"""
+
+import argparse
+import asyncio
+import hashlib
+import math
+import os
+import random
+import struct
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.security import hash_password
+from app.models.animal import (
+    AnimalAdoptionStatus,
+    AnimalAgeUnit,
+    AnimalCurrentLocation,
+    AnimalGender,
+    AnimalSize,
+    AnimalSpecies,
+)
+from app.models.user import UserRole
+
+PLACEHOLDER_COUNT = 24
+
+SPECIES = {AnimalSpecies.DOG: 55, AnimalSpecies.CAT: 38, AnimalSpecies.OTHER: 7}
+ADOPTION_STATUSES = {
+    AnimalAdoptionStatus.AVAILABLE: 55,
+    AnimalAdoptionStatus.ADOPTED: 35,
+    AnimalAdoptionStatus.ON_HOLD: 10,
+}
+SIZES = {AnimalSize.SMALL: 30, AnimalSize.MEDIUM: 42, AnimalSize.LARGE: 20, None: 8}
+LOCATIONS = {
+    AnimalCurrentLocation.SHELTER: 55,
+    AnimalCurrentLocation.FOSTERED: 35,
+    AnimalCurrentLocation.STRAY: 7,
+    None: 3,
+}
+# Photos per animal including the primary one: most have a few, some none and a few the maximum
+PHOTO_COUNTS = {0: 12, 1: 20, 2: 18, 3: 15, 4: 10, 5: 8, 6: 6, 7: 4, 8: 3, 9: 2, 10: 2}
+
+BREEDS = {
+    AnimalSpecies.DOG: [
+        "Mixed",
+        "Labrador Retriever",
+        "German Shepherd",
+        "Beagle",
+        "Pit Bull Terrier",
+        "Border Collie",
+        "Greek Harehound",
+        "Cocker Spaniel",
+        "Husky",
+        "Chihuahua",
+    ],
+    AnimalSpecies.CAT: [
+        "Domestic Shorthair",
+        "Domestic Longhair",
+        "Siamese",
+        "Persian",
+        "Maine Coon",
+        "British Shorthair",
+        "Bengal",
+    ],
+    AnimalSpecies.OTHER: ["Rabbit", "Guinea Pig", "Hamster", "Parrot", "Turtle", "Ferret"],
+}
+NAMES = [
+    "Luna",
+    "Max",
+    "Bella",
+    "Charlie",
+    "Milo",
+    "Daisy",
+    "Rocky",
+    "Lola",
+    "Oscar",
+    "Nala",
+    "Simba",
+    "Coco",
+    "Leo",
+    "Ruby",
+    "Toby",
+    "Kira",
+    "Zeus",
+    "Maya",
+    "Bruno",
+    "Lucky",
+    "Athena",
+    "Ares",
+    "Iris",
+    "Apollo",
+    "Phoebe",
+    "Hermes",
+    "Cleo",
+    "Dexter",
+    "Olive",
+    "Pepper",
+]
+FIRST_NAMES = ["Maria", "Giorgos", "Eleni", "Nikos", "Anna", "Kostas", "Sofia", "Dimitris"]
+LAST_NAMES = ["Papadopoulos", "Georgiou", "Nikolaou", "Ioannou", "Vlachou", "Karras"]
+WORDS = (
+    "friendly calm playful shy gentle energetic loves walks cuddles treats toys children "
+    "other dogs cats house trained vaccinated neutered spayed microchipped rescued found "
+    "street shelter foster family garden apartment quiet curious loyal smart learns quickly "
+    "needs patience time adjust new home food allergies check ups healthy happy sleeps "
+    "sofa window car rides leash training sits stays comes called"
+).split()
+
+USER_COLUMNS = [
+    "id",
+    "email",
+    "hashed_password",
+    "first_name",
+    "last_name",
+    "role",
+    "is_active",
+    "last_login",
+    "created_at",
+    "updated_at",
+    "deleted_at",
+]
+ANIMAL_COLUMNS = [
+    "id",
+    "created_by_id",
+    "name",
+    "primary_photo_url",
+    "species",
+    "breed",
+    "size",
+    "age",
+    "age_unit",
+    "gender",
+    "adoption_status",
+    "current_location",
+    "description",
+    "medical_notes",
+    "behavioral_notes",
+    "created_at",
+    "updated_at",
+    "deleted_at",
+]
+PHOTO_COLUMNS = [
+    "animal_id",
+    "position",
+    "url",
+    "variants",
+    "size_bytes",
+    "content_hash",
+    "created_at",
+    "updated_at",
+    "deleted_at",
+]
+
+
+def weighted(rng: random.Random, choices: dict) -> object:
+    return rng.choices(list(choices), weights=list(choices.values()))[0]
+
+
+def placeholder_png(width: int, height: int, color: tuple[int, int, int]) -> bytes:
+    """A solid color PNG, without pulling in an imaging library."""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    row = b"\x00" + bytes(color) * width
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(row * height, 9))
+        + chunk(b"IEND", b"")
+    )
+
+
+class Placeholders:
+    """Placeholder images in LocalStorage, hard linked into animal directories."""
+
+    def __init__(self, rng: random.Random):
+        self.base_path = Path(settings.STORAGE_LOCAL_PATH)
+        self.base_url = settings.STORAGE_LOCAL_URL
+        directory = self.base_path / "placeholders"
+        directory.mkdir(parents=True, exist_ok=True)
+
+        self.images = []
+        for index in range(PLACEHOLDER_COUNT):
+            color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+            content = placeholder_png(rng.choice([640, 800, 1024]), 600, color)
+            path = directory / f"{index}.png"
+            path.write_bytes(content)
+            self.images.append((path, len(content), hashlib.sha256(content).hexdigest()))
+
+    def link(self, rng: random.Random, animal_id: int) -> tuple[str, int, str]:
+        source, size, digest = rng.choice(self.images)
+        path = f"animals/{animal_id}/files/{uuid.uuid4().hex}.png"
+        target = self.base_path / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(source, target)
+        except OSError:
+            # Hard links don't work across filesystems
+            target.write_bytes(source.read_bytes())
+
+        return f"{self.base_url}/{path}", size, digest
+
+
+def random_text(rng: random.Random, median_words: int) -> str:
+    # Log-normal lengths: most texts are short, a few are very long
+    words = max(int(rng.lognormvariate(math.log(median_words), 0.8)), 1)
+    return " ".join(rng.choices(WORDS, k=words)).capitalize() + "."
+
+
+def random_timestamps(rng: random.Random, now: datetime) -> tuple[datetime, datetime]:
+    created_at = now - timedelta(seconds=rng.uniform(0, 2 * 365 * 24 * 3600))
+    updated_at = min(created_at + timedelta(seconds=rng.expovariate(1 / (30 * 24 * 3600))), now)
+    return created_at, updated_at
+
+
+def generate_users(rng: random.Random, ids: list[int], hashed_password: str, now: datetime):
+    for user_id in ids:
+        created_at, updated_at = random_timestamps(rng, now)
+        yield (
+            user_id,
+            f"user{user_id}@example.org",
+            hashed_password,
+            rng.choice(FIRST_NAMES),
+            rng.choice(LAST_NAMES),
+            UserRole.ADMIN.name,
+            rng.random() > 0.05,
+            updated_at if rng.random() > 0.3 else None,
+            created_at,
+            updated_at,
+            None,
+        )
+
+
+def generate_animals(
+    rng: random.Random,
+    ids: list[int],
+    owners: list[int],
+    owner_weights: list[float],
+    placeholders: Placeholders | None,
+    now: datetime,
+):
+    animals, photos = [], []
+    owner_ids = rng.choices(owners, weights=owner_weights, k=len(ids))
+
+    for animal_id, owner_id in zip(ids, owner_ids):
+        species = weighted(rng, SPECIES)
+        size = weighted(rng, SIZES)
+        location = weighted(rng, LOCATIONS)
+        months = rng.random() < 0.25
+        created_at, updated_at = random_timestamps(rng, now)
+
+        # The primary photo is uploaded separately from the extra photos, as in the API
+        primary_photo_url = None
+        photo_count = weighted(rng, PHOTO_COUNTS)
+        for position in range(-1, photo_count - 1):
+            if placeholders is not None:
+                url, size_bytes, digest = placeholders.link(rng, animal_id)
+            else:
+                url, size_bytes, digest = (
+                    f"{settings.STORAGE_LOCAL_URL}/animals/{animal_id}/files/{position + 1}.png",
+                    None,
+                    None,
+                )
+            if position < 0:
+                primary_photo_url = url
+                continue
+            photos.append(
+                (animal_id, position, url, None, size_bytes, digest, created_at, created_at, None)
+            )
+
+        animals.append(
+            (
+                animal_id,
+                owner_id,
+                rng.choice(NAMES),
+                primary_photo_url,
+                species.name,
+                rng.choice(BREEDS[species]) if rng.random() > 0.1 else None,
+                size.name if size else None,
+                rng.randint(1, 11) if months else max(int(rng.triangular(1, 16, 2)), 1),
+                AnimalAgeUnit.MONTHS.name if months else AnimalAgeUnit.YEARS.name,
+                rng.choice(list(AnimalGender)).name,
+                weighted(rng, ADOPTION_STATUSES).name,
+                location.name if location else None,
+                random_text(rng, 60) if rng.random() > 0.08 else None,
+                random_text(rng, 15) if rng.random() < 0.4 else None,
+                random_text(rng, 20) if rng.random() < 0.5 else None,
+                created_at,
+                updated_at,
+                None,
+            )
+        )
+
+    return animals, photos
+
+
+async def reserve_ids(db, sequence: str, count: int) -> list[int]:
+    result = await db.execute(
+        text(f"SELECT nextval('{sequence}') FROM generate_series(1, :count)"), {"count": count}
+    )
+    return list(result.scalars())
+
+
+async def copy_rows(db, table: str, columns: list[str], rows: list[tuple]) -> None:
+    if not rows:
+        return
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        table, records=rows, columns=columns
+    )
+
+
+async def generate_dataset(
+    users: int, animals: int, batch_size: int, seed: int, password: str, media: bool
+):
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    start = time.perf_counter()
+    placeholders = Placeholders(rng) if media else None
+
+    async with async_session_maker() as db:
+        user_ids = await reserve_ids(db, "users_id_seq", users)
+        await copy_rows(
+            db,
+            "users",
+            USER_COLUMNS,
+            list(generate_users(rng, user_ids, hash_password(password), now)),
+        )
+        await db.commit()
+        print(f"✓ {users} users created, password: {password}")
+
+        # A few large shelters own most of the animals
+        owner_weights = [rng.paretovariate(1.2) for _ in user_ids]
+
+        created = photos_created = 0
+        while created < animals:
+            count = min(batch_size, animals - created)
+            animal_ids = await reserve_ids(db, "animals_id_seq", count)
+            animal_rows, photo_rows = await asyncio.to_thread(
+                generate_animals, rng, animal_ids, user_ids, owner_weights, placeholders, now
+            )
+            # Listeners of the change feed don't need a notification per generated row
+            await db.execute(text("SET LOCAL openadopt.notify_changes = 'off'"))
+            await copy_rows(db, "animals", ANIMAL_COLUMNS, animal_rows)
+            await copy_rows(db, "animal_photos", PHOTO_COLUMNS, photo_rows)
+            await db.commit()
+
+            created += count
+            photos_created += len(photo_rows)
+            elapsed = time.perf_counter() - start
+            print(f"  {created}/{animals} animals, {photos_created} photos ({elapsed:.0f}s)")
+
+        await db.execute(text("ANALYZE users, animals, animal_photos"))
+        await db.commit()
+
+    print(f"✓ {animals} animals created in {time.perf_counter() - start:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset for scale testing")
+    parser.add_argument("--users", type=int, default=50, help="admins that own the animals")
+    parser.add_argument("--animals", type=int, default=10_000)
+    parser.add_argument("--batch-size", type=int, default=10_000, help="rows per COPY")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default="password", help="password of every user")
+    parser.add_argument(
+        "--no-media", dest="media", action="store_false", help="don't write placeholder files"
+    )
+    args = parser.parse_args()
+
+    if args.users < 1:
+        parser.error("--users must be at least 1")
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+    if args.media and settings.STORAGE_BACKEND != "local":
+        parser.error("Placeholder media is only supported with the local storage backend")
+
+    asyncio.run(
+        generate_dataset(
+            args.users, args.animals, args.batch_size, args.seed, args.password, args.media
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
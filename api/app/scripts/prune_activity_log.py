@@ -0,0 +1,51 @@
+"""
+Drop the activity log partitions of months older than the retention period.
+
+Each month is its own partition, so dropping it is instant and leaves no dead rows
+behind, unlike deleting the old entries row by row.
+
+Usage:
+    uv run prune-activity-log
+    uv run prune-activity-log --keep-months 6
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.services.activity_service import ActivityService, month_start
+
+
+async def prune_activity_log(keep_months: int):
+    now = datetime.now(timezone.utc)
+    # The current month counts as the first one kept
+    cutoff = month_start(now.year, now.month - keep_months + 1)
+
+    async with async_session_maker() as db:
+        dropped = await ActivityService.drop_partitions_before(db, cutoff)
+
+    for name in dropped:
+        print(f"  dropped {name}")
+    print(f"✓ {len(dropped)} partitions before {cutoff:%Y-%m} dropped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drop activity log partitions past retention")
+    parser.add_argument(
+        "--keep-months",
+        type=int,
+        default=settings.ACTIVITY_LOG_RETENTION_MONTHS,
+        help="months kept, including the current one",
+    )
+    args = parser.parse_args()
+
+    if args.keep_months < 1:
+        parser.error("--keep-months must be at least 1")
+
+    asyncio.run(prune_activity_log(args.keep_months))
+
+
+if __name__ == "__main__":
+    main()
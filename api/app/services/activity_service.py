@@ -0,0 +1,208 @@
+from datetime import datetime, timezone
+from logging import getLogger
+from sqlalchemy import insert, select, text, tuple_
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from app.core.batch_writer import BatchWriter, BufferFullError
+from app.core.config import settings
+from app.core.database import async_session_maker, is_row_error
+from app.models.activity import ActivityEntityType, ActivityLog
+
+logger = getLogger(__name__)
+
+PARTITION_PREFIX = "activity_log_"
+
+# Partitions this worker has created or seen, so they are only checked once
+known_partitions: set[str] = set()
+
+
+def month_start(year: int, month: int) -> datetime:
+    # Rolls over into the next year for month 13
+    return datetime(year + (month - 1) // 12, (month - 1) % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(year: int, month: int) -> str:
+    return f"{PARTITION_PREFIX}{year:04d}_{month:02d}"
+
+
+class ActivityService:
+    @staticmethod
+    def record(
+        action: str,
+        entity_type: ActivityEntityType,
+        entity_id: int | str,
+        user_id: int | None = None,
+        details: dict | None = None,
+        ip_address: str | None = None,
+    ) -> None:
+        """Queue an activity entry, it is written in the background with others."""
+        try:
+            activity_writer.add(
+                {
+                    "action": action,
+                    "entity_type": entity_type.value,
+                    "entity_id": str(entity_id),
+                    "user_id": user_id,
+                    "details": details,
+                    "ip_address": ip_address,
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                }
+            )
+        except BufferFullError as e:
+            # The write it records has succeeded, don't fail the request over its audit entry
+            logger.warning(f"Dropping activity {action} on {entity_type} {entity_id}: {e}")
+
+    @staticmethod
+    async def get_activity(
+        db: AsyncSession,
+        entity_type: ActivityEntityType | None = None,
+        entity_id: str | None = None,
+        user_id: int | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        before: tuple[datetime, int] | None = None,
+        limit: int = 50,
+    ) -> List[ActivityLog]:
+        """
+        Return activity entries newest first, before a (created_at, id) position.
+
+        Bounding the time range with since and until lets Postgres skip whole partitions.
+        """
+        stmt = (
+            select(ActivityLog)
+            .order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc())
+            .limit(limit)
+        )
+
+        if entity_type is not None:
+            stmt = stmt.where(ActivityLog.entity_type == entity_type)
+        if entity_id is not None:
+            stmt = stmt.where(ActivityLog.entity_id == entity_id)
+        if user_id is not None:
+            stmt = stmt.where(ActivityLog.user_id == user_id)
+        if since is not None:
+            stmt = stmt.where(ActivityLog.created_at >= since)
+        if until is not None:
+            stmt = stmt.where(ActivityLog.created_at < until)
+        if before is not None:
+            stmt = stmt.where(tuple_(ActivityLog.created_at, ActivityLog.id) < tuple_(*before))
+
+        result = await db.scalars(stmt)
+
+        return list(result.all())
+
+    @staticmethod
+    async def ensure_partitions(db: AsyncSession, timestamps: list[datetime]) -> None:
+        """
+        Create the monthly partitions the timestamps fall in, and the ones after them.
+
+        Creating a partition locks the whole table, so the next month is created ahead of
+        time and the lock is only waited for briefly, a flush that can't get it is retried.
+        """
+        months = set()
+        for timestamp in timestamps:
+            next_month = month_start(timestamp.year, timestamp.month + 1)
+            months.update({(timestamp.year, timestamp.month), (next_month.year, next_month.month)})
+
+        for year, month in sorted(months):
+            name = partition_name(year, month)
+            if name in known_partitions:
+                continue
+
+            try:
+                await db.execute(text("SET LOCAL lock_timeout = '2s'"))
+                await db.execute(
+                    text(
+                        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF activity_log "
+                        f"FOR VALUES FROM ('{month_start(year, month).isoformat()}') "
+                        f"TO ('{month_start(year, month + 1).isoformat()}')"
+                    )
+                )
+                await db.commit()
+            except DBAPIError as e:
+                # The lock wasn't granted in time, or another worker created it meanwhile
+                await db.rollback()
+                logger.warning(f"Error creating partition {name}: {e}")
+                continue
+            known_partitions.add(name)
+
+    @staticmethod
+    async def insert_activity(rows: list[dict]) -> None:
+        """
+        Insert buffered activity entries with a single multi-row INSERT.
+
+        Entries that can't be inserted, e.g. malformed spooled rows, are dropped so they
+        don't fail every later flush. Other errors, like a lost connection, fail the flush
+        and the batch is retried.
+        """
+        values = []
+        for row in rows:
+            try:
+                values.append({**row, "created_at": datetime.fromisoformat(row["created_at"])})
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Dropping malformed activity entry {row!r}: {e!r}")
+        if not values:
+            return
+
+        async with async_session_maker() as db:
+            await ActivityService.ensure_partitions(db, [row["created_at"] for row in values])
+            try:
+                await db.execute(insert(ActivityLog).values(values))
+                await db.commit()
+                return
+            except SQLAlchemyError as e:
+                if not is_row_error(e):
+                    raise
+                await db.rollback()
+                logger.warning(f"Error inserting {len(values)} activity entries: {e}")
+
+            # A single bad row fails the whole statement, insert them one by one in
+            # savepoints to keep the others
+            for values_row in values:
+                try:
+                    async with db.begin_nested():
+                        await db.execute(insert(ActivityLog).values(values_row))
+                except SQLAlchemyError as e:
+                    if not is_row_error(e):
+                        raise
+                    logger.warning(
+                        f"Dropping activity {values_row.get('action')} on "
+                        f"{values_row.get('entity_type')} {values_row.get('entity_id')}: {e}"
+                    )
+            await db.commit()
+
+    @staticmethod
+    async def drop_partitions_before(db: AsyncSession, cutoff: datetime) -> list[str]:
+        """Drop the monthly partitions that end on or before cutoff, returning their names."""
+        result = await db.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = 'activity_log'"
+            )
+        )
+
+        dropped = []
+        for name in sorted(result.scalars()):
+            year, _, month = name.removeprefix(PARTITION_PREFIX).partition("_")
+            if not (year.isdigit() and month.isdigit()):
+                continue
+            if month_start(int(year), int(month) + 1) <= cutoff:
+                await db.execute(text(f"DROP TABLE {name}"))
+                known_partitions.discard(name)
+                dropped.append(name)
+        await db.commit()
+
+        return dropped
+
+
+activity_writer = BatchWriter(
+    "activity",
+    ActivityService.insert_activity,
+    max_batch_size=settings.ACTIVITY_LOG_BATCH_SIZE,
+    max_delay=settings.ACTIVITY_LOG_FLUSH_INTERVAL,
+    max_pending=settings.ACTIVITY_LOG_MAX_PENDING,
+)
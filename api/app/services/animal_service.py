@@ -1,22 +1,29 @@
-from sqlalchemy import select, func
+import json
+from datetime import datetime, timezone
+from sqlalchemy import case, delete, insert, literal, select, tuple_, update, func
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, selectinload
 from typing import List
 
-from app.models.animal import Animal
+from app.models.animal import Animal, AnimalPhoto
 from app.models.user import User, UserRole
 
+# Fields the animal lists can be filtered and faceted on
+FACETS = ("species", "size", "gender", "adoption_status", "current_location")
+
+
+class AnimalChangedError(Exception):
+    """Raised when the animal was deleted or changed since the version the write expects."""
+
 
 class AnimalService:
     @staticmethod
-    async def count_animals(db: AsyncSession, user: User | None = None):
-        stmt = select(func.count()).select_from(Animal)
-
-        if user and user.role == UserRole.ADMIN:
-            # If the authenticated user is an admin,
-            # the query should return only animals created by that user.
-            # That will be used only in an admin view of the animals.
-            # In a public view all animals will be returned.
-            stmt = stmt.where(Animal.created_by_id == user.id)
+    async def count_animals(
+        db: AsyncSession, user: User | None = None, filters: dict | None = None
+    ):
+        stmt = AnimalService._filter_animals(
+            select(func.count()).select_from(Animal), user, filters
+        )
 
         total = await db.scalar(stmt)
 
@@ -24,16 +31,15 @@ class AnimalService:
 
     @staticmethod
     async def get_animals(
-        db: AsyncSession, user: User | None = None, skip: int = 0, limit: int = 50
+        db: AsyncSession,
+        user: User | None = None,
+        skip: int = 0,
+        limit: int = 50,
+        filters: dict | None = None,
     ) -> List[Animal]:
-        stmt = select(Animal)
-
-        if user and user.role == UserRole.ADMIN:
-            # If the authenticated user is an admin,
-            # the query should return only animals created by that user.
-            # That will be used only in an admin view of the animals.
-            # In a public view all animals will be returned.
-            stmt = stmt.where(Animal.created_by_id == user.id)
+        # Photos for the whole page are fetched with a single extra IN query
+        stmt = select(Animal).options(selectinload(Animal.photos))
+        stmt = AnimalService._filter_animals(stmt, user, filters)
 
         stmt = stmt.offset(skip).limit(limit)
         result = await db.scalars(stmt)
@@ -42,19 +48,108 @@ class AnimalService:
 
         return animals
 
+    @staticmethod
+    async def get_facets(
+        db: AsyncSession, user: User | None = None, filters: dict | None = None
+    ) -> dict[str, dict]:
+        """Count the animals matching the filters per value of each field in FACETS."""
+        columns = [getattr(Animal, name) for name in FACETS]
+        # One grouping set per facet, so all the counts come from a single scan. GROUPING()
+        # has a 0 bit for the column a row is grouped by, leftmost column first
+        stmt = select(*columns, func.grouping(*columns), func.count()).group_by(
+            func.grouping_sets(*columns)
+        )
+        stmt = AnimalService._filter_animals(stmt, user, filters)
+        result = await db.execute(stmt)
+
+        facets = {
+            name: {value: 0 for value in column.type.enum_class}
+            for name, column in zip(FACETS, columns)
+        }
+        for row in result:
+            values, grouping, count = row[: len(FACETS)], row[-2], row[-1]
+            for i, name in enumerate(FACETS):
+                # Animals without a value (e.g. no size) can't be filtered on, leave them out
+                if not grouping & (1 << (len(FACETS) - 1 - i)) and values[i] is not None:
+                    facets[name][values[i]] = count
+
+        return facets
+
     @staticmethod
     async def get_animal_by_id(db: AsyncSession, id: int) -> Animal | None:
-        stmt = select(Animal).where(Animal.id == id)
+        stmt = (
+            select(Animal)
+            .options(selectinload(Animal.photos))
+            .where(Animal.id == id, Animal.deleted_at.is_(None))
+        )
         result = await db.execute(stmt)
 
         animal = result.scalar_one_or_none()
 
         return animal
 
+    @staticmethod
+    async def get_animals_by_ids(db: AsyncSession, ids: List[int]) -> List[Animal]:
+        """Fetch several animals with one IN query, in no particular order."""
+        stmt = (
+            select(Animal)
+            .options(selectinload(Animal.photos))
+            .where(Animal.id.in_(ids), Animal.deleted_at.is_(None))
+        )
+        result = await db.scalars(stmt)
+
+        return list(result.all())
+
+    @staticmethod
+    async def get_animal_version(db: AsyncSession, id: int):
+        """Return the (created_by_id, updated_at) of an animal, or None if it doesn't exist."""
+        stmt = select(Animal.created_by_id, Animal.updated_at).where(
+            Animal.id == id, Animal.deleted_at.is_(None)
+        )
+        result = await db.execute(stmt)
+
+        return result.one_or_none()
+
+    @staticmethod
+    async def get_changes(
+        db: AsyncSession,
+        user: User,
+        after: tuple[datetime, int] | None,
+        until: datetime,
+        limit: int,
+    ) -> List[Animal]:
+        """
+        Return the animals created, updated or deleted after a (updated_at, id) position.
+
+        Rows are ordered by (updated_at, id), so the position of the last row is the cursor
+        of the next call. Rows updated after until are left for a later call, see
+        get_animal_changes for why. Deleted animals are returned with deleted_at set.
+        """
+        stmt = (
+            select(Animal)
+            .options(selectinload(Animal.photos))
+            .where(Animal.updated_at <= until)
+            .order_by(Animal.updated_at, Animal.id)
+            .limit(limit)
+        )
+
+        if user.role == UserRole.ADMIN:
+            stmt = stmt.where(Animal.created_by_id == user.id)
+
+        if after is not None:
+            stmt = stmt.where(tuple_(Animal.updated_at, Animal.id) > tuple_(*after))
+
+        result = await db.scalars(stmt)
+
+        return list(result.all())
+
     @staticmethod
     async def create_animal(db: AsyncSession, animal_data: dict, user: User) -> Animal:
+        extra_photos_url = animal_data.pop("extra_photos_url", None)
+
         animal = Animal(
             **animal_data,
+            photos=AnimalService._build_photos(extra_photos_url),
             created_by_id=user.id,
         )
 
@@ -64,18 +159,307 @@ class AnimalService:
         return animal
 
     @staticmethod
-    async def update_animal(db: AsyncSession, animal: Animal, animal_data: dict) -> Animal:
-        for field, value in animal_data.items():
-            setattr(animal, field, value)
+    async def update_animal(
+        db: AsyncSession,
+        animal_id: int,
+        animal_data: dict,
+        user: User,
+        versions: list[datetime] | None = None,
+    ):
+        """
+        Update an animal the user has access to with a single UPDATE ... RETURNING statement.
+
+        The ownership check is part of the WHERE clause, so no SELECT is needed before or
+        after the update. When versions is given, the update only applies if the animal's
+        updated_at is one of them. Returns a tuple of (animal, urls of the removed photos),
+        the animal is None if no such animal exists, the user may not access it or it
+        changed since. The caller deletes the files of the removed photos.
+        """
+        replace_photos = "extra_photos_url" in animal_data
+        extra_photos_url = animal_data.pop("extra_photos_url", None)
+
+        stmt = AnimalService._filter_by_owner(
+            update(Animal).where(Animal.id == animal_id, Animal.deleted_at.is_(None)), user
+        )
+        stmt = (
+            AnimalService._filter_by_version(stmt, versions)
+            .values(**animal_data)
+            .returning(Animal)
+            .options(selectinload(Animal.photos))
+            .execution_options(populate_existing=True)
+        )
+        result = await db.scalars(stmt)
+        animal = result.one_or_none()
+
+        removed_urls = []
+        if animal and replace_photos:
+            removed_urls = AnimalService._replace_photos(animal, extra_photos_url)
 
         await db.commit()
-        await db.refresh(animal)
 
-        return animal
+        return animal, removed_urls
 
     @staticmethod
-    async def delete_animal(db: AsyncSession, animal: Animal) -> None:
-        await db.delete(animal)
+    async def delete_animal(db: AsyncSession, animal_id: int, user: User) -> bool:
+        """
+        Soft delete an animal the user has access to with a single UPDATE statement.
+
+        The row is kept with deleted_at set, so the changes feed can report the deletion.
+        Its photos are deleted along with their files, so the primary photo is cleared too.
+        Returns False if no such animal exists or the user may not access it.
+        """
+        now = datetime.now(timezone.utc)
+        stmt = (
+            AnimalService._filter_by_owner(
+                update(Animal).where(Animal.id == animal_id, Animal.deleted_at.is_(None)), user
+            )
+            .values(deleted_at=now, updated_at=now, primary_photo_url=None)
+            .returning(Animal.id)
+        )
+        deleted_id = await db.scalar(stmt)
+
+        if deleted_id is not None:
+            await db.execute(delete(AnimalPhoto).where(AnimalPhoto.animal_id == animal_id))
+
         await db.commit()
 
-        return
+        return deleted_id is not None
+
+    @staticmethod
+    async def set_primary_photo(
+        db: AsyncSession,
+        animal_id: int,
+        url: str,
+        user: User,
+        versions: list[datetime] | None = None,
+    ):
+        """
+        Swap the primary photo of an animal with a single UPDATE ... RETURNING statement.
+
+        The animal, if loaded in the session, gets the new updated_at as well. Returns a
+        tuple of (updated, previous primary photo url).
+        """
+        previous = aliased(Animal)
+        stmt = AnimalService._filter_by_owner(
+            update(Animal).where(Animal.id == animal_id, Animal.deleted_at.is_(None)), user
+        )
+        stmt = (
+            AnimalService._filter_by_version(stmt, versions)
+            .where(previous.id == Animal.id)
+            .values(primary_photo_url=url)
+            .returning(previous.primary_photo_url)
+        )
+        result = await db.execute(stmt)
+        row = result.one_or_none()
+
+        await db.commit()
+
+        return (row is not None, row[0] if row else None)
+
+    @staticmethod
+    async def add_photo(
+        db: AsyncSession,
+        animal_id: int,
+        url: str,
+        max_photos: int,
+        size_bytes: int | None = None,
+        content_hash: str | None = None,
+        versions: list[datetime] | None = None,
+    ) -> AnimalPhoto | None:
+        """
+        Append a photo to an animal with a single INSERT ... SELECT statement.
+
+        The next position and the photo limit are both evaluated inside the statement,
+        while the row lock taken by touching the animal serializes concurrent uploads for
+        the same animal. Returns None if the animal already has max_photos photos, and
+        raises AnimalChangedError if it was deleted or changed since.
+        """
+        await AnimalService._touch(db, animal_id, versions)
+
+        select_stmt = (
+            select(
+                literal(animal_id),
+                func.coalesce(func.max(AnimalPhoto.position) + 1, 0),
+                literal(url),
+                literal(size_bytes),
+                literal(content_hash),
+            )
+            .where(AnimalPhoto.animal_id == animal_id)
+            .having(func.count() < max_photos)
+        )
+        stmt = (
+            insert(AnimalPhoto)
+            .from_select(
+                ["animal_id", "position", "url", "size_bytes", "content_hash"], select_stmt
+            )
+            .returning(AnimalPhoto)
+        )
+        result = await db.scalars(stmt)
+        photo = result.one_or_none()
+
+        await db.commit()
+
+        return photo
+
+    @staticmethod
+    async def remove_photo(
+        db: AsyncSession, animal_id: int, url: str, versions: list[datetime] | None = None
+    ) -> AnimalPhoto | None:
+        """
+        Delete a single photo row of an animal, without committing.
+
+        The caller commits and then removes the file from storage. Returns None if the
+        animal has no photo with the given url, and raises AnimalChangedError if the animal
+        was deleted or changed since.
+        """
+        await AnimalService._touch(db, animal_id, versions)
+
+        stmt = (
+            delete(AnimalPhoto)
+            .where(AnimalPhoto.animal_id == animal_id, AnimalPhoto.url == url)
+            .returning(AnimalPhoto)
+        )
+        result = await db.scalars(stmt)
+
+        return result.first()
+
+    @staticmethod
+    async def remove_photos(
+        db: AsyncSession, animal_id: int, urls: List[str], versions: list[datetime] | None = None
+    ) -> List[AnimalPhoto] | None:
+        """
+        Delete several photo rows of an animal with one statement, without committing.
+
+        The caller commits and then removes the files from storage. Returns None, after
+        rolling back, unless every url is a photo of the animal, and raises
+        AnimalChangedError if the animal was deleted or changed since.
+        """
+        await AnimalService._touch(db, animal_id, versions)
+
+        stmt = (
+            delete(AnimalPhoto)
+            .where(AnimalPhoto.animal_id == animal_id, AnimalPhoto.url.in_(urls))
+            .returning(AnimalPhoto)
+        )
+        result = await db.scalars(stmt)
+        photos = list(result.all())
+
+        if len(photos) != len(set(urls)):
+            await db.rollback()
+            return None
+
+        return photos
+
+    @staticmethod
+    async def reorder_photos(
+        db: AsyncSession, animal_id: int, urls: List[str], versions: list[datetime] | None = None
+    ) -> List[AnimalPhoto] | None:
+        """
+        Set the positions of all the photos of an animal to the order of urls.
+
+        All positions are updated by a single UPDATE with a CASE on the url, under the
+        row lock taken by touching the animal. Returns None, without changes, unless urls
+        lists every photo of the animal exactly once, and raises AnimalChangedError if
+        the animal was deleted or changed since.
+        """
+        await AnimalService._touch(db, animal_id, versions)
+
+        stmt = (
+            update(AnimalPhoto)
+            .where(AnimalPhoto.animal_id == animal_id)
+            .values(
+                position=case(
+                    {url: position for position, url in enumerate(urls)},
+                    value=AnimalPhoto.url,
+                    else_=AnimalPhoto.position,
+                )
+            )
+            .returning(AnimalPhoto)
+            # The photos may already be loaded with their old positions
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        result = await db.scalars(stmt)
+        photos = list(result.all())
+
+        if len(photos) != len(urls) or {photo.url for photo in photos} != set(urls):
+            await db.rollback()
+            return None
+        await db.commit()
+
+        return sorted(photos, key=lambda photo: photo.position)
+
+    @staticmethod
+    def _filter_animals(stmt, user: User | None, filters: dict | None):
+        stmt = stmt.where(Animal.deleted_at.is_(None))
+
+        if user and user.role == UserRole.ADMIN:
+            # If the authenticated user is an admin,
+            # the query should return only animals created by that user.
+            # That will be used only in an admin view of the animals.
+            # In a public view all animals will be returned.
+            stmt = stmt.where(Animal.created_by_id == user.id)
+
+        # Filters map field names to the accepted values, see AnimalFilters
+        for name, values in (filters or {}).items():
+            stmt = stmt.where(getattr(Animal, name).in_(values))
+
+        return stmt
+
+    @staticmethod
+    def _filter_by_owner(stmt, user: User):
+        # Super admins can access every animal, admins only the ones they created
+        if user.role != UserRole.SUPER_ADMIN:
+            stmt = stmt.where(Animal.created_by_id == user.id)
+
+        return stmt
+
+    @staticmethod
+    def _filter_by_version(stmt, versions: list[datetime] | None):
+        # The versions come from an If-Match header, an empty list never matches
+        if versions is not None:
+            stmt = stmt.where(Animal.updated_at.in_(versions))
+
+        return stmt
+
+    @staticmethod
+    async def _touch(db: AsyncSession, animal_id: int, versions: list[datetime] | None) -> None:
+        """
+        Bump updated_at after a change to the photos, locking the animal's row.
+
+        The animal, if loaded in the session, gets the new updated_at as well, so the
+        caller can return its new ETag.
+        """
+        stmt = AnimalService._filter_by_version(
+            update(Animal).where(Animal.id == animal_id, Animal.deleted_at.is_(None)), versions
+        ).values(updated_at=datetime.now(timezone.utc))
+        touched_id = await db.scalar(stmt.returning(Animal.id))
+
+        if touched_id is None:
+            await db.rollback()
+            raise AnimalChangedError(f"Animal with id {animal_id} was deleted or changed")
+
+    @staticmethod
+    def _build_photos(extra_photos_url: str | None) -> List[AnimalPhoto]:
+        urls = json.loads(extra_photos_url) if extra_photos_url else []
+
+        return [AnimalPhoto(position=position, url=url) for position, url in enumerate(urls)]
+
+    @staticmethod
+    def _replace_photos(animal: Animal, extra_photos_url: str | None) -> List[str]:
+        """
+        Set the photos of an animal to the given urls, returning the urls that were removed.
+
+        Rows whose url is kept are only moved, so their size and hash stay, rows for new urls
+        are added and the rest are deleted as orphans.
+        """
+        urls = json.loads(extra_photos_url) if extra_photos_url else []
+        existing = {photo.url: photo for photo in animal.photos}
+
+        photos = []
+        for position, url in enumerate(urls):
+            photo = existing.pop(url, None) or AnimalPhoto(url=url)
+            photo.position = position
+            photos.append(photo)
+        animal.photos = photos
+
+        return list(existing)
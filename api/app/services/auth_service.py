@@ -3,7 +3,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
-from app.core.security import verify_password, create_access_token
+from app.core.security import verify_password_limited, create_access_token
 
 
 class AuthService:
@@ -35,7 +35,7 @@ class AuthService:
         if not user:
             raise Exception("Credentials did not match")
 
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_limited(password, user.hashed_password):
             raise Exception("Credentials did not match")
 
         # Update user's last login datetime
@@ -0,0 +1,328 @@
+"""
+Static JSON snapshots of the public catalogue.
+
+The animals up for adoption are published through the storage backend as documents the
+public site or a CDN can serve without touching the database:
+
+    {CATALOGUE_PATH}/index.json          totals, page count and content hashes
+    {CATALOGUE_PATH}/pages/{n}.json      CATALOGUE_PAGE_SIZE animals per page, oldest first
+    {CATALOGUE_PATH}/animals/{id}.json   one document per animal
+
+After animal changes, debounced by CATALOGUE_PUBLISH_DELAY, only the documents of the
+changed animals and the pages listing them are rendered again, along with the pages whose
+animals moved: the index keeps a hash of the ids on each page, and the ids of all the
+listed animals are read to compare them. Pages are ordered by id, so new animals only
+change the last one. Of the rendered documents only the ones whose content hash differs
+from the published index are written, and the ones no longer listed are deleted, so
+unchanged documents keep their cache entries. Everything is rendered on startup and when
+the change feed may have missed changes. Rendering runs in a worker thread, off the event
+loop.
+
+Every worker hears every change through the change feed. The worker that gets the
+advisory lock publishes and the others skip the round, the lock holder hears the same
+changes and publishes again after its current round if it read before they committed.
+The lock is held by a connection of its own outside the pool, to CHANGE_FEED_DATABASE_URL
+when set as it needs a session like LISTEN, and the database reads are done before the
+documents are written, so no transaction stays open meanwhile.
+"""
+
+import asyncio
+import asyncpg
+import hashlib
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from logging import getLogger
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import AsyncIterator, Dict, Iterable, List, NamedTuple
+
+from app.core.change_feed import RESYNC, change_feed
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.lifecycle import lifecycle
+from app.core.responses import dump_model_json
+from app.core.storage.factory import get_storage_backend
+from app.models.animal import Animal, AnimalAdoptionStatus
+from app.schemas.catalogue import CatalogueAnimal, CatalogueIndex, CataloguePage
+
+logger = getLogger(__name__)
+
+# Application wide key of the advisory lock held while publishing
+PUBLISH_LOCK_ID = 72_001
+INDEX_PATH = "index.json"
+# Documents written to the storage backend at once
+PUBLISH_CONCURRENCY = 16
+ERROR_RETRY_DELAY = 30.0
+
+
+def content_hash(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+def animal_path(animal_id: int) -> str:
+    return f"animals/{animal_id}.json"
+
+
+def page_path(page: int) -> str:
+    return f"pages/{page}.json"
+
+
+class CataloguePlan(NamedTuple):
+    """What a publishing round renders, out of the catalogue listing total animals."""
+
+    total: int
+    # Ids of the animals on each page to render, by page number
+    pages: Dict[int, List[int]]
+    animal_ids: List[int]
+    # Hashes of the ids on every page, by path
+    members: Dict[str, str]
+    # Paths of every document of the catalogue, except the index
+    paths: set[str]
+
+
+class CatalogueService:
+    @staticmethod
+    async def get_public_ids(db: AsyncSession) -> List[int]:
+        """Ids of the animals listed in the public catalogue, the ones still up for adoption."""
+        stmt = (
+            select(Animal.id)
+            .where(
+                Animal.deleted_at.is_(None),
+                Animal.adoption_status != AnimalAdoptionStatus.ADOPTED,
+            )
+            .order_by(Animal.id)
+        )
+        result = await db.scalars(stmt)
+
+        return list(result.all())
+
+    @staticmethod
+    async def get_animals(
+        db: AsyncSession, animal_ids: Iterable[int] | None = None
+    ) -> List[Animal]:
+        """Animals by id with their photos, or all of the catalogue's with None."""
+        stmt = (
+            select(Animal).options(selectinload(Animal.photos)).where(Animal.deleted_at.is_(None))
+        )
+        if animal_ids is None:
+            stmt = stmt.where(Animal.adoption_status != AnimalAdoptionStatus.ADOPTED)
+        else:
+            stmt = stmt.where(Animal.id.in_(animal_ids))
+        result = await db.scalars(stmt)
+
+        return list(result.all())
+
+    @staticmethod
+    def plan(
+        public_ids: List[int],
+        page_size: int,
+        changed: set[int] | None,
+        published: CatalogueIndex | None,
+    ) -> CataloguePlan:
+        """
+        Pages and animals to render for the changed animals, all of them with None.
+
+        CPU bound for large catalogues, run it in a thread off the event loop.
+        """
+        page_ids = {
+            page: public_ids[start : start + page_size]
+            for page, start in enumerate(range(0, len(public_ids), page_size), start=1)
+        } or {1: []}
+        members = {
+            page_path(page): content_hash(",".join(map(str, ids)).encode())
+            for page, ids in page_ids.items()
+        }
+        published_members = published.members if published is not None else {}
+
+        if changed is None:
+            pages, animal_ids = page_ids, public_ids
+        else:
+            pages = {
+                page: ids
+                for page, ids in page_ids.items()
+                if published_members.get(page_path(page)) != members[page_path(page)]
+                or not changed.isdisjoint(ids)
+            }
+            animal_ids = sorted(changed.intersection(public_ids))
+
+        paths = {animal_path(animal_id) for animal_id in public_ids}
+        paths.update(members)
+
+        return CataloguePlan(len(public_ids), pages, animal_ids, members, paths)
+
+    @staticmethod
+    def render(animals: List[Animal], plan: CataloguePlan) -> dict[str, bytes]:
+        """
+        JSON documents of the plan by path, except the index.
+
+        Animals missing from the ones given, changed since the ids were read, are left
+        out. They are published again on the round after their change.
+        """
+        by_id = {animal.id: animal for animal in animals}
+        documents = {
+            animal_path(animal_id): dump_model_json(CatalogueAnimal, by_id[animal_id])
+            for animal_id in plan.animal_ids
+            if animal_id in by_id
+        }
+        for page, ids in plan.pages.items():
+            documents[page_path(page)] = dump_model_json(
+                CataloguePage,
+                {"page": page, "items": [by_id[id] for id in ids if id in by_id]},
+            )
+
+        return documents
+
+
+class CataloguePublisher:
+    def __init__(self, path: str, page_size: int, delay: float):
+        # The lock needs a session, like LISTEN, so it uses the change feed's connection URL
+        self.dsn = (
+            make_url(settings.CHANGE_FEED_DATABASE_URL or settings.DATABASE_URL)
+            .set(drivername="postgresql")
+            .render_as_string(hide_password=False)
+        )
+        self.path = path.strip("/")
+        self.page_size = page_size
+        self.delay = delay
+        self.queue: asyncio.Queue | None = None
+        self.task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if settings.CHANGE_FEED_ENABLED:
+            self.queue = change_feed.subscribe()
+        else:
+            logger.warning(
+                "The change feed is disabled, the catalogue is only published on startup"
+            )
+            self.queue = asyncio.Queue()
+        self.task = lifecycle.create_task(self.run(), name="catalogue_publisher")
+        lifecycle.on_shutdown(self.stop)
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+        if settings.CHANGE_FEED_ENABLED and self.queue is not None:
+            change_feed.unsubscribe(self.queue)
+
+    async def run(self) -> None:
+        # Anything may have changed while no worker was running, None renders everything
+        changed: set[int] | None = None
+        dirty = True
+        while True:
+            if dirty:
+                try:
+                    await self.publish(changed)
+                    changed, dirty = set(), False
+                except Exception as e:
+                    logger.warning(
+                        f"Error publishing the catalogue, retrying in {ERROR_RETRY_DELAY}s: {e}"
+                    )
+
+            try:
+                events = [
+                    await asyncio.wait_for(self.queue.get(), ERROR_RETRY_DELAY if dirty else None)
+                ]
+            except TimeoutError:
+                continue
+
+            # Publish changes made together in one round
+            await asyncio.sleep(self.delay)
+            while not self.queue.empty():
+                events.append(self.queue.get_nowait())
+            if RESYNC in events:
+                changed = None
+            elif changed is not None:
+                changed.update(event.id for event in events)
+            dirty = True
+
+    @asynccontextmanager
+    async def lock(self) -> AsyncIterator[bool]:
+        """Try to take the publishing lock for the block, True if this worker got it."""
+        connection = await asyncpg.connect(self.dsn)
+        try:
+            # Session level, released when the connection closes
+            yield await connection.fetchval("SELECT pg_try_advisory_lock($1)", PUBLISH_LOCK_ID)
+        finally:
+            await connection.close()
+
+    async def publish(self, changed: set[int] | None = None) -> None:
+        """Publish the documents of the changed animals, or of all of them with None."""
+        start = time.perf_counter()
+        storage = get_storage_backend()
+
+        async with self.lock() as locked:
+            if not locked:
+                logger.info("The catalogue is being published by another worker")
+                return
+
+            data = await storage.get_object(f"{self.path}/{INDEX_PATH}")
+            published = CatalogueIndex.model_validate_json(data) if data else None
+            if published is None or published.page_size != self.page_size:
+                changed = None
+
+            # The transactions end before rendering and writing
+            async with async_session_maker() as db:
+                public_ids = await CatalogueService.get_public_ids(db)
+                await db.commit()
+                plan = await asyncio.to_thread(
+                    CatalogueService.plan, public_ids, self.page_size, changed, published
+                )
+                if changed is None:
+                    animals = await CatalogueService.get_animals(db)
+                else:
+                    animal_ids = set(plan.animal_ids)
+                    for ids in plan.pages.values():
+                        animal_ids.update(ids)
+                    animals = await CatalogueService.get_animals(db, animal_ids)
+
+            documents = await asyncio.to_thread(CatalogueService.render, animals, plan)
+            published_hashes = published.hashes if published is not None else {}
+            hashes = {
+                path: published_hashes[path] for path in published_hashes if path in plan.paths
+            }
+            hashes.update((path, content_hash(body)) for path, body in documents.items())
+            written = [path for path in documents if published_hashes.get(path) != hashes[path]]
+            removed = [path for path in published_hashes if path not in plan.paths]
+            if not written and not removed and published.members == plan.members:
+                return
+
+            semaphore = asyncio.Semaphore(PUBLISH_CONCURRENCY)
+
+            async def write(path: str) -> None:
+                async with semaphore:
+                    await storage.put_object(
+                        f"{self.path}/{path}", documents[path], "application/json"
+                    )
+
+            await asyncio.gather(*(write(path) for path in written))
+
+            # The index only lists documents that exist, write it between the two
+            index = dump_model_json(
+                CatalogueIndex,
+                {
+                    "generated_at": datetime.now(timezone.utc),
+                    "total": plan.total,
+                    "page_size": self.page_size,
+                    "pages": len(plan.members),
+                    "hashes": hashes,
+                    "members": plan.members,
+                },
+            )
+            await storage.put_object(f"{self.path}/{INDEX_PATH}", index, "application/json")
+            for path in removed:
+                await storage.delete_object(f"{self.path}/{path}")
+
+        logger.info(
+            f"Published the catalogue of {plan.total} animals, {len(documents)} documents "
+            f"rendered, {len(written)} written and {len(removed)} deleted in "
+            f"{(time.perf_counter() - start) * 1000:.1f}ms"
+        )
+
+
+catalogue_publisher = CataloguePublisher(
+    settings.CATALOGUE_PATH, settings.CATALOGUE_PAGE_SIZE, settings.CATALOGUE_PUBLISH_DELAY
+)
@@ -0,0 +1,98 @@
+from datetime import datetime
+from logging import getLogger
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.batch_writer import BatchWriter
+from app.core.config import settings
+from app.core.database import async_session_maker, is_row_error
+from app.models.animal import Animal, AnimalAdoptionStatus
+from app.models.interest import InterestDeclaration
+from app.services.outbox_service import OutboxService, outbox_worker
+
+logger = getLogger(__name__)
+
+
+class InterestService:
+    @staticmethod
+    async def animal_accepts_interest(db: AsyncSession, animal_id: int) -> bool:
+        stmt = select(Animal.id).where(
+            Animal.id == animal_id,
+            Animal.deleted_at.is_(None),
+            Animal.adoption_status != AnimalAdoptionStatus.ADOPTED,
+        )
+        result = await db.execute(stmt)
+
+        return result.scalar_one_or_none() is not None
+
+    @staticmethod
+    def build_row(interest_data: dict, received_at: datetime) -> dict:
+        """JSON serializable row for interest_writer, which may spool it to disk."""
+        return {**interest_data, "received_at": received_at.isoformat()}
+
+    @staticmethod
+    async def insert_interests(rows: list[dict]) -> None:
+        """
+        Insert buffered declarations with a single multi-row INSERT, and queue the email
+        notifications to the admins in the same transaction.
+
+        Rows that can't be inserted, e.g. malformed spooled rows or declarations for an
+        animal deleted in the meantime, are dropped so they don't fail every later flush.
+        Other errors, like a lost connection, fail the flush and the batch is retried.
+        """
+        values = []
+        for row in rows:
+            try:
+                values_row = dict(row)
+                received_at = datetime.fromisoformat(values_row.pop("received_at"))
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Dropping malformed interest declaration {row!r}: {e!r}")
+                continue
+            values_row["created_at"] = values_row["updated_at"] = received_at
+            values.append(values_row)
+        if not values:
+            return
+
+        async with async_session_maker() as db:
+            try:
+                stmt = insert(InterestDeclaration).values(values)
+                result = await db.scalars(stmt.returning(InterestDeclaration.id))
+                await OutboxService.enqueue_interest_notifications(db, list(result))
+                await db.commit()
+                outbox_worker.wake()
+                return
+            except SQLAlchemyError as e:
+                if not is_row_error(e):
+                    raise
+                await db.rollback()
+                logger.warning(f"Error inserting {len(values)} interest declarations: {e}")
+
+            # A single bad row fails the whole statement, insert them one by one in
+            # savepoints to keep the others
+            interest_ids = []
+            for values_row in values:
+                try:
+                    async with db.begin_nested():
+                        stmt = insert(InterestDeclaration).values(values_row)
+                        result = await db.scalars(stmt.returning(InterestDeclaration.id))
+                        interest_ids.append(result.one())
+                except SQLAlchemyError as e:
+                    if not is_row_error(e):
+                        raise
+                    logger.warning(
+                        f"Dropping interest declaration for animal with id "
+                        f"{values_row.get('animal_id')}: {e}"
+                    )
+            await OutboxService.enqueue_interest_notifications(db, interest_ids)
+            await db.commit()
+            outbox_worker.wake()
+
+
+interest_writer = BatchWriter(
+    "interests",
+    InterestService.insert_interests,
+    max_batch_size=settings.INTEREST_BATCH_SIZE,
+    max_delay=settings.INTEREST_FLUSH_INTERVAL,
+    max_pending=settings.INTEREST_MAX_PENDING,
+)
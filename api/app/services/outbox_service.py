@@ -0,0 +1,295 @@
+"""
+Transactional email outbox.
+
+Emails are inserted into email_outbox by the transaction that makes the change they are
+about, so a notification is sent if and only if the change commits. The outbox worker
+polls for due rows and sends them in batches over the shared email backend connection.
+
+Rows are claimed by pushing next_attempt_at past a lease with FOR UPDATE SKIP LOCKED, so
+workers of several processes never send the same row, and a worker that dies mid batch
+leaves its rows to be retried once the lease expires. Delivery is at least once. Failed
+sends are retried with exponential backoff until EMAIL_OUTBOX_MAX_ATTEMPTS.
+
+With EMAIL_DIGEST_ENABLED, digest rows are held back and sent as one email per recipient
+once the oldest of them is EMAIL_DIGEST_INTERVAL seconds old.
+"""
+
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from logging import getLogger
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.email.factory import get_email_backend
+from app.core.email.interface import Email
+from app.core.lifecycle import lifecycle
+from app.core.metrics import outbox_emails_total
+from app.models.animal import Animal
+from app.models.interest import InterestDeclaration
+from app.models.outbox import OutboxEmail
+from app.models.user import User
+
+logger = getLogger(__name__)
+
+# Claimed rows are retried after the lease if the worker never reports back
+LEASE_SECONDS = 300
+MAX_RETRY_DELAY = 3600
+PURGE_INTERVAL = 3600
+
+
+def pending():
+    return OutboxEmail.sent_at.is_(None), OutboxEmail.failed_at.is_(None)
+
+
+def retry_delay(attempts: int) -> float:
+    return min(settings.EMAIL_OUTBOX_RETRY_SECONDS * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+class OutboxService:
+    @staticmethod
+    async def enqueue(db: AsyncSession, emails: list[dict]) -> None:
+        """Add emails to the outbox, they are sent once the caller commits."""
+        if emails:
+            await db.execute(insert(OutboxEmail), emails)
+
+    @staticmethod
+    async def enqueue_interest_notifications(db: AsyncSession, interest_ids: list[int]) -> None:
+        """Notify the admins who listed the animals of new interest declarations."""
+        if not interest_ids:
+            return
+
+        stmt = (
+            select(InterestDeclaration, Animal.name, User.email)
+            .join(Animal, InterestDeclaration.animal_id == Animal.id)
+            .join(User, Animal.created_by_id == User.id)
+            .where(InterestDeclaration.id.in_(interest_ids), User.is_active.is_(True))
+        )
+        result = await db.execute(stmt)
+
+        emails = []
+        for interest, animal_name, admin_email in result:
+            lines = [f"{interest.name} <{interest.email}> is interested in {animal_name}."]
+            if interest.phone:
+                lines.append(f"Phone: {interest.phone}")
+            if interest.message:
+                lines += ["", interest.message]
+            emails.append(
+                {
+                    "recipient": admin_email,
+                    "subject": f"New interest in {animal_name}",
+                    "body": "\n".join(lines),
+                    "kind": "interest_received",
+                    "digest": True,
+                }
+            )
+        await OutboxService.enqueue(db, emails)
+
+    @staticmethod
+    async def claim_due(db: AsyncSession, limit: int) -> list[OutboxEmail]:
+        now = datetime.now(timezone.utc)
+        due = select(OutboxEmail.id).where(*pending(), OutboxEmail.next_attempt_at <= now)
+        if settings.EMAIL_DIGEST_ENABLED:
+            due = due.where(OutboxEmail.digest.is_(False))
+        due = due.order_by(OutboxEmail.next_attempt_at).limit(limit)
+
+        return await OutboxService._claim(db, due, now)
+
+    @staticmethod
+    async def claim_digests(db: AsyncSession, limit: int) -> list[OutboxEmail]:
+        """Claim the digest rows of up to `limit` recipients whose digest is due."""
+        now = datetime.now(timezone.utc)
+        ready = (*pending(), OutboxEmail.digest.is_(True), OutboxEmail.next_attempt_at <= now)
+        recipients = (
+            select(OutboxEmail.recipient)
+            .where(*ready)
+            .group_by(OutboxEmail.recipient)
+            .having(
+                func.min(OutboxEmail.created_at)
+                <= now - timedelta(seconds=settings.EMAIL_DIGEST_INTERVAL)
+            )
+            .limit(limit)
+        )
+        due = select(OutboxEmail.id).where(*ready, OutboxEmail.recipient.in_(recipients))
+
+        return await OutboxService._claim(db, due, now)
+
+    @staticmethod
+    async def _claim(db: AsyncSession, due, now: datetime) -> list[OutboxEmail]:
+        stmt = (
+            update(OutboxEmail)
+            .where(OutboxEmail.id.in_(due.with_for_update(skip_locked=True)))
+            .values(
+                attempts=OutboxEmail.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=LEASE_SECONDS),
+                updated_at=now,
+            )
+            .returning(OutboxEmail)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.scalars(stmt)
+
+        return list(result)
+
+    @staticmethod
+    async def record_results(
+        db: AsyncSession, results: list[tuple[OutboxEmail, Exception | None]]
+    ) -> None:
+        """Mark sent rows, and schedule a retry of failed ones or give up on them."""
+        now = datetime.now(timezone.utc)
+        values = []
+        for row, error in results:
+            values_row = {
+                "id": row.id,
+                "updated_at": now,
+                "sent_at": None,
+                "failed_at": None,
+                "next_attempt_at": row.next_attempt_at,
+                "last_error": None,
+            }
+            if error is None:
+                values_row["sent_at"] = now
+                outbox_emails_total.inc(result="sent")
+            elif row.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                values_row["failed_at"] = now
+                values_row["last_error"] = repr(error)
+                outbox_emails_total.inc(result="failed")
+                logger.warning(
+                    f"Giving up on {row.kind} email {row.id} to {row.recipient} after "
+                    f"{row.attempts} attempts: {error!r}"
+                )
+            else:
+                values_row["next_attempt_at"] = now + timedelta(seconds=retry_delay(row.attempts))
+                values_row["last_error"] = repr(error)
+                outbox_emails_total.inc(result="retried")
+            values.append(values_row)
+
+        # Bulk UPDATE by primary key, sent as a single executemany
+        if values:
+            await db.execute(update(OutboxEmail), values)
+
+    @staticmethod
+    def build_digest(rows: list[OutboxEmail]) -> Email:
+        if len(rows) == 1:
+            return Email([rows[0].recipient], rows[0].subject, rows[0].body, rows[0].html)
+
+        rows = sorted(rows, key=lambda row: row.created_at)
+        sections = [f"{row.subject}\n\n{row.body}" for row in rows]
+
+        return Email(
+            [rows[0].recipient],
+            f"{len(rows)} new notifications from {settings.APP_NAME}",
+            "\n\n---\n\n".join(sections),
+        )
+
+    @staticmethod
+    async def purge_sent(db: AsyncSession, before: datetime) -> int:
+        stmt = delete(OutboxEmail).where(OutboxEmail.sent_at < before)
+        result = await db.execute(stmt)
+
+        return result.rowcount
+
+
+class OutboxWorker:
+    """Background task sending due outbox emails, one per process."""
+
+    def __init__(self, batch_size: int, poll_interval: float):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.wakeup = asyncio.Event()
+        self.stopping = False
+        self.task: asyncio.Task | None = None
+        self.next_purge = 0.0
+
+    def start(self) -> None:
+        self.task = lifecycle.create_task(self.run(), name="outbox_worker")
+        lifecycle.on_shutdown(self.stop)
+
+    def wake(self) -> None:
+        """Check for due emails now, e.g. after committing new ones."""
+        self.wakeup.set()
+
+    async def run(self) -> None:
+        while not self.stopping:
+            try:
+                sent = await self.send_due()
+                if settings.EMAIL_DIGEST_ENABLED:
+                    await self.send_digests()
+                await self.purge()
+            except Exception as e:
+                logger.warning(f"Error sending outbox emails: {e}")
+                sent = 0
+
+            # A full batch means more rows are probably due, keep going
+            if sent >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.poll_interval)
+            except TimeoutError:
+                pass
+            self.wakeup.clear()
+
+    async def send_due(self) -> int:
+        async with async_session_maker() as db:
+            rows = await OutboxService.claim_due(db, self.batch_size)
+            await db.commit()
+        if not rows:
+            return 0
+
+        emails = [Email([row.recipient], row.subject, row.body, row.html) for row in rows]
+        errors = await get_email_backend().send_batch(emails)
+        await self.record(list(zip(rows, errors)))
+
+        return len(rows)
+
+    async def send_digests(self) -> None:
+        async with async_session_maker() as db:
+            rows = await OutboxService.claim_digests(db, self.batch_size)
+            await db.commit()
+        if not rows:
+            return
+
+        by_recipient: dict[str, list[OutboxEmail]] = defaultdict(list)
+        for row in rows:
+            by_recipient[row.recipient].append(row)
+        groups = list(by_recipient.values())
+
+        emails = [OutboxService.build_digest(group) for group in groups]
+        errors = await get_email_backend().send_batch(emails)
+        await self.record([(row, error) for group, error in zip(groups, errors) for row in group])
+
+    async def record(self, results: list[tuple[OutboxEmail, Exception | None]]) -> None:
+        async with async_session_maker() as db:
+            await OutboxService.record_results(db, results)
+            await db.commit()
+
+    async def purge(self) -> None:
+        if time.monotonic() < self.next_purge:
+            return
+
+        before = datetime.now(timezone.utc) - timedelta(days=settings.EMAIL_OUTBOX_RETENTION_DAYS)
+        async with async_session_maker() as db:
+            purged = await OutboxService.purge_sent(db, before)
+            await db.commit()
+        if purged:
+            logger.info(f"Purged {purged} sent emails from the outbox")
+        self.next_purge = time.monotonic() + PURGE_INTERVAL
+
+    async def stop(self) -> None:
+        self.stopping = True
+        self.wakeup.set()
+
+        try:
+            if self.task is not None:
+                await self.task
+        finally:
+            await get_email_backend().close()
+
+
+outbox_worker = OutboxWorker(
+    batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE,
+    poll_interval=settings.EMAIL_OUTBOX_POLL_INTERVAL,
+)
@@ -0,0 +1,380 @@
+"""
+Similar animal recommendations from an in-memory feature matrix.
+
+Each worker keeps the features of the available animals in NumPy arrays, one row per
+animal: one-hot species, size, gender and location, the log of the age in years and a
+hashed bag of words of the breed and description. Scoring an animal against all the
+others is a few vectorized operations over these arrays instead of a query per request.
+
+The index is built on startup and kept current from the change feed, changed animals are
+read back in batches and their rows updated in place. It is rebuilt from scratch every
+SIMILAR_ANIMALS_REBUILD_INTERVAL seconds and whenever the feed may have missed changes.
+With the change feed disabled only the periodic rebuilds update it.
+
+Features are built for all the rows read at once, in a worker thread so the event loop keeps
+serving requests, and a rebuilt index is swapped in when complete. Only the tokenizing of
+the text is done row by row, the rest is vectorized.
+
+Requires NumPy (pip install openadopt-api[recommendations]), without it the index is not
+started and similar animals are unavailable.
+"""
+
+import asyncio
+import re
+import time
+import zlib
+from logging import getLogger
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Iterable, NamedTuple, Sequence
+
+from app.core.change_feed import RESYNC, change_feed
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.lifecycle import lifecycle
+from app.models.animal import (
+    Animal,
+    AnimalAdoptionStatus,
+    AnimalAgeUnit,
+    AnimalCurrentLocation,
+    AnimalGender,
+    AnimalSize,
+    AnimalSpecies,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = getLogger(__name__)
+
+# One-hot encoded fields and how much a matching value adds to the score
+CATEGORICAL_FIELDS = (
+    ("species", AnimalSpecies, 3.0),
+    ("size", AnimalSize, 1.0),
+    ("gender", AnimalGender, 0.5),
+    ("current_location", AnimalCurrentLocation, 0.5),
+)
+CATEGORICAL_SIZE = sum(len(enum) for _, enum, _ in CATEGORICAL_FIELDS)
+AGE_WEIGHT = 1.0
+TEXT_WEIGHT = 1.5
+# Buckets of the hashed bag of words
+TEXT_DIMENSIONS = 128
+MIN_WORD_LENGTH = 3
+STOP_WORDS = {"and", "the", "with", "for", "very", "has", "her", "his", "she", "was", "are"}
+
+# Rows whose words are counted at once when building features
+FEATURE_CHUNK_SIZE = 1000
+
+# Seconds to wait for more changes before reading back a batch
+REFRESH_DELAY = 1.0
+ERROR_RETRY_DELAY = 10.0
+
+WORD_RE = re.compile(r"[a-z]+")
+
+
+class AnimalFeatures(NamedTuple):
+    categorical: "np.ndarray"
+    log_age: float
+    text: "np.ndarray"
+
+
+class FeatureArrays(NamedTuple):
+    """Features of many animals, one row each."""
+
+    ids: "np.ndarray"
+    categorical: "np.ndarray"
+    log_age: "np.ndarray"
+    text: "np.ndarray"
+
+
+def age_in_years(age: int, age_unit: AnimalAgeUnit) -> float:
+    return age / 12 if age_unit == AnimalAgeUnit.MONTHS else float(age)
+
+
+def word_buckets(text: str) -> Iterable[int]:
+    """Buckets of the hashed bag of words of a text, one per word."""
+    for word in WORD_RE.findall(text.lower()):
+        if len(word) >= MIN_WORD_LENGTH and word not in STOP_WORDS:
+            # crc32 is stable across processes, unlike hash()
+            yield zlib.crc32(word.encode()) % TEXT_DIMENSIONS
+
+
+def build_feature_arrays(rows: Sequence, capacity: int = 0) -> FeatureArrays:
+    """
+    Features of the rows, in arrays of at least capacity rows with zeros past the rows.
+
+    CPU bound for many rows, run it in a thread off the event loop.
+    """
+    count = len(rows)
+    capacity = max(capacity, count)
+    ids = np.zeros(capacity, dtype=np.int64)
+    ids[:count] = [row.id for row in rows]
+
+    categorical = np.zeros((capacity, CATEGORICAL_SIZE), dtype=np.float32)
+    offset = 0
+    for name, enum, _ in CATEGORICAL_FIELDS:
+        columns = {value: offset + index for index, value in enumerate(enum)}
+        # -1 for the rows without a value
+        column = np.array([columns.get(getattr(row, name), -1) for row in rows], dtype=np.int64)
+        present = np.flatnonzero(column >= 0)
+        categorical[present, column[present]] = 1.0
+        offset += len(enum)
+
+    log_age = np.zeros(capacity, dtype=np.float32)
+    log_age[:count] = np.log1p([age_in_years(row.age, row.age_unit) for row in rows])
+
+    # Word counts of every row, then L2 normalized. Counted in chunks, a single NumPy call
+    # over all the words would hold the GIL and block the event loop for its duration.
+    text = np.zeros((capacity, TEXT_DIMENSIONS), dtype=np.float32)
+    for start in range(0, count, FEATURE_CHUNK_SIZE):
+        chunk = rows[start : start + FEATURE_CHUNK_SIZE]
+        cells = [
+            index * TEXT_DIMENSIONS + bucket
+            for index, row in enumerate(chunk)
+            for bucket in word_buckets(
+                " ".join(part for part in (row.breed, row.description) if part)
+            )
+        ]
+        counts = np.bincount(cells, minlength=len(chunk) * TEXT_DIMENSIONS)
+        text[start : start + len(chunk)] = counts.reshape(len(chunk), TEXT_DIMENSIONS)
+    norms = np.linalg.norm(text, axis=1, keepdims=True)
+    np.divide(text, norms, out=text, where=norms > 0)
+
+    return FeatureArrays(ids, categorical, log_age, text)
+
+
+def build_features(row) -> AnimalFeatures:
+    arrays = build_feature_arrays([row])
+
+    return AnimalFeatures(arrays.categorical[0], float(arrays.log_age[0]), arrays.text[0])
+
+
+class SimilarityIndex:
+    def __init__(self, rebuild_interval: float):
+        self.rebuild_interval = rebuild_interval
+        self.ready = False
+        self.count = 0
+        self.positions: dict[int, int] = {}
+        self.ids = self.categorical = self.log_age = self.text = None
+        self.weights = None
+        self.queue: asyncio.Queue | None = None
+        self.task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if np is None:
+            logger.info("NumPy is not installed, similar animals are disabled")
+            return
+
+        self.weights = np.concatenate(
+            [np.full(len(enum), weight, dtype=np.float32) for _, enum, weight in CATEGORICAL_FIELDS]
+        )
+        if settings.CHANGE_FEED_ENABLED:
+            # Subscribe before the first build, so nothing committed meanwhile is missed
+            self.queue = change_feed.subscribe()
+        self.task = lifecycle.create_task(self.run(), name="similarity_index")
+        lifecycle.on_shutdown(self.stop)
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+        if self.queue is not None:
+            change_feed.unsubscribe(self.queue)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.rebuild()
+                deadline = time.monotonic() + self.rebuild_interval
+                while (timeout := deadline - time.monotonic()) > 0:
+                    changed = await self.next_changes(timeout)
+                    if changed is RESYNC:
+                        break
+                    if changed:
+                        await self.refresh(changed)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Error updating the similar animals index: {e}")
+                await asyncio.sleep(ERROR_RETRY_DELAY)
+
+    async def next_changes(self, timeout: float) -> set[int] | None:
+        """Ids of the animals changed within timeout, or RESYNC to rebuild."""
+        if self.queue is None:
+            await asyncio.sleep(timeout)
+            return set()
+
+        try:
+            events = [await asyncio.wait_for(self.queue.get(), timeout)]
+        except TimeoutError:
+            return set()
+
+        # Let writes made together arrive, and read them back with one query
+        await asyncio.sleep(REFRESH_DELAY)
+        while not self.queue.empty():
+            events.append(self.queue.get_nowait())
+
+        if RESYNC in events:
+            return RESYNC
+        return {event.id for event in events}
+
+    async def rebuild(self) -> None:
+        start = time.perf_counter()
+        async with async_session_maker() as db:
+            rows = await RecommendationService.get_feature_rows(db)
+
+        def build() -> tuple[FeatureArrays, dict[int, int]]:
+            arrays = build_feature_arrays(rows, capacity=max(len(rows), 64))
+            return arrays, {row.id: position for position, row in enumerate(rows)}
+
+        arrays, positions = await asyncio.to_thread(build)
+        # Searches use the previous index until here
+        self.ids, self.categorical, self.log_age, self.text = arrays
+        self.positions = positions
+        self.count = len(rows)
+        self.ready = True
+        logger.info(
+            f"Built similar animals index of {self.count} animals in "
+            f"{(time.perf_counter() - start) * 1000:.1f}ms"
+        )
+
+    async def refresh(self, animal_ids: set[int]) -> None:
+        async with async_session_maker() as db:
+            rows = await RecommendationService.get_feature_rows(db, animal_ids)
+
+        arrays = await asyncio.to_thread(build_feature_arrays, rows)
+        # Animals no longer returned were deleted, adopted or put on hold
+        for animal_id in animal_ids - {row.id for row in rows}:
+            self.remove(animal_id)
+        self.upsert(arrays, len(rows))
+
+    def allocate(self, capacity: int) -> None:
+        count = self.count
+        ids = np.zeros(capacity, dtype=np.int64)
+        categorical = np.zeros((capacity, CATEGORICAL_SIZE), dtype=np.float32)
+        log_age = np.zeros(capacity, dtype=np.float32)
+        text = np.zeros((capacity, TEXT_DIMENSIONS), dtype=np.float32)
+        if count:
+            ids[:count] = self.ids[:count]
+            categorical[:count] = self.categorical[:count]
+            log_age[:count] = self.log_age[:count]
+            text[:count] = self.text[:count]
+
+        self.ids, self.categorical, self.log_age, self.text = ids, categorical, log_age, text
+
+    def upsert(self, arrays: FeatureArrays, count: int) -> None:
+        """Add or update the first count rows of the arrays."""
+        for row, animal_id in enumerate(arrays.ids[:count].tolist()):
+            position = self.positions.get(animal_id)
+            if position is None:
+                if self.count == len(self.ids):
+                    self.allocate(len(self.ids) * 2)
+                position = self.count
+                self.count += 1
+                self.positions[animal_id] = position
+
+            self.ids[position] = animal_id
+            self.categorical[position] = arrays.categorical[row]
+            self.log_age[position] = arrays.log_age[row]
+            self.text[position] = arrays.text[row]
+
+    def remove(self, animal_id: int) -> None:
+        position = self.positions.pop(animal_id, None)
+        if position is None:
+            return
+
+        # Move the last row into the gap, so the first count rows stay contiguous
+        last = self.count - 1
+        if position != last:
+            self.ids[position] = self.ids[last]
+            self.categorical[position] = self.categorical[last]
+            self.log_age[position] = self.log_age[last]
+            self.text[position] = self.text[last]
+            self.positions[int(self.ids[position])] = position
+        self.count = last
+
+    def get_features(self, animal_id: int) -> AnimalFeatures | None:
+        position = self.positions.get(animal_id)
+        if position is None:
+            return None
+
+        return AnimalFeatures(
+            self.categorical[position], float(self.log_age[position]), self.text[position]
+        )
+
+    def similar(
+        self, features: AnimalFeatures, limit: int, exclude_id: int | None = None
+    ) -> list[tuple[int, float]]:
+        """Ids and scores of the indexed animals most similar to the features, best first."""
+        count = self.count
+        scores = self.categorical[:count] @ (self.weights * features.categorical)
+        scores += AGE_WEIGHT * np.maximum(0, 1 - np.abs(self.log_age[:count] - features.log_age))
+        scores += TEXT_WEIGHT * (self.text[:count] @ features.text)
+
+        if exclude_id in self.positions:
+            scores[self.positions[exclude_id]] = -np.inf
+            count -= 1
+        limit = min(limit, count)
+        if limit <= 0:
+            return []
+
+        # Partial sort, only the top rows are ordered
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+
+        return [(int(self.ids[i]), round(float(scores[i]), 4)) for i in top]
+
+
+class RecommendationService:
+    @staticmethod
+    async def get_feature_rows(db: AsyncSession, animal_ids: Iterable[int] | None = None):
+        """Columns the features are built from, of the available animals."""
+        stmt = select(
+            Animal.id,
+            Animal.species,
+            Animal.size,
+            Animal.gender,
+            Animal.current_location,
+            Animal.age,
+            Animal.age_unit,
+            Animal.breed,
+            Animal.description,
+        ).where(
+            Animal.deleted_at.is_(None),
+            Animal.adoption_status == AnimalAdoptionStatus.AVAILABLE,
+        )
+        if animal_ids is not None:
+            stmt = stmt.where(Animal.id.in_(animal_ids))
+        result = await db.execute(stmt)
+
+        return result.all()
+
+    @staticmethod
+    async def get_similar_animals(
+        db: AsyncSession, animal_id: int, limit: int
+    ) -> list[tuple[Animal, float]] | None:
+        """Available animals most similar to an animal, None if it doesn't exist."""
+        features = similar_animals.get_features(animal_id)
+        if features is None:
+            # Adopted and on hold animals aren't indexed, but can still get suggestions
+            animal = await db.get(Animal, animal_id)
+            if animal is None or animal.deleted_at is not None:
+                return None
+            features = build_features(animal)
+
+        scored = similar_animals.similar(features, limit, exclude_id=animal_id)
+        if not scored:
+            return []
+
+        stmt = select(Animal).where(
+            Animal.id.in_([id for id, _ in scored]), Animal.deleted_at.is_(None)
+        )
+        animals = {animal.id: animal for animal in await db.scalars(stmt)}
+
+        # The index can lag behind, skip animals deleted since
+        return [(animals[id], score) for id, score in scored if id in animals]
+
+
+similar_animals = SimilarityIndex(settings.SIMILAR_ANIMALS_REBUILD_INTERVAL)
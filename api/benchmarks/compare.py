@@ -0,0 +1,83 @@
+"""
+Compare two load test reports written by benchmarks.load.
+
+Exits with status 1 when p95 latency grew or throughput dropped by more than the threshold
+for any operation, so it can gate a CI job.
+
+Usage:
+    uv run python -m benchmarks.compare before.json after.json --threshold 10
+"""
+
+import argparse
+import json
+import sys
+
+
+def change(before: float, after: float) -> float:
+    """Relative change in percent."""
+    if not before:
+        return 0.0
+    return (after - before) / before * 100
+
+
+def compare(before: dict, after: dict, threshold: float) -> list[str]:
+    regressions = []
+    operations = {**after["operations"], "total": after["total"]}
+    baseline = {**before["operations"], "total": before["total"]}
+
+    print(f"{'operation':<10} {'p50 ms':>17} {'p95 ms':>17} {'p99 ms':>17} {'rps':>17}")
+    for name, stats in operations.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]
+
+        columns = []
+        for key in ("p50_ms", "p95_ms", "p99_ms", "rps"):
+            columns.append(f"{old[key]:>7.1f} → {stats[key]:>7.1f}")
+        print(f"{name:<10} " + " ".join(f"{column:>17}" for column in columns))
+
+        if change(old["p95_ms"], stats["p95_ms"]) > threshold:
+            regressions.append(
+                f"{name}: p95 {old['p95_ms']:.1f}ms → {stats['p95_ms']:.1f}ms "
+                f"({change(old['p95_ms'], stats['p95_ms']):+.1f}%)"
+            )
+        if change(old["rps"], stats["rps"]) < -threshold:
+            regressions.append(
+                f"{name}: rps {old['rps']:.1f} → {stats['rps']:.1f} "
+                f"({change(old['rps'], stats['rps']):+.1f}%)"
+            )
+
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="allowed regression in percent"
+    )
+    args = parser.parse_args(argv)
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    if before["config"] != after["config"]:
+        print("Warning: the reports were recorded with different settings")
+    print(f"{before.get('commit') or 'unknown'} → {after.get('commit') or 'unknown'}\n")
+
+    regressions = compare(before, after, args.threshold)
+    if regressions:
+        print(f"\nRegressions over {args.threshold:.0f}%:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print(f"\nNo regressions over {args.threshold:.0f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
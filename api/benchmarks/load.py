@@ -0,0 +1,330 @@
+"""
+Load test the API with a mixed workload and record latency percentiles to JSON.
+
+The app runs in-process by default. Pass --uvicorn to start it under uvicorn, or --url to
+target a server that is already running. Either way DATABASE_URL must point to the same
+disposable database, a benchmark user and animals are created in it before the run.
+Login rate limiting is turned off for the in-process and uvicorn runs, since every login
+comes from the same client and email.
+
+Usage:
+    uv run python -m benchmarks.load --concurrency 20 --duration 30 --output before.json
+    uv run python -m benchmarks.load --mix list=6,detail=3,patch=1 --output after.json
+    uv run python -m benchmarks.compare before.json after.json
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import httpx
+from sqlalchemy import delete
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.security import hash_password
+from app.core.storage.factory import get_storage_backend
+from app.models.animal import Animal
+from app.models.user import User, UserRole
+
+DEFAULT_MIX = "list=50,detail=30,patch=10,upload=5,login=5"
+PASSWORD = "benchmark-password"
+
+ANIMAL = {
+    "name": "Benchmark",
+    "species": "dog",
+    "breed": "Mixed",
+    "size": "medium",
+    "age": 3,
+    "age_unit": "years",
+    "gender": "female",
+    "adoption_status": "available",
+    "current_location": "shelter",
+    "description": "Friendly and calm, loves long walks and other dogs. " * 4,
+    "medical_notes": None,
+    "behavioral_notes": None,
+}
+
+
+def parse_mix(mix: str) -> dict[str, int]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = int(weight or 1)
+
+    unknown = set(weights) - set(OPERATIONS)
+    if unknown:
+        raise SystemExit(f"Unknown operations in --mix: {', '.join(sorted(unknown))}")
+
+    return weights
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(percent / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+    }
+
+
+async def seed(animals: int) -> tuple[User, list[int]]:
+    async with async_session_maker() as db:
+        user = User(
+            email=f"load-{uuid.uuid4().hex[:8]}@openadopt.org",
+            hashed_password=hash_password(PASSWORD),
+            role=UserRole.ADMIN,
+        )
+        db.add(user)
+        await db.flush()
+
+        rows = [Animal(**ANIMAL, created_by_id=user.id, photos=[]) for _ in range(animals)]
+        db.add_all(rows)
+        await db.commit()
+
+        return user, [animal.id for animal in rows]
+
+
+async def cleanup(user: User, animal_ids: list[int]) -> None:
+    storage = get_storage_backend()
+    for animal_id in animal_ids:
+        await storage.delete_dir(f"animals/{animal_id}")
+
+    async with async_session_maker() as db:
+        await db.execute(delete(Animal).where(Animal.created_by_id == user.id))
+        await db.execute(delete(User).where(User.id == user.id))
+        await db.commit()
+
+
+class Workload:
+    def __init__(self, client: httpx.AsyncClient, user: User, animal_ids: list[int], token: str):
+        self.client = client
+        self.user = user
+        self.animal_ids = animal_ids
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    async def list(self, rng: random.Random) -> httpx.Response:
+        skip = rng.randrange(0, max(len(self.animal_ids) - 50, 1))
+        return await self.client.get(
+            "/admin/animals/", params={"skip": skip, "limit": 50}, headers=self.headers
+        )
+
+    async def detail(self, rng: random.Random) -> httpx.Response:
+        animal_id = rng.choice(self.animal_ids)
+        return await self.client.get(f"/admin/animals/{animal_id}", headers=self.headers)
+
+    async def patch(self, rng: random.Random) -> httpx.Response:
+        animal_id = rng.choice(self.animal_ids)
+        data = {**ANIMAL, "age": rng.randint(1, 15)}
+        return await self.client.patch(
+            f"/admin/animals/{animal_id}", json=data, headers=self.headers
+        )
+
+    async def upload(self, rng: random.Random) -> httpx.Response:
+        animal_id = rng.choice(self.animal_ids)
+        content = b"\x89PNG" + rng.randbytes(32 * 1024)
+        return await self.client.post(
+            f"/admin/animals/{animal_id}/photos/primary",
+            files={"file": ("photo.png", io.BytesIO(content), "image/png")},
+            headers=self.headers,
+        )
+
+    async def login(self, rng: random.Random) -> httpx.Response:
+        return await self.client.post(
+            "/auth/login/", json={"email": self.user.email, "password": PASSWORD}
+        )
+
+
+OPERATIONS = ("list", "detail", "patch", "upload", "login")
+
+
+async def run_workload(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    weights: dict[str, int],
+    concurrency: int,
+    duration: float,
+    seed_value: int,
+) -> dict:
+    names = list(weights)
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    deadline = time.perf_counter() + duration
+
+    async def worker(index: int):
+        rng = random.Random(seed_value + index)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights=[weights[name] for name in names])[0]
+            start = time.perf_counter()
+            try:
+                response = await getattr(workload, name)(rng)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            elapsed = time.perf_counter() - start
+
+            if failed:
+                errors[name] += 1
+            else:
+                latencies[name].append(elapsed)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    all_latencies = [latency for values in latencies.values() for latency in values]
+    return {
+        "total": summarize(all_latencies, sum(errors.values()), elapsed),
+        "operations": {name: summarize(latencies[name], errors[name], elapsed) for name in names},
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def wait_until_ready(url: str, timeout: float = 30.0) -> None:
+    async with httpx.AsyncClient(base_url=url) as client:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health/ready")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+
+    raise SystemExit(f"Server at {url} did not become ready in {timeout}s")
+
+
+async def main(args: argparse.Namespace) -> None:
+    weights = parse_mix(args.mix)
+    user, animal_ids = await seed(args.animals)
+    server = None
+
+    try:
+        if args.uvicorn:
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port)]
+                + ["--workers", str(args.workers), "--log-level", "warning"],
+                env={**os.environ, "RATE_LIMIT_ENABLED": "false"},
+            )
+            args.url = f"http://127.0.0.1:{args.port}"
+
+        if args.url:
+            await wait_until_ready(args.url)
+            client = httpx.AsyncClient(base_url=args.url, timeout=60)
+            lifespan = None
+        else:
+            from app.main import app, lifespan as app_lifespan
+
+            settings.RATE_LIMIT_ENABLED = False
+            lifespan = app_lifespan(app)
+            await lifespan.__aenter__()
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=60
+            )
+
+        async with client:
+            response = await client.post(
+                "/auth/login/", json={"email": user.email, "password": PASSWORD}
+            )
+            response.raise_for_status()
+            workload = Workload(client, user, animal_ids, response.json()["access_token"])
+
+            if args.warmup:
+                await run_workload(
+                    client, workload, weights, args.concurrency, args.warmup, args.seed
+                )
+            results = await run_workload(
+                client, workload, weights, args.concurrency, args.duration, args.seed
+            )
+
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        await cleanup(user, animal_ids)
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "target": args.url or "in-process",
+        "config": {
+            "mix": weights,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "animals": args.animals,
+            "seed": args.seed,
+            "workers": args.workers if args.uvicorn else None,
+        },
+        **results,
+    }
+
+    print(
+        f"{'operation':<10} {'requests':>9} {'errors':>7} {'rps':>9} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    )
+    for name, stats in {**results["operations"], "total": results["total"]}.items():
+        print(
+            f"{name:<10} {stats['requests']:>9} {stats['errors']:>7} {stats['rps']:>9.1f} "
+            f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to measure")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds before measuring")
+    parser.add_argument("--animals", type=int, default=200, help="animals to create")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="path of the JSON report")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="benchmark a running server instead of in-process")
+    target.add_argument("--uvicorn", action="store_true", help="start the app under uvicorn")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("BENCHMARK_PORT", 8001)))
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
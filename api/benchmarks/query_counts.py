@@ -0,0 +1,148 @@
+"""
+Count the database round trips issued by each admin animals endpoint.
+
+Runs the app in-process against the database configured in DATABASE_URL
+(use a disposable database, rows are created and deleted).
+
+Usage:
+    uv run python -m benchmarks.query_counts
+"""
+
+import asyncio
+import io
+import uuid
+from collections import Counter
+
+import httpx
+from sqlalchemy import delete, event
+
+from app.core.database import async_session_maker, engine
+from app.core.instrumentation import capture_queries
+from app.core.security import create_access_token, hash_password
+from app.main import app
+from app.models.animal import Animal
+from app.models.user import User, UserRole
+
+counter: Counter = Counter()
+
+
+@event.listens_for(engine.sync_engine, "commit")
+def count_commit(conn):
+    counter["commits"] += 1
+
+
+async def create_user() -> User:
+    async with async_session_maker() as db:
+        user = User(
+            email=f"bench-{uuid.uuid4().hex[:8]}@openadopt.org",
+            hashed_password=hash_password(uuid.uuid4().hex),
+            role=UserRole.ADMIN,
+        )
+        db.add(user)
+        await db.commit()
+
+        return user
+
+
+async def main():
+    user = await create_user()
+    token = create_access_token({"id": user.id, "email": user.email})
+    headers = {"Authorization": f"Bearer {token}"}
+    animal = {
+        "name": "Benchmark",
+        "species": "dog",
+        "age": 2,
+        "age_unit": "years",
+        "gender": "female",
+        "breed": None,
+        "size": None,
+        "adoption_status": "available",
+        "current_location": None,
+        "description": None,
+        "medical_notes": None,
+        "behavioral_notes": None,
+    }
+
+    def photo():
+        return {"file": ("photo.png", io.BytesIO(b"\x89PNG" + b"0" * 1024), "image/png")}
+
+    results = []
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://benchmark"
+    ) as client:
+
+        async def measure(name, method, url, **kwargs):
+            counter.clear()
+            with capture_queries() as stats:
+                response = await client.request(method, url, headers=headers, **kwargs)
+            response.raise_for_status()
+            results.append((name, stats.query_count, counter["commits"]))
+            return response
+
+        response = await measure("POST /admin/animals/", "POST", "/admin/animals/", json=animal)
+        animal_id = response.json()["id"]
+        await measure("GET /admin/animals/", "GET", "/admin/animals/")
+        await measure(
+            "GET /admin/animals/?ids=", "GET", "/admin/animals/", params={"ids": [animal_id]}
+        )
+        await measure("GET /admin/animals/{id}", "GET", f"/admin/animals/{animal_id}")
+        await measure(
+            "PATCH /admin/animals/{id}",
+            "PATCH",
+            f"/admin/animals/{animal_id}",
+            json={**animal, "name": "Benchmark updated"},
+        )
+        await measure(
+            "POST /admin/animals/{id}/photos/primary",
+            "POST",
+            f"/admin/animals/{animal_id}/photos/primary",
+            files=photo(),
+        )
+        response = await measure(
+            "POST /admin/animals/{id}/files",
+            "POST",
+            f"/admin/animals/{animal_id}/files",
+            files=photo(),
+        )
+        await measure(
+            "DELETE /admin/animals/{id}/files",
+            "DELETE",
+            f"/admin/animals/{animal_id}/files",
+            json=response.json(),
+        )
+        urls = []
+        for _ in range(3):
+            response = await client.post(
+                f"/admin/animals/{animal_id}/files", headers=headers, files=photo()
+            )
+            response.raise_for_status()
+            urls.append(response.json()["url"])
+        await measure(
+            "PUT /admin/animals/{id}/photos/order",
+            "PUT",
+            f"/admin/animals/{animal_id}/photos/order",
+            json={"urls": urls[::-1]},
+        )
+        await measure(
+            "DELETE /admin/animals/{id}/files/batch",
+            "DELETE",
+            f"/admin/animals/{animal_id}/files/batch",
+            json={"urls": urls},
+        )
+        await measure("DELETE /admin/animals/{id}", "DELETE", f"/admin/animals/{animal_id}")
+
+    async with async_session_maker() as db:
+        # Deleted animals are kept with deleted_at set
+        await db.execute(delete(Animal).where(Animal.created_by_id == user.id))
+        await db.delete(await db.get(User, user.id))
+        await db.commit()
+
+    print(f"| {'Endpoint':<40} | Statements | Commits |")
+    print(f"| {'-' * 40} | ---------- | ------- |")
+    for name, statements, commits in results:
+        print(f"| {name:<40} | {statements:>10} | {commits:>7} |")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""
+Send bursts of identical concurrent reads and count the SQL statements they cause,
+with request coalescing on and off.
+
+Usage:
+    uv run python -m benchmarks.thundering_herd --concurrency 200
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from sqlalchemy import delete
+
+from app.api.admin.animals import animal_reads
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.instrumentation import capture_queries
+from app.core.security import hash_password
+from app.main import app
+from app.models.animal import Animal
+from app.models.user import User, UserRole
+from benchmarks.load import ANIMAL, PASSWORD
+
+
+async def burst(client: httpx.AsyncClient, path: str, headers: dict, concurrency: int):
+    with capture_queries() as stats:
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *(client.get(path, headers=headers) for _ in range(concurrency))
+        )
+        elapsed = time.perf_counter() - start
+
+    assert all(response.status_code == 200 for response in responses)
+    # Every request also looks up the authenticated user
+    return stats.query_count - concurrency, elapsed
+
+
+async def main(concurrency: int):
+    settings.RATE_LIMIT_ENABLED = False
+
+    async with async_session_maker() as db:
+        user = User(
+            email="herd@openadopt.org",
+            hashed_password=hash_password(PASSWORD),
+            role=UserRole.ADMIN,
+        )
+        db.add(user)
+        await db.flush()
+        animals = [Animal(**ANIMAL, created_by_id=user.id, photos=[]) for _ in range(50)]
+        db.add_all(animals)
+        await db.commit()
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            response = await client.post(
+                "/auth/login/", json={"email": user.email, "password": PASSWORD}
+            )
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            paths = {
+                "GET /admin/animals/{id}": f"/admin/animals/{animals[0].id}",
+                "GET /admin/animals/": "/admin/animals/?skip=0&limit=50",
+            }
+            print(f"{concurrency} concurrent identical requests\n")
+            print(f"{'Endpoint':<26} {'Coalescing':<11} {'Statements':>10} {'Time':>9}")
+            for name, path in paths.items():
+                for enabled in (False, True):
+                    animal_reads.enabled = enabled
+                    await burst(client, path, headers, 1)  # warm up
+                    queries, elapsed = await burst(client, path, headers, concurrency)
+                    label = "on" if enabled else "off"
+                    print(f"{name:<26} {label:<11} {queries:>10} {elapsed * 1000:>7.0f}ms")
+    finally:
+        async with async_session_maker() as db:
+            await db.execute(delete(Animal).where(Animal.created_by_id == user.id))
+            await db.execute(delete(User).where(User.id == user.id))
+            await db.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=100)
+    asyncio.run(main(parser.parse_args().concurrency))
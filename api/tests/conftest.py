@@ -0,0 +1,83 @@
+"""
+Fixtures for tests against the app, run in-process with the database configured in
+DATABASE_URL (use a disposable database, rows are created and deleted).
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import delete
+
+from app.core.database import async_session_maker, dispose_engines
+from app.core.security import create_access_token, hash_password
+from app.main import app
+from app.models.animal import Animal, AnimalPhoto
+from app.models.user import User, UserRole
+
+
+@pytest.fixture
+async def client():
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
+
+    # Pooled connections belong to the event loop of the test that opened them
+    await dispose_engines()
+
+
+@pytest.fixture
+async def admin():
+    async with async_session_maker() as db:
+        user = User(
+            email=f"test-{uuid.uuid4().hex[:8]}@openadopt.org",
+            hashed_password=hash_password(uuid.uuid4().hex),
+            role=UserRole.ADMIN,
+        )
+        db.add(user)
+        await db.commit()
+
+    yield user
+
+    async with async_session_maker() as db:
+        # Deleted animals are kept with deleted_at set
+        await db.execute(delete(Animal).where(Animal.created_by_id == user.id))
+        await db.delete(await db.get(User, user.id))
+        await db.commit()
+
+
+@pytest.fixture
+def admin_headers(admin: User) -> dict:
+    token = create_access_token({"id": admin.id, "email": admin.email})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+async def animals(admin: User) -> list[Animal]:
+    """A few animals of the admin, with photos, so that N+1 queries show in the counts."""
+    # Older than the settle window, so the changes endpoint returns them
+    updated_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+    async with async_session_maker() as db:
+        animals = [
+            Animal(
+                name=f"Test {index}",
+                species="dog",
+                age=2,
+                age_unit="years",
+                gender="female",
+                adoption_status="available",
+                created_by_id=admin.id,
+                updated_at=updated_at,
+                photos=[
+                    AnimalPhoto(position=position, url=f"http://test/{uuid.uuid4()}.png")
+                    for position in range(3)
+                ],
+            )
+            for index in range(5)
+        ]
+        db.add_all(animals)
+        await db.commit()
+
+    return animals
@@ -0,0 +1,71 @@
+"""
+Flushing buffered activity entries, a bad entry must not hold back the ones after it.
+"""
+
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import delete, select
+
+from app.core.batch_writer import BatchWriter
+from app.core.database import async_session_maker, dispose_engines
+from app.models.activity import ActivityLog
+from app.services.activity_service import ActivityService
+
+
+def activity_row(entity_id: str, **changes) -> dict:
+    return {
+        "action": "updated",
+        "entity_type": "animal",
+        "entity_id": entity_id,
+        "user_id": None,
+        "details": None,
+        "ip_address": None,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        **changes,
+    }
+
+
+@pytest.fixture
+async def entity_id():
+    entity_id = f"test-{uuid.uuid4().hex[:8]}"
+    yield entity_id
+
+    async with async_session_maker() as db:
+        await db.execute(delete(ActivityLog).where(ActivityLog.entity_id == entity_id))
+        await db.commit()
+    # Pooled connections belong to the event loop of the test that opened them
+    await dispose_engines()
+
+
+@pytest.mark.asyncio
+async def test_bad_rows_are_dropped(entity_id):
+    writer = BatchWriter(
+        "activity_test",
+        ActivityService.insert_activity,
+        max_batch_size=3,
+        max_delay=1,
+        max_pending=100,
+    )
+    writer.rows = [
+        activity_row(entity_id, action="first"),
+        # Can't be parsed
+        activity_row(entity_id, created_at="yesterday"),
+        # Violates the NOT NULL constraint on action
+        activity_row(entity_id, action=None),
+        # Not an entity type
+        activity_row(entity_id, entity_type="planet"),
+        activity_row(entity_id, action="second"),
+    ]
+
+    await writer.flush()
+
+    assert writer.rows == []
+    async with async_session_maker() as db:
+        actions = await db.scalars(
+            select(ActivityLog.action)
+            .where(ActivityLog.entity_id == entity_id)
+            .order_by(ActivityLog.id)
+        )
+        assert list(actions) == ["first", "second"]
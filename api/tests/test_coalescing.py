@@ -0,0 +1,86 @@
+"""
+Coalescing of identical concurrent animal reads.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.api.admin import animals as admin_animals
+from app.core.coalescing import SingleFlight
+
+
+class SlowRead:
+    """Stands in for the page query, so concurrent requests overlap."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self, session_maker, current_user, skip, limit, filter_values, facets):
+        self.calls += 1
+        await asyncio.sleep(0.2)
+        return json.dumps({"items": [], "total": 0, "skip": skip, "limit": limit}).encode()
+
+
+@pytest.fixture
+def slow_read(monkeypatch):
+    slow_read = SlowRead()
+    monkeypatch.setattr(admin_animals, "read_animals_page_json", slow_read)
+    return slow_read
+
+
+@pytest.mark.asyncio
+async def test_calls_started_before_a_write_are_not_joined():
+    flights = SingleFlight("test")
+    calls = 0
+
+    async def read():
+        nonlocal calls
+        calls += 1
+        number = calls
+        await asyncio.sleep(0.1)
+        return number
+
+    first = asyncio.create_task(flights.do("key", read))
+    await asyncio.sleep(0.01)
+    written = time.monotonic()
+    joined = asyncio.create_task(flights.do("key", read))
+    after_write = asyncio.create_task(flights.do("key", read, started_after=written))
+    await asyncio.sleep(0.01)
+    # Callers without a write of their own join the newest call
+    latest = asyncio.create_task(flights.do("key", read))
+
+    assert await asyncio.gather(first, joined, after_write, latest) == [1, 1, 2, 2]
+
+
+@pytest.mark.asyncio
+async def test_filter_value_order_is_coalesced(client, admin_headers, slow_read):
+    responses = await asyncio.gather(
+        client.get("/admin/animals/?species=dog&species=cat", headers=admin_headers),
+        client.get("/admin/animals/?species=cat&species=dog", headers=admin_headers),
+    )
+
+    assert [response.status_code for response in responses] == [200, 200]
+    assert slow_read.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_writer_does_not_join_a_read_started_before_its_write(
+    client, admin_headers, animals, slow_read
+):
+    animal = (await client.get(f"/admin/animals/{animals[0].id}", headers=admin_headers)).json()
+
+    before_write = asyncio.create_task(client.get("/admin/animals/", headers=admin_headers))
+    await asyncio.sleep(0.05)
+    response = await client.patch(
+        f"/admin/animals/{animal['id']}",
+        json={**animal, "name": "Renamed"},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    after_write = await client.get("/admin/animals/", headers=admin_headers)
+
+    assert (await before_write).status_code == 200 and after_write.status_code == 200
+    assert slow_read.calls == 2
@@ -0,0 +1,68 @@
+"""
+Request deadlines, run against a small app so the timings stay short.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI, File, UploadFile
+
+from app.core.deadlines import DeadlineMiddleware
+
+BOUNDARY = "deadline-test"
+
+
+def create_app(budgets) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/animals/{animal_id}/files")
+    async def upload_file(animal_id: int, file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    app.add_middleware(DeadlineMiddleware, timeout=0.3, budgets=budgets)
+    return app
+
+
+async def slow_upload(chunks: int = 5, delay: float = 0.1):
+    """A multipart body streamed over chunks * delay seconds, like a slow client."""
+    yield (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="photo.png"\r\n'
+        "Content-Type: image/png\r\n\r\n"
+    ).encode()
+    for _ in range(chunks):
+        await asyncio.sleep(delay)
+        yield b"0" * 1024
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+async def post_slow_upload(app: FastAPI) -> httpx.Response:
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        return await client.post(
+            "/animals/1/files",
+            content=slow_upload(),
+            headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+        )
+
+
+@pytest.mark.asyncio
+async def test_route_budget_covers_reading_the_body():
+    app = create_app([("POST", "/animals/{animal_id}/files", 5.0)])
+
+    response = await post_slow_upload(app)
+
+    assert response.status_code == 200
+    assert response.json() == {"size": 5 * 1024}
+
+
+@pytest.mark.asyncio
+async def test_default_deadline_cancels_slow_upload():
+    app = create_app([("GET", "/animals/{animal_id}/files", 5.0)])
+
+    response = await post_slow_upload(app)
+
+    assert response.status_code == 504
+    assert response.json() == {"detail": "Request timed out"}
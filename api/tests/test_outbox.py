@@ -0,0 +1,141 @@
+"""
+The email outbox, rows must be sent once they commit and never claimed twice at a time.
+
+Claims take the due rows with the oldest next_attempt_at, the rows created here are due
+since 2000 so they come first in the disposable database.
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete, func, select, update
+
+from app.core.config import settings
+from app.core.database import async_session_maker, dispose_engines
+from app.core.email.interface import EmailBackend
+from app.models.outbox import OutboxEmail
+from app.services import outbox_service
+from app.services.outbox_service import OutboxService, OutboxWorker, retry_delay
+
+DUE_SINCE = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+class FailingEmailBackend(EmailBackend):
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, to: list[str], subject: str, body: str, html: str | None = None):
+        self.sent.append((to, subject))
+        raise ConnectionError("SMTP server unavailable")
+
+
+@pytest.fixture
+async def recipient():
+    recipient = f"test-{uuid.uuid4().hex[:8]}@openadopt.org"
+    yield recipient
+
+    async with async_session_maker() as db:
+        await db.execute(delete(OutboxEmail).where(OutboxEmail.recipient == recipient))
+        await db.commit()
+    # Pooled connections belong to the event loop of the test that opened them
+    await dispose_engines()
+
+
+async def enqueue(recipient: str, count: int) -> None:
+    async with async_session_maker() as db:
+        emails = [
+            {
+                "recipient": recipient,
+                "subject": f"Test {index}",
+                "body": "Test",
+                "kind": "test",
+                "next_attempt_at": DUE_SINCE,
+            }
+            for index in range(count)
+        ]
+        await OutboxService.enqueue(db, emails)
+        await db.commit()
+
+
+async def get_rows(recipient: str) -> list[OutboxEmail]:
+    async with async_session_maker() as db:
+        result = await db.scalars(
+            select(OutboxEmail).where(OutboxEmail.recipient == recipient).order_by(OutboxEmail.id)
+        )
+        return list(result)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_claims_skip_locked_rows(recipient):
+    await enqueue(recipient, 2)
+
+    async with async_session_maker() as first, async_session_maker() as second:
+        # The first claim holds its row locks until it commits
+        first_rows = await OutboxService.claim_due(first, 1)
+        second_rows = await OutboxService.claim_due(second, 2)
+        await first.commit()
+        await second.commit()
+
+    # The second claim skips the locked row and only gets the other one
+    assert len(first_rows) == 1 and len(second_rows) == 1
+    assert first_rows[0].id != second_rows[0].id
+    claimed = {row.id for row in first_rows + second_rows}
+    assert claimed == {row.id for row in await get_rows(recipient)}
+
+    # Claimed rows are leased, so nobody claims them again before the results are recorded
+    async with async_session_maker() as db:
+        assert await OutboxService.claim_due(db, 2) == []
+        await OutboxService.record_results(db, [(row, None) for row in first_rows + second_rows])
+        await db.commit()
+
+    rows = await get_rows(recipient)
+    assert all(row.sent_at is not None and row.attempts == 1 for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_failed_send_is_retried_until_max_attempts(recipient, monkeypatch):
+    backend = FailingEmailBackend()
+    monkeypatch.setattr(outbox_service, "get_email_backend", lambda: backend)
+    monkeypatch.setattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 2)
+    worker = OutboxWorker(batch_size=1, poll_interval=1)
+    await enqueue(recipient, 1)
+
+    before = datetime.now(timezone.utc)
+    assert await worker.send_due() == 1
+    [row] = await get_rows(recipient)
+    assert row.attempts == 1 and row.failed_at is None and "SMTP" in row.last_error
+    assert row.next_attempt_at >= before + timedelta(seconds=retry_delay(1))
+
+    # Not due again before the backoff is over
+    async with async_session_maker() as db:
+        assert await OutboxService.claim_due(db, 1) == []
+        await db.rollback()
+
+    async with async_session_maker() as db:
+        await db.execute(
+            update(OutboxEmail).where(OutboxEmail.id == row.id).values(next_attempt_at=DUE_SINCE)
+        )
+        await db.commit()
+    assert await worker.send_due() == 1
+    [row] = await get_rows(recipient)
+    assert row.attempts == 2 and row.failed_at is not None and row.sent_at is None
+
+    # Given up on, it isn't claimed again
+    assert await worker.send_due() == 0
+    assert len(backend.sent) == 2
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_transaction_leaves_no_email(recipient):
+    async with async_session_maker() as db:
+        await OutboxService.enqueue(
+            db, [{"recipient": recipient, "subject": "Test", "body": "Test", "kind": "test"}]
+        )
+        await db.rollback()
+
+    async with async_session_maker() as db:
+        count = await db.scalar(
+            select(func.count()).select_from(OutboxEmail).where(OutboxEmail.recipient == recipient)
+        )
+    assert count == 0
@@ -0,0 +1,79 @@
+"""
+Statements issued by the admin animals endpoints, to catch N+1 queries.
+
+Every request also includes the lookup of the authenticated user, and the routes with a
+shorter deadline a statement setting the timeout of their transaction.
+"""
+
+import pytest
+
+from app.core.instrumentation import assert_max_queries
+
+
+@pytest.mark.asyncio
+async def test_list_animals(client, admin_headers, animals):
+    with assert_max_queries(6):
+        response = await client.get("/admin/animals/", headers=admin_headers)
+
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == len(animals)
+    assert all(len(item["photos"]) == 3 for item in response.json()["items"])
+
+
+@pytest.mark.asyncio
+async def test_list_animals_by_ids(client, admin_headers, animals):
+    ids = [animal.id for animal in animals]
+
+    with assert_max_queries(5):
+        response = await client.get("/admin/animals/", params={"ids": ids}, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["items"]] == ids
+
+
+@pytest.mark.asyncio
+async def test_get_animal(client, admin_headers, animals):
+    with assert_max_queries(3):
+        response = await client.get(f"/admin/animals/{animals[0].id}", headers=admin_headers)
+
+    assert response.status_code == 200
+    assert len(response.json()["photos"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_animal_changes(client, admin_headers, animals):
+    with assert_max_queries(5):
+        response = await client.get("/admin/animals/changes", headers=admin_headers)
+
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == len(animals)
+
+
+@pytest.mark.asyncio
+async def test_reorder_photos(client, admin_headers, animals):
+    urls = [photo.url for photo in animals[0].photos][::-1]
+
+    with assert_max_queries(5):
+        response = await client.put(
+            f"/admin/animals/{animals[0].id}/photos/order",
+            json={"urls": urls},
+            headers=admin_headers,
+        )
+
+    assert response.status_code == 200
+    assert [photo["url"] for photo in response.json()] == urls
+
+
+@pytest.mark.asyncio
+async def test_delete_files(client, admin_headers, animals):
+    urls = [photo.url for photo in animals[0].photos]
+
+    with assert_max_queries(5):
+        response = await client.request(
+            "DELETE",
+            f"/admin/animals/{animals[0].id}/files/batch",
+            json={"urls": urls},
+            headers=admin_headers,
+        )
+
+    assert response.status_code == 204
@@ -0,0 +1,56 @@
+"""
+Replacing the photos of an animal through the extra_photos_url field of an update.
+"""
+
+import json
+
+import pytest
+
+from app.core.database import async_session_maker
+from app.core.storage.factory import get_storage_backend
+from app.main import app
+from app.models.animal import AnimalPhoto
+
+
+class RecordingStorage:
+    def __init__(self):
+        self.deleted = []
+
+    async def delete_file(self, url: str) -> None:
+        self.deleted.append(url)
+
+
+@pytest.fixture
+def storage():
+    storage = RecordingStorage()
+    app.dependency_overrides[get_storage_backend] = lambda: storage
+    yield storage
+    app.dependency_overrides.pop(get_storage_backend)
+
+
+@pytest.mark.asyncio
+async def test_update_keeps_unchanged_photos(client, admin_headers, animals, storage):
+    animal = animals[0]
+    async with async_session_maker() as db:
+        for photo in animal.photos:
+            photo = await db.get(AnimalPhoto, photo.id)
+            photo.size_bytes = 1024
+            photo.content_hash = f"hash-{photo.position}"
+        await db.commit()
+
+    first, second, third = (photo.url for photo in animal.photos)
+    urls = [third, first, "http://test/new.png"]
+    # The update takes every field, as the form sends them
+    body = (await client.get(f"/admin/animals/{animal.id}", headers=admin_headers)).json()
+    response = await client.patch(
+        f"/admin/animals/{animal.id}",
+        json={**body, "extra_photos_url": json.dumps(urls)},
+        headers=admin_headers,
+    )
+
+    assert response.status_code == 200
+    photos = response.json()["photos"]
+    assert [photo["url"] for photo in photos] == urls
+    assert [photo["id"] for photo in photos[:2]] == [animal.photos[2].id, animal.photos[0].id]
+    assert [photo["content_hash"] for photo in photos] == ["hash-2", "hash-0", None]
+    assert storage.deleted == [second]